@@ -0,0 +1,131 @@
+"""
+Event-loop responsiveness while a response is generated.
+
+Points the provider clients at a FakeLLMServer whose endpoints stall, then
+routes, generates and synthesises a response on the loop while a thread
+delivers fake transcript events the way SpeechTranscriber.message_handler
+does (run_coroutine_threadsafe). Reports how late those events ran.
+
+    python -m benchmarks.bench_event_loop
+    python -m benchmarks.bench_event_loop --blocking   # baseline: sync HTTP on the loop
+
+Exits non-zero if any transcript event was delayed more than --max-lag-ms.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+
+from src.spritely.core.earcons import DEFAULT_TTS_MODEL, DEFAULT_VOICE_ID
+from src.spritely.core.invoke_llm import llm_speak, remote_response_type
+from src.spritely.core.providers import Providers, set_providers
+from src.spritely.core.speech_pipeline import SentenceChunker, elevenlabs_async_synthesizer
+from src.spritely.testing.fake_llm import FakeLLMServer
+from src.spritely.utils.lazy import warm_in_background
+
+EVENT_INTERVAL = 0.02
+PROMPT = "<current_request>tell me something</current_request>"
+
+
+async def generate(providers: Providers) -> dict:
+    """Route, stream and synthesise one response through the async providers"""
+    set_providers(providers)
+    try:
+        route = await remote_response_type(PROMPT)
+        # A real voice ID: anything else makes the SDK look the voice up by name first
+        synthesize = elevenlabs_async_synthesizer(providers.elevenlabs, DEFAULT_VOICE_ID, DEFAULT_TTS_MODEL)
+        chunker = SentenceChunker()
+        tts = []
+        async for token in llm_speak(PROMPT):
+            for chunk in chunker.feed(token):
+                tts.append(asyncio.create_task(synthesize(chunk)))
+        tail = chunker.flush()
+        if tail:
+            tts.append(asyncio.create_task(synthesize(tail)))
+        audio = await asyncio.gather(*tts)
+        return {"route": route, "tts_chunks": len(audio), "audio_bytes": sum(map(len, audio))}
+    finally:
+        await providers.aclose()
+
+
+async def generate_blocking(server: FakeLLMServer) -> dict:
+    """What the sync clients did: block the loop for every provider call"""
+    with httpx.Client(base_url=server.url, timeout=30) as client:
+        client.post("/openai/v1/chat/completions", json={})
+        client.post("/v1/messages", json={"stream": False})
+        client.post("/v1/text-to-speech/fake", json={"text": "hello"})
+    return {"route": "speak"}
+
+
+def run(server: FakeLLMServer, blocking: bool) -> dict:
+    loop = asyncio.new_event_loop()
+    lags = []
+    stop = threading.Event()
+
+    async def on_transcript(sent: float) -> None:
+        lags.append((time.perf_counter() - sent) * 1000)
+
+    def transcript_events():
+        while not stop.wait(EVENT_INTERVAL):
+            asyncio.run_coroutine_threadsafe(on_transcript(time.perf_counter()), loop)
+
+    providers = None
+    if not blocking:
+        # Built before the events start, as the app's warm-up thread does
+        providers = Providers(anthropic_base_url=server.url, groq_base_url=server.url,
+                              elevenlabs_base_url=server.url)
+        providers.warm()
+
+    events = threading.Thread(target=transcript_events, daemon=True)
+    events.start()
+    started = time.perf_counter()
+    try:
+        result = loop.run_until_complete(generate_blocking(server) if blocking else generate(providers))
+        # Let the last queued events run
+        loop.run_until_complete(asyncio.sleep(EVENT_INTERVAL * 2))
+    finally:
+        stop.set()
+        events.join()
+        loop.close()
+
+    result.update({
+        "mode": "blocking" if blocking else "async",
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "events": len(lags),
+        "lag_p50_ms": round(statistics.median(lags), 2) if lags else None,
+        "lag_max_ms": round(max(lags), 2) if lags else None,
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocking", action="store_true", help="run the synchronous baseline")
+    parser.add_argument("--stall", type=float, default=1.0, help="seconds each provider stalls")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    for key in ("ANTHROPIC_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY"):
+        os.environ.setdefault(key, "fake")
+    # The app imports the SDKs on its warm-up thread once the window shows, so
+    # the first response never pays for them on the loop; do the same here
+    warm_in_background(["anthropic", "groq", "elevenlabs.client"]).join()
+
+    with FakeLLMServer(first_token_delay=args.stall, token_delay=0.02,
+                       router_delay=args.stall, tts_delay=args.stall / 2) as server:
+        result = run(server, args.blocking)
+    result["max_lag_ms_allowed"] = args.max_lag_ms
+    result["passed"] = result["lag_max_ms"] is not None and result["lag_max_ms"] <= args.max_lag_ms
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
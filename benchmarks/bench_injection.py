@@ -0,0 +1,79 @@
+"""
+Text injection throughput with and without coalescing.
+
+A FakeInjector charges a fixed cost per call (the fork+exec of an
+osascript/xdotool process is ~5-20ms) plus a small cost per key. Dictation
+fragments are fed in bursts the way interim results arrive, and we measure
+how long until the text is all on "screen" and how many calls it took.
+
+    python -m benchmarks.bench_injection --fragments 500 --call-ms 10
+"""
+
+import argparse
+import json
+import random
+import time
+
+from src.spritely.core.text_injection import FakeInjector, InjectionQueue
+
+
+def workload(fragments: int, seed: int = 0):
+    """(op, value) pairs: words typed, with the odd correction"""
+    rng = random.Random(seed)
+    words = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "meeting", "tomorrow"]
+    ops, expected = [], ""
+    for _ in range(fragments):
+        if expected and rng.random() < 0.15:
+            n = rng.randint(1, min(4, len(expected)))
+            ops.append(("backspace", n))
+            expected = expected[:-n]
+        else:
+            word = rng.choice(words) + " "
+            ops.append(("type", word))
+            expected += word
+    return ops, expected
+
+
+def run(ops, expected, window, call_ms: float, key_ms: float, burst: int, gap_ms: float):
+    """window=None sends every fragment straight to the injector, one call each"""
+    fake = FakeInjector(call_latency=call_ms / 1000, key_latency=key_ms / 1000)
+    queue = InjectionQueue(fake, window=window) if window is not None else None
+    target = queue or fake
+    started = time.perf_counter()
+    for i, (kind, value) in enumerate(ops):
+        getattr(target, kind)(value)
+        if (i + 1) % burst == 0:
+            time.sleep(gap_ms / 1000)
+    submitted = time.perf_counter()
+    if queue is not None:
+        queue.close(timeout=120)
+    finished = time.perf_counter()
+    assert fake.buffer == expected, "injected text does not match"
+    return {
+        "mode": "direct" if queue is None else f"queue ({window * 1000:.0f}ms window)",
+        "seconds": round(finished - started, 3),
+        # How far behind the speaker the text is once the last fragment arrives
+        "trailing_lag_ms": round((finished - submitted) * 1000, 1),
+        "injector_calls": fake.calls,
+        "keys": fake.keys,
+        "caller_blocked_ms": round((submitted - started) * 1000 - len(ops) // burst * gap_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fragments", type=int, default=500)
+    parser.add_argument("--call-ms", type=float, default=10.0, help="fixed cost per injector call")
+    parser.add_argument("--key-ms", type=float, default=0.2, help="cost per keystroke")
+    parser.add_argument("--burst", type=int, default=5, help="fragments arriving together")
+    parser.add_argument("--gap-ms", type=float, default=20.0, help="pause between bursts")
+    args = parser.parse_args()
+
+    ops, expected = workload(args.fragments)
+    results = [run(ops, expected, window, args.call_ms, args.key_ms, args.burst, args.gap_ms)
+               for window in (None, 0.0, 0.03)]
+    print(json.dumps({"fragments": len(ops), "runs": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
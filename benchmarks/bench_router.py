@@ -0,0 +1,100 @@
+"""
+Response-type routing: local classifier vs the remote Groq router.
+
+Runs the labelled eval split through both and reports accuracy, how many
+prompts the local router would hand to the remote one, and latency.
+
+    python -m benchmarks.bench_router             # local only
+    python -m benchmarks.bench_router --remote    # also call Groq (needs GROQ_API_KEY)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.spritely.core.response_router import DEFAULT_THRESHOLD, ResponseRouter, load_dataset
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarise(name, correct, total, latencies_ms, **extra):
+    result = {
+        "router": name,
+        "accuracy": round(correct / total, 4),
+        "examples": total,
+        "p50_ms": round(statistics.median(latencies_ms), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+    }
+    result.update(extra)
+    return result
+
+
+def bench_local(rows, threshold):
+    # Train into a scratch file so the benchmark never touches the user's model
+    with tempfile.TemporaryDirectory() as tmp:
+        router = ResponseRouter(model_file=Path(tmp) / "router.json", threshold=threshold)
+        t0 = time.perf_counter()
+        router.model
+        train_ms = (time.perf_counter() - t0) * 1000
+
+        correct = confident = confident_correct = 0
+        latencies = []
+        for row in rows:
+            t0 = time.perf_counter()
+            label, confidence, _ = router.classify(row["text"])
+            latencies.append((time.perf_counter() - t0) * 1000)
+            correct += label == row["label"]
+            if router.is_confident(confidence):
+                confident += 1
+                confident_correct += label == row["label"]
+
+    return summarise(
+        "local", correct, len(rows), latencies,
+        train_ms=round(train_ms, 1),
+        threshold=threshold,
+        answered_locally=confident,
+        local_precision=round(confident_correct / confident, 4) if confident else None,
+    )
+
+
+async def bench_remote(rows):
+    from src.spritely.core.invoke_llm import remote_response_type
+
+    correct = errors = 0
+    latencies = []
+    for row in rows:
+        t0 = time.perf_counter()
+        try:
+            label = await remote_response_type(row["text"])
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+        correct += label == row["label"]
+    return summarise("groq", correct, len(rows), latencies or [0.0], errors=errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--remote", action="store_true", help="also benchmark the Groq router")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--split", default="eval")
+    args = parser.parse_args()
+
+    rows = load_dataset(args.split)
+    results = [bench_local(rows, args.threshold)]
+    if args.remote:
+        results.append(asyncio.run(bench_remote(rows)))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
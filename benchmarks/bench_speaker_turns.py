@@ -0,0 +1,96 @@
+"""
+Speaker-turn segmentation and analytics on a synthetic diarized meeting.
+
+Generates a meeting of --hours with --speakers taking turns (including
+results that mix speakers and occasional cross-talk), then times
+find_turns, speaker_stats and turn_records.
+
+    python -m benchmarks.bench_speaker_turns --hours 3
+"""
+
+import argparse
+import json
+import random
+import time
+
+from src.spritely.core.speaker_turns import find_turns, speaker_stats, turn_records
+from src.spritely.core.word_table import WordTable
+
+WORDS_PER_SECOND = 2.5
+RESULT_WORDS = 12
+
+
+def synthetic_meeting(hours: float, speakers: int, seed: int = 0):
+    """Transcript-log style records with compact word rows"""
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(5000)]
+    records, row_buffer = [], []
+    t, speaker = 0.0, 0
+    total = hours * 3600
+    while t < total:
+        # A turn of 3-40 words, sometimes overlapping the previous speaker
+        if rng.random() < 0.05:
+            t -= 0.5
+        for _ in range(rng.randint(3, 40)):
+            duration = rng.uniform(0.15, 0.6)
+            row_buffer.append([rng.choice(vocab), round(t, 3), round(t + duration, 3), speaker, 0.95])
+            t += 1 / WORDS_PER_SECOND
+            if len(row_buffer) == RESULT_WORDS:
+                records.append(_record(len(records), row_buffer))
+                row_buffer = []
+        t += rng.uniform(0.1, 2.5)
+        speaker = rng.choice([s for s in range(speakers) if s != speaker] or [speaker])
+    if row_buffer:
+        records.append(_record(len(records), row_buffer))
+    return records
+
+
+def _record(index, rows):
+    return {
+        'timestamp': "2025-01-01T00:00:00",
+        'transcript': " ".join(r[0] for r in rows),
+        'confidence': 0.95,
+        'speaker': rows[0][3],
+        'start_time': rows[0][1],
+        'duration': rows[-1][2] - rows[0][1],
+        'request_id': f"req-{index}",
+        'words': rows,
+    }
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    records = synthetic_meeting(args.hours, args.speakers)
+    table, build_ms = timed(WordTable.from_records, records)
+    turns, turns_ms = timed(find_turns, table)
+    stats, stats_ms = timed(speaker_stats, table, turns)
+    exported, export_ms = timed(turn_records, records, table)
+
+    analysis_ms = turns_ms + stats_ms
+    print(json.dumps({
+        "hours": args.hours,
+        "results": len(records),
+        "words": len(table),
+        "turns": len(turns),
+        "build_table_ms": build_ms,
+        "find_turns_ms": turns_ms,
+        "speaker_stats_ms": stats_ms,
+        "turn_records_ms": export_ms,
+        "within_budget": analysis_ms + export_ms <= args.budget_ms,
+        "speakers": {str(s): {k: round(v, 1) for k, v in d.items()} for s, d in stats.items()},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
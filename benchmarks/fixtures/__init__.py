@@ -0,0 +1,54 @@
+"""
+Fixtures for the offline benchmarks.
+
+voice_session.json holds canned Deepgram transcripts, the Anthropic
+response and meeting summary, and the provider latencies the stand-in
+servers reproduce. Audio is either a real recording (e.g. one kept with
+record_meeting_audio) or deterministic speech-like audio generated here,
+so runs are comparable without shipping audio files.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+FIXTURE_DIR = Path(__file__).parent
+
+
+def load_fixture(name: str = "voice_session") -> Dict:
+    with open(FIXTURE_DIR / f"{name}.json") as f:
+        return json.load(f)
+
+
+def load_recording(path, rate: int = 16000) -> np.ndarray:
+    """Mono int16 samples from a recording (WAV, or anything ffmpeg reads)"""
+    from src.spritely.core.batch_transcribe import read_audio
+    return read_audio(path, rate=rate)
+
+
+def speech_like(seconds: float, rate: int = 16000, channels: int = 1, seed: int = 0,
+                speech_seconds=(1.0, 3.0), pause_seconds=(0.8, 1.6), level: float = 4000,
+                leading_silence: float = 0.3) -> np.ndarray:
+    """Voiced bursts (a pitch with harmonics, ~4 syllables a second) separated by room noise.
+
+    Loud enough for the energy VAD and with pauses longer than its hangover,
+    so each burst is one utterance. Interleaved int16 if channels > 1.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * rate)
+    out = rng.normal(0, 40, n)
+    t = int(leading_silence * rate)
+    while t < n:
+        length = min(int(rng.uniform(*speech_seconds) * rate), n - t)
+        ts = np.arange(length) / rate
+        pitch = rng.uniform(110, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * ts + rng.uniform(0, np.pi)) / k for k in range(1, 6))
+        syllables = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3.5, 5.0) * ts) ** 2
+        out[t:t + length] += level * voiced * syllables / 1.6
+        t += length + int(rng.uniform(*pause_seconds) * rate)
+    samples = np.clip(out, -32768, 32767).astype(np.int16)
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    return samples
@@ -0,0 +1,535 @@
+"""
+Offline latency and throughput suite.
+
+Replays fixture audio (or a real recording) and the canned provider
+responses in benchmarks/fixtures through local stand-in servers
+(FakeDeepgramServer, FakeLLMServer) that reproduce the fixture's provider
+latencies, and measures:
+
+    activation      hotkey -> ASR ready / first final, and stop -> route / first token /
+                    first audio, read from the pipeline's own traces
+    capture_cpu     CPU time of the capture thread (downmix, resample, VAD, ASR send)
+    meeting_memory  memory held per meeting hour (transcript log and word table)
+    summary         streamed summary time, and what is left at stop with the live summariser
+    startup         `python -X importtime -c "import main"` in a fresh interpreter: import
+                    time, the heaviest packages, and any deferred SDK loaded at startup
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --latency-scale 0       # CI: our own overhead only
+    python -m benchmarks.suite --only activation --audio meetings/audio/transcription_x.flac
+    python -m benchmarks.suite --compare baseline.json --tolerance 0.2
+    python -m benchmarks.suite --only startup --iterations 10
+
+Nothing leaves the machine, and HOME points at a scratch directory for the
+run so traces, metrics and the router model never touch the user's own.
+Every number under "metrics" is lower-is-better; --compare exits non-zero
+if any is worse than the baseline by more than --tolerance. The run also
+exits non-zero if startup imported one of lazy.DEFERRED_MODULES.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from benchmarks.fixtures import load_fixture, load_recording, speech_like
+
+SCHEMA = 1
+BENCHMARKS = ("activation", "capture_cpu", "meeting_memory", "summary", "startup")
+# What the microphone delivers (audio_utils RATE/CHANNELS) and what the ASR gets
+DEVICE_RATE, DEVICE_CHANNELS = 44100, 2
+ASR_RATE = 16000
+
+
+def stats(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def latencies(fixture: Dict, scale: float) -> Dict[str, float]:
+    return {name: seconds * scale for name, seconds in fixture["latency"].items()}
+
+
+def meeting_records(phrases: List[str], seconds: float, speakers: int = 3,
+                    word_seconds: float = 0.4, gap: float = 0.6) -> Iterator[Dict]:
+    """Utterance records as the meeting transcriber stores them, for `seconds` of meeting"""
+    from src.spritely.core.asr import AsrResult, AsrWord
+    from src.spritely.core.transcript_log import utterance_record
+
+    began = datetime(2024, 1, 1, 9, 0)
+    t, i = 0.0, 0
+    while t < seconds:
+        tokens = phrases[i % len(phrases)].split()
+        speaker = i % speakers
+        words = [AsrWord(w, t + k * word_seconds, t + (k + 1) * word_seconds, 0.95, speaker, w)
+                 for k, w in enumerate(tokens)]
+        duration = len(tokens) * word_seconds
+        result = AsrResult.from_text(" ".join(tokens), t, duration, words=words)
+        yield utterance_record(result, (began + timedelta(seconds=t)).isoformat())
+        t += duration + gap
+        i += 1
+
+
+def device_audio(samples_mono: np.ndarray) -> np.ndarray:
+    """Interleave mono samples into the capture engine's channel layout"""
+    return np.repeat(samples_mono, DEVICE_CHANNELS) if DEVICE_CHANNELS > 1 else samples_mono
+
+
+def asr_options():
+    from src.spritely.core.asr import AsrOptions
+    return AsrOptions(model="nova-2", sample_rate=ASR_RATE, language="en-GB", punctuate=True)
+
+
+def bench_activation(fixture: Dict, scale: float, iterations: int, recording: Optional[np.ndarray],
+                     trace_file: Path) -> Dict:
+    """Voice activations end to end, as SpeechTranscriber runs them"""
+    from src.spritely.core.asr import DeepgramBackend
+    from src.spritely.core.invoke_llm import process_prompt
+    from src.spritely.core.providers import Providers, set_providers
+    from src.spritely.core.speech_pipeline import NullOutput, set_output_factory
+    from src.spritely.testing.fake_deepgram import FakeDeepgramServer
+    from src.spritely.testing.fake_llm import FakeLLMServer
+    from src.spritely.testing.replay_capture import ReplayCaptureEngine
+    from src.spritely.utils.tracing import Trace, bind, mark, span, use_trace
+    from src.spritely.utils.vad import VADGate, get_detector
+
+    lat = latencies(fixture, scale)
+    # Finals come from Finalize at the end of each utterance, as with Deepgram's endpointing
+    asr_server = FakeDeepgramServer(fixture["utterances"], utterance_seconds=60,
+                                    latency=lat["asr_final"]).start()
+    llm_server = FakeLLMServer(response=fixture["response"], route=fixture["route"],
+                               first_token_delay=lat["first_token"], token_delay=lat["token"],
+                               router_delay=lat["router"], tts_delay=lat["tts"]).start()
+    providers = Providers(anthropic_base_url=llm_server.url, groq_base_url=llm_server.url,
+                          elevenlabs_base_url=llm_server.url)
+    set_output_factory(NullOutput)
+    backend = DeepgramBackend(asr_options, name="bench", url=asr_server.url, api_key="fake")
+    backend.prewarm()
+
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+
+    async def use_providers():
+        # Clients are per event loop: install them on the loop process_prompt runs on
+        set_providers(providers)
+    asyncio.run_coroutine_threadsafe(use_providers(), loop).result()
+
+    def activate(samples: np.ndarray, rate: int, channels: int) -> Dict:
+        # Enough trailing silence for the VAD hangover to end the utterance
+        engine = ReplayCaptureEngine(samples, rate=rate, channels=channels, tail_seconds=1.0)
+        finals, got_final = [], threading.Event()
+
+        def on_final(result):
+            text = result.channel.alternatives[0].transcript.strip()
+            if text:
+                mark("first_final", once=True)
+                finals.append(text)
+                got_final.set()
+
+        pressed = time.monotonic()
+        trace = Trace("voice", started=pressed, benchmark=True)
+        with use_trace(trace):
+            mark("hotkey", at=pressed)
+            with span("mic_open"):
+                stream = engine.subscribe(target_rate=ASR_RATE, mono=True)
+            with span("asr_open"):
+                session = backend.open_session(on_final=bind(on_final))
+            vad = VADGate(get_detector("energy"), rate=stream.rate, on_speech_end=session.finalize)
+            stop = threading.Event()
+
+            def send(data):
+                mark("first_speech_sent", once=True)
+                session.send(data)
+
+            def capture():
+                while not stop.is_set():
+                    data = stream.read(timeout=0.1)
+                    if data:
+                        vad.feed(data, send, session.keep_alive)
+
+            capture_thread = threading.Thread(target=bind(capture), name="bench-capture")
+            capture_thread.start()
+            engine.done.wait()
+            got_final.wait(5)
+
+            # The user presses the hotkey again once they have finished speaking
+            mark("stop_hotkey")
+            with span("process_prompt"):
+                asyncio.run_coroutine_threadsafe(process_prompt(" ".join(finals)), loop).result(60)
+            stop.set()
+            capture_thread.join()
+            stream.close()
+            session.finish()
+        engine.shutdown()
+        trace.finish(trace_file)
+        return trace.to_dict()
+
+    traces = []
+    try:
+        for i in range(iterations):
+            if recording is not None:
+                # Consecutive 3 second slices of the recording
+                start = (i * 3 * ASR_RATE) % max(1, len(recording) - 3 * ASR_RATE)
+                traces.append(activate(recording[start:start + 3 * ASR_RATE], ASR_RATE, 1))
+            else:
+                samples = speech_like(2.5, rate=DEVICE_RATE, seed=i, speech_seconds=(2.0, 2.0))
+                traces.append(activate(device_audio(samples), DEVICE_RATE, DEVICE_CHANNELS))
+    finally:
+        backend.close()
+        asyncio.run_coroutine_threadsafe(providers.aclose(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(5)
+        set_output_factory(None)
+        asr_server.stop()
+        llm_server.stop()
+
+    def at(trace: Dict, name: str, end: bool = False) -> Optional[float]:
+        for s in trace["spans"]:
+            if s["name"] == name and s["duration_ms"] is not None:
+                return s["start_ms"] + (s["duration_ms"] if end else 0)
+        return None
+
+    stages = {
+        "hotkey_to_asr_ready_ms": lambda t: at(t, "asr_open", end=True),
+        "hotkey_to_first_speech_sent_ms": lambda t: at(t, "first_speech_sent"),
+        "hotkey_to_first_final_ms": lambda t: at(t, "first_final"),
+        "stop_to_route_ms": lambda t: at(t, "route_decision") - at(t, "stop_hotkey"),
+        "stop_to_first_token_ms": lambda t: at(t, "first_token") - at(t, "stop_hotkey"),
+        "stop_to_first_audio_ms": lambda t: at(t, "first_audio") - at(t, "stop_hotkey"),
+        "hotkey_to_first_audio_ms": lambda t: at(t, "first_audio"),
+    }
+    metrics, missing = {}, {}
+    for name, measure in stages.items():
+        values = []
+        for trace in traces:
+            try:
+                value = measure(trace)
+            except TypeError:
+                # None in the arithmetic: a stage that never happened
+                value = None
+            if value is None:
+                missing[name] = missing.get(name, 0) + 1
+            else:
+                values.append(value)
+        if values:
+            for stat, value in stats(values).items():
+                metrics[f"{name[:-3]}_{stat}_ms"] = value
+    return {"metrics": metrics, "info": {"iterations": iterations, "missing_stages": missing,
+                                         "llm_requests": llm_server.requests,
+                                         "asr_connections": asr_server.connections}}
+
+
+def bench_capture_cpu(fixture: Dict, seconds: float, speed: float, recording: Optional[np.ndarray]) -> Dict:
+    """CPU the capture thread spends per second of audio, ASR sends included"""
+    from src.spritely.core.asr import DeepgramBackend
+    from src.spritely.testing.fake_deepgram import FakeDeepgramServer
+    from src.spritely.testing.replay_capture import ReplayCaptureEngine
+    from src.spritely.utils.vad import VADGate, get_detector
+
+    if recording is not None:
+        samples, rate, channels = recording[:int(seconds * ASR_RATE)], ASR_RATE, 1
+    else:
+        samples = device_audio(speech_like(seconds, rate=DEVICE_RATE, seed=1))
+        rate, channels = DEVICE_RATE, DEVICE_CHANNELS
+
+    with FakeDeepgramServer(fixture["utterances"], utterance_seconds=60) as server:
+        backend = DeepgramBackend(asr_options, name="bench-capture", url=server.url, api_key="fake")
+        engine = ReplayCaptureEngine(samples, rate=rate, channels=channels, speed=speed)
+        # Room for the whole recording, so a slow consumer shows up as time, not drops
+        stream = engine.subscribe(target_rate=ASR_RATE, mono=True,
+                                  max_chunks=math.ceil(len(samples) / (engine.chunk * channels)) + 1)
+        session = backend.open_session(on_final=lambda result: None)
+        vad = VADGate(get_detector("energy"), rate=stream.rate, on_speech_end=session.finalize)
+        measured = {}
+
+        def capture():
+            cpu, wall = time.thread_time(), time.perf_counter()
+            while True:
+                data = stream.read(timeout=0.2)
+                if data:
+                    vad.feed(data, session.send, session.keep_alive)
+                elif engine.done.is_set():
+                    break
+            measured["cpu"] = time.thread_time() - cpu
+            measured["wall"] = time.perf_counter() - wall
+
+        thread = threading.Thread(target=capture, name="bench-capture")
+        thread.start()
+        thread.join()
+        stream.close()
+        session.finish()
+        engine.shutdown()
+        backend.close()
+
+    audio_seconds = engine.seconds
+    return {
+        "metrics": {
+            "cpu_ms_per_audio_second": round(measured["cpu"] * 1000 / audio_seconds, 3),
+            "cpu_percent_of_realtime": round(measured["cpu"] / audio_seconds * 100, 3),
+        },
+        "info": {"audio_seconds": round(audio_seconds, 1), "input": f"{channels}ch @ {rate}Hz",
+                 "speed": speed, "dropped_chunks": stream.dropped_chunks,
+                 "frames_sent": vad.frames_sent, "frames_suppressed": vad.frames_suppressed},
+    }
+
+
+def bench_meeting_memory(fixture: Dict, hours: float) -> Dict:
+    """Memory the meeting transcriber holds as a meeting grows"""
+    from src.spritely.core.transcript_log import new_session
+    from src.spritely.core.word_table import WordTable
+
+    records = meeting_records(fixture["meeting_phrases"], hours * 3600)
+    # Start the generator (and its imports) before anything is traced
+    first = next(records)
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        # The same structures TranscriberApp.on_message appends to
+        log = new_session(tmp)
+        words = WordTable()
+        for record in itertools.chain([first], records):
+            log.append(record)
+            words.append_words(record['words'], utterance=len(log) - 1)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        utterances = len(log)
+        log.close()
+
+    return {
+        "metrics": {
+            "bytes_per_meeting_hour": round((current - baseline) / hours),
+            "peak_bytes_per_meeting_hour": round((peak - baseline) / hours),
+        },
+        "info": {"hours": hours, "utterances": utterances, "words": len(words),
+                 "word_table_bytes": words.nbytes},
+    }
+
+
+def bench_summary(fixture: Dict, scale: float, minutes: float) -> Dict:
+    """Summarising a meeting: in one streamed request, and the tail left by the live summariser"""
+    from anthropic import Anthropic
+
+    from src.spritely.core import ai_summarise
+    from src.spritely.core.meeting_summariser import MeetingSummariser, format_utterance
+    from src.spritely.testing.fake_llm import FakeLLMServer
+
+    lat = latencies(fixture, scale)
+    records = list(meeting_records(fixture["meeting_phrases"], minutes * 60))
+    transcript = "\n".join(format_utterance(r) for r in records)
+
+    with FakeLLMServer(response=fixture["summary"], first_token_delay=lat["first_token"],
+                       token_delay=lat["token"]) as server:
+        # The summary functions share one module-level client
+        ai_summarise.anthropic_client.set(Anthropic(base_url=server.url, api_key="fake"))
+
+        started, first = time.perf_counter(), None
+        for _ in ai_summarise.stream_summary(transcript):
+            first = first or time.perf_counter()
+        streamed = time.perf_counter()
+
+        # Live: the meeting arrives over time and is summarised as it goes
+        live: List[Dict] = []
+        summariser = MeetingSummariser(live, poll_interval=0.05).start()
+        step = max(1, len(records) // 20)
+        for i in range(0, len(records), step):
+            live.extend(records[i:i + step])
+            time.sleep(0.1)
+        while not all(f.done() for level in summariser.levels for f in level):
+            time.sleep(0.05)
+        stopped = time.perf_counter()
+        summariser.finish().result(120)
+        finished = time.perf_counter()
+
+    return {
+        "metrics": {
+            "streamed_first_token_ms": round((first - started) * 1000, 1),
+            "streamed_total_ms": round((streamed - started) * 1000, 1),
+            "live_stop_to_summary_ms": round((finished - stopped) * 1000, 1),
+        },
+        "info": {"meeting_minutes": minutes, "transcript_chars": len(transcript),
+                 "live_segments": summariser.segments, "llm_requests": server.requests},
+    }
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """`-X importtime` lines as {"name", "depth", "self_us", "cumulative_us"}, in import order"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue  # the header
+        name = name[1:]
+        stripped = name.lstrip(" ")
+        imports.append({"name": stripped, "depth": (len(name) - len(stripped)) // 2,
+                        "self_us": int(own), "cumulative_us": int(cumulative)})
+    return imports
+
+
+def bench_startup(runs: int, module: str = "main") -> Dict:
+    """Import time of the app in a fresh interpreter, and which deferred SDKs it loaded"""
+    from src.spritely.utils.lazy import DEFERRED_MODULES
+
+    root = Path(__file__).resolve().parent.parent
+    totals, process, imports = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=root, env=os.environ.copy(), capture_output=True, text=True)
+        process.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode
+            raise RuntimeError(f"import {module} failed: {error}")
+        imports = parse_importtime(result.stderr)
+        totals.append(sum(i["cumulative_us"] for i in imports if i["depth"] == 0) / 1000)
+
+    # Each module's own time, summed per top-level package (so nothing is counted twice)
+    by_package: Dict[str, int] = {}
+    for i in imports:
+        package = i["name"].split(".")[0]
+        if package != module.split(".")[0]:
+            by_package[package] = by_package.get(package, 0) + i["self_us"]
+    heaviest = sorted(by_package.items(), key=lambda p: p[1], reverse=True)[:10]
+    loaded = sorted({i["name"].split(".")[0] for i in imports} & set(DEFERRED_MODULES))
+    import_ms, process_ms = stats(totals), stats(process)
+    return {
+        "metrics": {
+            "import_p50_ms": import_ms["p50"],
+            "import_p95_ms": import_ms["p95"],
+            "process_p50_ms": process_ms["p50"],
+            "modules_imported": len(imports),
+        },
+        "info": {"module": module, "runs": runs, "deferred_loaded": loaded,
+                 "heaviest_packages_ms": {name: round(us / 1000, 1) for name, us in heaviest}},
+    }
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {"created": datetime.now().isoformat(timespec="seconds"), "git_commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics that got worse than baseline by more than tolerance (a fraction)"""
+    regressions = []
+    for bench, result in results["results"].items():
+        before = baseline.get("results", {}).get(bench, {}).get("metrics", {})
+        for name, value in result["metrics"].items():
+            old = before.get(name)
+            if old is None:
+                continue
+            change = (value - old) / old if old else 0.0
+            line = f"  {bench}.{name:<40} {old:>12} -> {value:<12} {change:+.1%}"
+            print(("❌" if change > tolerance else "  ") + line, file=sys.stderr)
+            if change > tolerance:
+                regressions.append(f"{bench}.{name}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="smaller runs, for CI")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="multiplier for the fixture's provider latencies (0: none)")
+    parser.add_argument("--audio", help="replay this recording instead of generated speech")
+    parser.add_argument("--iterations", type=int, help="voice activations (or startup runs) to run")
+    parser.add_argument("--output", help="write the JSON results here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    # Before anything under src/ is imported: config paths are fixed at import time
+    scratch = tempfile.mkdtemp(prefix="spritely-bench-")
+    os.environ["HOME"] = scratch
+    for key in ("ANTHROPIC_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_API_KEY"):
+        os.environ[key] = "fake"
+
+    fixture = load_fixture()
+    recording = load_recording(args.audio, rate=ASR_RATE) if args.audio else None
+    config = {
+        "quick": args.quick,
+        "latency_scale": args.latency_scale,
+        "audio": args.audio or "generated",
+        "iterations": args.iterations or (5 if args.quick else 20),
+        "capture_seconds": 30 if args.quick else 300,
+        "capture_speed": 20.0,
+        "meeting_hours": 0.5 if args.quick else 3.0,
+        "summary_minutes": 15 if args.quick else 60,
+        "startup_runs": args.iterations or (3 if args.quick else 10),
+    }
+    trace_file = Path(scratch) / "traces.jsonl"
+
+    results = {}
+    for name in selected:
+        print(f"⏱️ {name}...", file=sys.stderr)
+        if name == "activation":
+            results[name] = bench_activation(fixture, args.latency_scale, config["iterations"],
+                                             recording, trace_file)
+        elif name == "capture_cpu":
+            results[name] = bench_capture_cpu(fixture, config["capture_seconds"], config["capture_speed"],
+                                              recording)
+        elif name == "meeting_memory":
+            results[name] = bench_meeting_memory(fixture, config["meeting_hours"])
+        elif name == "summary":
+            results[name] = bench_summary(fixture, args.latency_scale, config["summary_minutes"])
+        elif name == "startup":
+            results[name] = bench_startup(config["startup_runs"])
+
+    report = {"schema": SCHEMA, "environment": environment(), "config": config, "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    if trace_file.exists():
+        print(f"🧭 Activation traces: python -m src.spritely.utils.tracing --file {trace_file} --summary",
+              file=sys.stderr)
+
+    heavy = results.get("startup", {}).get("info", {}).get("deferred_loaded")
+    if heavy:
+        print(f"❌ Imported at startup, should be deferred: {', '.join(heavy)}", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        print(f"\nCompared with {args.compare}:", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+    if heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
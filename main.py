@@ -1,5 +1,3 @@
-import pyaudio
-from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
 import threading
 from datetime import datetime
 from dotenv import load_dotenv
@@ -8,17 +6,25 @@ from pynput import keyboard
 import os
 import asyncio
 import sys
-
-from elevenlabs.client import ElevenLabs
-from elevenlabs import stream as play_audio
+import time
 
 from src.spritely.utils.logging import setup_logging
 from src.spritely.utils.user_settings import settings
 from src.spritely.gui.gui import SpritelyGUI
-from src.spritely.utils.audio_utils import check_permissions, FORMAT, CHANNELS, RATE, CHUNK
+from src.spritely.utils.audio_utils import check_permissions
+from src.spritely.utils.audio_engine import capture_engine
+from src.spritely.utils.vad import VADGate, get_detector
 from src.spritely.core.transcribe_meeting import TranscriberApp
 from src.spritely.core.transcribe_field import SpeechTranscriber as FieldTranscriber
 from src.spritely.core.invoke_llm import process_prompt
+from src.spritely.core.response_router import response_router
+from src.spritely.core.asr import AsrOptions, create_backend, ensure_backend
+from src.spritely.core.earcons import earcon_cache, WAKE_PHRASE, THINKING_PHRASE
+from src.spritely.utils.tracing import Trace, bind, mark, span, use_trace
+from src.spritely.utils.lazy import warm_in_background
+from src.spritely.core import ai_summarise
+from src.spritely.core.browser import prewarm_browser
+from src.spritely.core.providers import warm_providers
 
 # Move logger initialization to the top, right after imports
 logger = setup_logging(__name__)
@@ -30,38 +36,47 @@ if not eleven_labs_api_key:
     logger.error("ELEVENLABS_API_KEY not found in environment variables")
     raise ValueError("ELEVENLABS_API_KEY is required")
 
-eleven_labs = ElevenLabs(
-    api_key=eleven_labs_api_key
-    )
-
 """ transcribed audio to cursor/input field """
 
-# Audio settings
-FORMAT = pyaudio.paInt16
-CHANNELS = 2
-RATE = 44100
-CHUNK = 1024
-
 class SpeechTranscriber:
     def __init__(self):
         logger.info("Initializing SpeechTranscriber")
         self.current_transcription = ""
         self.is_recording = False
-        self.audio = None
         self.stream = None
-        self.dg_connection = None
+        self.asr_session = None
+        self.vad = None
         self.audio_thread = None
         self.should_stop = None
         self.loop = asyncio.new_event_loop()
+        # Runs for the life of the app: the provider clients and the warm
+        # browser live on it between activations
+        threading.Thread(target=self._run_event_loop, name="spritely-loop", daemon=True).start()
         self.collecting_transcript = False
         self.collected_transcript = []
+        self.trace = None
+        # Warm, reusable ASR connection so activations skip the handshake
+        self.asr = create_backend(self.asr_options, name="spritely")
+
+    def asr_options(self) -> AsrOptions:
+        # Audio is downmixed to mono at the configured rate before streaming
+        return AsrOptions(
+            model="nova-2",
+            sample_rate=settings['transcription_sample_rate'],
+            language="en-GB",
+            punctuate=True,  # Enable punctuation
+            interim_results=False  # Only get final results
+        )
+
+    def _run_event_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
 
-    def message_handler(self, event, result):
+    def message_handler(self, result):
         """Synchronous wrapper for the async message handler"""
-        asyncio.run_coroutine_threadsafe(self.on_message(event, result), self.loop)
+        asyncio.run_coroutine_threadsafe(self.on_message(result), self.loop)
 
-    async def on_message(self, event, result):
-        logger.debug(f"Received message - Event type: {event}")
+    async def on_message(self, result):
         logger.debug(f"Result type: {type(result)}")
         try:
             timestamp = datetime.now().isoformat()
@@ -73,6 +88,7 @@ class SpeechTranscriber:
                     transcript = transcript.strip() + " "
                     
                     if transcript.strip():
+                        mark("first_final", once=True)
                         self.collected_transcript.append(transcript.strip())
                         logger.info(f"Added to transcript: {transcript.strip()}")
                     
@@ -82,11 +98,20 @@ class SpeechTranscriber:
         except Exception as e:
             logger.error(f"Error in transcription: {e}", exc_info=True)
 
-    def start_recording(self):
+    def start_recording(self, pressed_at=None):
         if self.is_recording:
             logger.info("Recording already in progress")
             return
 
+        # One trace per activation, from the hotkey press to the end of the response
+        self.trace = Trace("voice", started=pressed_at, hotkey="cmd+alt+k")
+        with use_trace(self.trace):
+            mark("hotkey", at=pressed_at)
+            if not self._start_recording():
+                self.trace.finish()
+                self.trace = None
+
+    def _start_recording(self) -> bool:
         logger.info("Starting recording...")
         self.is_recording = True
         self.current_transcription = ""
@@ -100,101 +125,73 @@ class SpeechTranscriber:
         
         # Play confirmation sound
         logger.info("Playing wake sound")
-        audio_stream = eleven_labs.generate(
-            text="Spritely here",
-            voice="OOjDveYEA7KnRY2FRSmX",
-            model="eleven_multilingual_v2",
-            stream=True
-        )
-        play_audio(audio_stream)
+        earcon_cache.play(WAKE_PHRASE)
         
-        # Initialize audio and print device info
-        self.audio = pyaudio.PyAudio()
-        
-        # Use saved microphone preference
-        mic_index = settings['microphone_index']
-        if mic_index is not None:
-            input_device = self.audio.get_device_info_by_index(mic_index)
-        else:
-            input_device = self.audio.get_default_input_device_info()
+        # Attach to the shared capture engine (opens the mic only on first use)
+        with span("mic_open"):
+            self.stream = capture_engine.subscribe(
+                target_rate=settings['transcription_sample_rate'], mono=True)
+        input_device = capture_engine.input_device
             
         logger.info(f"Recording using: {input_device['name']}")
         logger.debug(f"Sample Rate: {input_device['defaultSampleRate']}Hz")
         logger.debug(f"Max Input Channels: {input_device['maxInputChannels']}")
         
-        deepgram = DeepgramClient()
-
-
-        # Start the event loop in a separate thread
-        def run_event_loop():
-            asyncio.set_event_loop(self.loop)
-            self.loop.run_forever()
-        
-        threading.Thread(target=run_event_loop, daemon=True).start()
-        
         try:
-            self.dg_connection = deepgram.listen.websocket.v("1")
             # Use the synchronous wrapper instead of the async method directly
-            self.dg_connection.on(LiveTranscriptionEvents.Transcript, self.message_handler)
-            print("Deepgram connection created")
+            with span("asr_open") as s:
+                self.asr = ensure_backend(self.asr, self.asr_options, "spritely")
+                self.asr_session = self.asr.open_session(on_final=bind(self.message_handler))
+                if s is not None:
+                    s.set(provider=self.asr.provider)
         except Exception as e:
-            print(f"Failed to create Deepgram connection: {e}")
-            return
-        
-        print("Deepgram connection created")  # Debug line
-
-        # Set up Deepgram connection
-        options = LiveOptions(
-            model="nova-2",
-            encoding="linear16",
-            channels=CHANNELS,
-            sample_rate=RATE,
-            language="en-GB",
-            punctuate=True,  # Enable punctuation
-            interim_results=False  # Only get final results
-        )
-
-        if self.dg_connection.start(options) is False:
-            print("Failed to start Deepgram connection")
-            return
+            print(f"Failed to start {self.asr.provider} transcription: {e}")
+            self.stream.close()
+            self.is_recording = False
+            return False
         
-        print("Deepgram connection started successfully")  # Debug line
+        print(f"{self.asr.provider} transcription ready")  # Debug line
 
-        # Update stream creation to use selected microphone
-        self.stream = self.audio.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            input_device_index=settings['microphone_index'],
-            frames_per_buffer=CHUNK
+        # Only stream speech to the ASR; KeepAlives hold the socket open in silence
+        self.vad = VADGate(
+            get_detector(settings['vad_detector']),
+            rate=self.stream.rate,
+            on_speech_end=self.asr_session.finalize,
+            enabled=settings['vad_enabled']
         )
 
         self.should_stop = threading.Event()
+
+        def send(data):
+            mark("first_speech_sent", once=True)
+            self.asr_session.send(data)
         
         # Start audio capture thread
         def capture_audio():
             while not self.should_stop.is_set():
-                data = self.stream.read(CHUNK, exception_on_overflow=False)
-                # print(f"📢 Sending {len(data)} bytes of audio data")
-                self.dg_connection.send(data)
+                data = self.stream.read()
+                if data:
+                    self.vad.feed(data, send, self.asr_session.keep_alive)
 
-        self.audio_thread = threading.Thread(target=capture_audio)
+        self.audio_thread = threading.Thread(target=bind(capture_audio), name="voice-capture")
         self.audio_thread.start()
         print("Recording started!")
+        return True
 
-    def stop_recording(self):
+    def stop_recording(self, pressed_at=None):
         if not self.is_recording:
             return
 
+        with use_trace(self.trace):
+            mark("stop_hotkey", at=pressed_at)
+            self._stop_recording()
+        if self.trace is not None:
+            self.trace.finish()
+            self.trace = None
+
+    def _stop_recording(self):
         logger.info("Stopping recording...")
-        audio_stream = eleven_labs.generate(
-            text="thinking...",
-            voice="OOjDveYEA7KnRY2FRSmX",
-            model="eleven_multilingual_v2",
-            stream=True
-        )
-        play_audio(audio_stream)
+        earcon_cache.play(THINKING_PHRASE)
         
         # Process collected transcript with LLM before cleanup
         if self.collected_transcript:
@@ -203,11 +200,13 @@ class SpeechTranscriber:
                 logger.info(f"Processing full transcript: {full_transcript}")
                 logger.debug(f"full_transcript type: {type(full_transcript)}")
                 
-                fut = asyncio.run_coroutine_threadsafe(
-                    process_prompt(full_transcript), 
-                    self.loop
-                )
-                response, response_type = fut.result()
+                # The coroutine runs in this context, so its spans join the trace
+                with span("process_prompt"):
+                    fut = asyncio.run_coroutine_threadsafe(
+                        process_prompt(full_transcript), 
+                        self.loop
+                    )
+                    response, response_type = fut.result()
                 logger.info(f"LLM Response: {response}")
                 
             except Exception as e:
@@ -217,12 +216,9 @@ class SpeechTranscriber:
         self.collected_transcript = []   
         self.should_stop.set()
         self.audio_thread.join()
-        self.stream.stop_stream()
         self.stream.close()
-        self.audio.terminate()
-        self.dg_connection.finish()
+        self.asr_session.finish()
         self.is_recording = False
-        self.loop.call_soon_threadsafe(self.loop.stop)
         print("Recording stopped!")
 
 class SpritelyApp:
@@ -247,11 +243,24 @@ def main():
         return
 
     app = SpritelyApp()
+
+    # Once the window is up, import the provider SDKs, open the microphone and
+    # render the activation phrases in the background so neither the window
+    # nor the first hotkey press waits on them
+    warm_up = [capture_engine.start, app.transcriber.asr.prewarm, app.field_transcriber.asr.prewarm,
+               earcon_cache.warm_up, ai_summarise.anthropic_client.get,
+               lambda: warm_providers(app.transcriber.loop)]
+    if settings['browser_prewarm']:
+        # Browser tasks run on the voice transcriber's loop, so the pool is warmed there
+        warm_up.append(lambda: asyncio.run_coroutine_threadsafe(prewarm_browser(), app.transcriber.loop).result())
+    app.gui.when_shown(lambda: warm_in_background(
+        ["anthropic", "groq", "elevenlabs.client", "deepgram"], warm_up))
     
     # Track pressed keys
     pressed_keys = set()
     
     def on_press(key):
+        pressed_at = time.monotonic()
         try:
             key_str = str(key).replace("'", "")
             print(f"Debug - Key string: {key_str}, Pressed keys: {pressed_keys}")
@@ -263,19 +272,22 @@ def main():
             is_l = key_str.lower() == 'l' or '¬' in pressed_keys
             
             if cmd_pressed and alt_pressed:
+                # The modifiers are down: make sure the sockets are warm before K/L lands
+                app.transcriber.asr.prewarm()
+                app.field_transcriber.asr.prewarm()
                 if is_k:
                     if not app.transcriber.is_recording:
-                        app.transcriber.start_recording()
+                        app.transcriber.start_recording(pressed_at)
                         app.gui.update_status("AI Transcription Active", True)
                     else:
-                        app.transcriber.stop_recording()
+                        app.transcriber.stop_recording(pressed_at)
                         app.gui.update_status("Ready", False)
                 elif is_l:
                     if not app.field_transcriber.is_recording:
-                        app.field_transcriber.start_recording()
+                        app.field_transcriber.start_recording(pressed_at)
                         app.gui.update_status("Field Transcription Active", True)
                     else:
-                        app.field_transcriber.stop_recording()
+                        app.field_transcriber.stop_recording(pressed_at)
                         app.gui.update_status("Ready", False)
             elif key == keyboard.Key.esc:
                 app.transcriber.stop_recording()
@@ -308,6 +320,10 @@ def main():
     
     # Start GUI main loop
     app.gui.run()
+    response_router.flush()
+    app.transcriber.asr.close()
+    app.field_transcriber.asr.close()
+    capture_engine.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
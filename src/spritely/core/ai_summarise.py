@@ -2,7 +2,8 @@ import os
 import logging
 from dotenv import load_dotenv
 
-from anthropic import Anthropic
+from src.spritely.core.prompt_cache import cached_system, prompt_cache_stats, with_cached_prefix
+from src.spritely.utils.lazy import Lazy
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
@@ -17,7 +18,14 @@ logger.addHandler(console_handler)
 
 load_dotenv()
 
-anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+def _make_client():
+    from anthropic import Anthropic
+    return Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+
+# Built on first use; the SDK import is too slow for startup
+anthropic_client = Lazy(_make_client, "anthropic")
 
 sys_prompt = """
 Your job is to review the user's notes, the transcript of a meeting, to then summarize the meeting.
@@ -34,13 +42,7 @@ Prioritize dates, monies, names, and other important information.
 """
 
 
-def ai_summary(meeting_transcript=str, user_notes= str | None): 
-    logger.info("Starting AI summary generation")
-    
-    if not meeting_transcript:
-        logger.error("No meeting transcript provided")
-        return None
-        
+def _summary_content(meeting_transcript: str, user_notes: str | None = None) -> list:
     prompt = f"""
     <instructions>
     Review the meeting_transcript, and the user_notes
@@ -51,26 +53,39 @@ def ai_summary(meeting_transcript=str, user_notes= str | None):
     </meeting_transcript>
     """   
     
+    notes = ""
     if user_notes:
         logger.debug("Adding user notes to prompt")
-        prompt += f"""
+        notes = f"""
         <user_notes>
         {user_notes}
         </user_notes>
         """
+
+    # The transcript is the cacheable part; notes change between runs
+    return with_cached_prefix([prompt], [notes])
+
+
+def ai_summary(meeting_transcript=str, user_notes= str | None): 
+    logger.info("Starting AI summary generation")
+    
+    if not meeting_transcript:
+        logger.error("No meeting transcript provided")
+        return None
     
     try:
         logger.debug("Sending request to Claude API")
-        message = anthropic_client.messages.create(
+        message = anthropic_client.get().messages.create(
             model="claude-3-5-sonnet-20241022",
             max_tokens=8192,
             temperature=0.3,
             messages=[{
                 "role": "user",
-                "content": prompt
+                "content": _summary_content(meeting_transcript, user_notes)
             }],
-            system=sys_prompt
+            system=cached_system(sys_prompt)
         )
+        prompt_cache_stats.record(message.usage, label="summary")
         logger.info("Successfully received response from Claude API")
         print(message.content[0].text)
         return message.content[0].text
@@ -79,3 +94,99 @@ def ai_summary(meeting_transcript=str, user_notes= str | None):
         logger.error(f"Error during API call: {str(e)}")
         raise
 
+
+def stream_summary(meeting_transcript: str, user_notes: str | None = None):
+    """Like ai_summary, but yields the summary text as it is generated.
+
+    Closing the generator early closes the HTTP stream.
+    """
+    logger.info("Starting streamed AI summary generation")
+    if not meeting_transcript:
+        logger.error("No meeting transcript provided")
+        return
+
+    with anthropic_client.get().messages.stream(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=8192,
+        temperature=0.3,
+        messages=[{
+            "role": "user",
+            "content": _summary_content(meeting_transcript, user_notes)
+        }],
+        system=cached_system(sys_prompt)
+    ) as stream:
+        for text in stream.text_stream:
+            yield text
+        prompt_cache_stats.record(stream.get_final_message().usage, label="summary")
+    logger.info("Successfully streamed summary from Claude API")
+
+
+segment_prompt = """
+You are summarising one part of a meeting that is still in progress.
+Write concise bullet points covering the decisions, action items, dates, monies and names in this part.
+Keep speaker labels where they matter. Do not add a title or any preamble.
+"""
+
+merge_prompt = """
+You are combining summaries of consecutive parts of the same meeting, given in chronological order.
+Merge them into one summary without losing dates, monies, names, decisions or action items.
+Remove repetition and keep the chronological order.
+"""
+
+
+def _complete(system: str, prompt: str, max_tokens: int) -> str:
+    message = anthropic_client.get().messages.create(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=max_tokens,
+        temperature=0.3,
+        messages=[{
+            "role": "user",
+            "content": prompt
+        }],
+        system=cached_system(system)
+    )
+    prompt_cache_stats.record(message.usage, label="summary")
+    return message.content[0].text
+
+
+def summarise_segment(segment_transcript: str, previous_summary: str = "") -> str:
+    """Map step: bullet-point summary of one window of the transcript"""
+    prompt = f"""
+    <previous_summary>
+    {previous_summary}
+    </previous_summary>
+    <meeting_transcript>
+    {segment_transcript}
+    </meeting_transcript>
+    """
+    return _complete(segment_prompt, prompt, max_tokens=1024)
+
+
+def merge_summaries(summaries: list, user_notes: str | None = None, final: bool = False) -> str:
+    """Reduce step: merge consecutive segment summaries into one.
+
+    The final merge uses the full meeting summary prompt so the result is
+    formatted like ai_summary's.
+    """
+    parts = "\n".join(f"<part index=\"{i}\">\n{summary}\n</part>" for i, summary in enumerate(summaries, 1))
+    prompt = f"""
+    <part_summaries>
+    {parts}
+    </part_summaries>
+    """
+    if final:
+        prompt = f"""
+    <instructions>
+    The meeting transcript has already been summarised in parts, given below in chronological order.
+    User notes included in the summary must be highlighted with a "* *" syntax to show that this is the user's notes.
+    </instructions>
+    {prompt}
+    """
+        if user_notes:
+            prompt += f"""
+        <user_notes>
+        {user_notes}
+        </user_notes>
+        """
+        return _complete(sys_prompt, prompt, max_tokens=4096)
+    return _complete(merge_prompt, prompt, max_tokens=2048)
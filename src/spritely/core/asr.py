@@ -0,0 +1,343 @@
+"""
+Speech-to-text backends behind one interface.
+
+The transcribers only deal with an AsrBackend and the AsrSession it opens
+per activation:
+
+    asr = create_backend(options_factory, name="meeting")
+    session = asr.open_session(on_final=handle, on_interim=preview)
+    session.send(pcm); session.finalize(); session.finish()
+
+Results keep the shape of Deepgram's live results (result.is_final,
+result.channel.alternatives[0].transcript/words, result.start, ...), so
+Deepgram results pass straight through and local backends build the same
+thing from AsrResult. Which backend is used comes from
+config.settings.transcription_provider:
+
+    deepgram  live websocket (default)
+    replay    replays a recorded transcript, offline, for tests and load runs
+    whisper   local CPU model (faster-whisper, optional)
+
+Every session reports to its backend's AsrMetrics: result counts, time to
+first result, and time from finalize() (end of speech) to the final result.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.spritely.core.config import config
+from src.spritely.core.deepgram_connection import DeepgramConnectionManager
+
+if TYPE_CHECKING:
+    from deepgram import LiveOptions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER = "deepgram"
+PROVIDERS = ("deepgram", "replay", "whisper")
+# Latency samples kept per backend for the percentiles
+METRIC_SAMPLES = 500
+
+ResultCallback = Callable[[Any], None]
+
+
+@dataclass
+class AsrOptions:
+    model: str = "nova-2"
+    sample_rate: int = 16000
+    language: Optional[str] = None
+    punctuate: bool = False
+    diarize: bool = False
+    interim_results: bool = False
+
+
+@dataclass
+class AsrWord:
+    word: str
+    start: float
+    end: float
+    confidence: float = 1.0
+    speaker: Optional[int] = None
+    punctuated_word: Optional[str] = None
+
+
+@dataclass
+class AsrAlternative:
+    transcript: str
+    confidence: float = 1.0
+    words: List[AsrWord] = field(default_factory=list)
+
+
+@dataclass
+class AsrChannel:
+    alternatives: List[AsrAlternative]
+
+
+@dataclass
+class AsrMetadata:
+    request_id: Optional[str] = None
+
+
+@dataclass
+class AsrResult:
+    """A transcript result shaped like Deepgram's LiveResultResponse"""
+    channel: AsrChannel
+    start: float
+    duration: float
+    is_final: bool = True
+    speech_final: bool = False
+    metadata: AsrMetadata = field(default_factory=AsrMetadata)
+
+    @classmethod
+    def from_text(cls, transcript: str, start: float, duration: float, words: Optional[List[AsrWord]] = None,
+                  confidence: float = 1.0, is_final: bool = True, request_id: Optional[str] = None) -> "AsrResult":
+        return cls(
+            channel=AsrChannel([AsrAlternative(transcript, confidence, words or [])]),
+            start=start, duration=duration, is_final=is_final, speech_final=is_final,
+            metadata=AsrMetadata(request_id),
+        )
+
+
+class AsrMetrics:
+    def __init__(self, samples: int = METRIC_SAMPLES):
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.finals = 0
+        self.interims = 0
+        self.errors = 0
+        self.audio_seconds = 0.0
+        self.first_result_ms = deque(maxlen=samples)
+        self.finalize_ms = deque(maxlen=samples)
+
+    def record(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self) -> Dict[str, float]:
+        def pct(values, q):
+            return round(float(np.percentile(values, q)), 1) if values else None
+
+        with self._lock:
+            first, final = list(self.first_result_ms), list(self.finalize_ms)
+            return {
+                "sessions": self.sessions,
+                "finals": self.finals,
+                "interims": self.interims,
+                "errors": self.errors,
+                "audio_seconds": round(self.audio_seconds, 1),
+                "first_result_p50_ms": pct(first, 50),
+                "first_result_p95_ms": pct(first, 95),
+                "finalize_p50_ms": pct(final, 50),
+                "finalize_p95_ms": pct(final, 95),
+            }
+
+
+class AsrSession:
+    """One activation's audio stream.
+
+    Backends implement _send, _finalize, _finish and keep_alive, and hand
+    results to _deliver from whatever thread they arrive on.
+    """
+
+    def __init__(self, backend: "AsrBackend", on_final: ResultCallback,
+                 on_interim: Optional[ResultCallback] = None,
+                 on_error: Optional[Callable[[Any], None]] = None):
+        self.backend = backend
+        self.options = backend.options_factory()
+        self.on_final = on_final
+        self.on_interim = on_interim
+        self.on_error = on_error
+        self.finished = False
+        self.audio_seconds = 0.0
+        self._bytes_per_second = self.options.sample_rate * 2
+        self._first_audio: Optional[float] = None
+        self._got_result = False
+        self._finalize_at: Optional[float] = None
+        self._final_mark = 0.0  # audio_seconds when the last final arrived
+        backend.metrics.record(sessions=1)
+
+    def send(self, data: bytes) -> None:
+        if self._first_audio is None:
+            self._first_audio = time.monotonic()
+        seconds = len(data) / self._bytes_per_second
+        self.audio_seconds += seconds
+        self.backend.metrics.record(audio_seconds=seconds)
+        self._send(data)
+
+    def finalize(self) -> None:
+        """Flush the current utterance (end of speech)"""
+        # Only time finalizes that have unfinished audio to flush
+        if self._finalize_at is None and self.audio_seconds > self._final_mark:
+            self._finalize_at = time.monotonic()
+        self._finalize()
+
+    def finish(self) -> None:
+        if not self.finished:
+            self.finished = True
+            self._finish()
+
+    def keep_alive(self) -> None:
+        pass
+
+    def session_time(self, seconds: Optional[float]) -> Optional[float]:
+        """A result timestamp as seconds of this session's audio"""
+        return seconds
+
+    def _send(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _finalize(self) -> None:
+        pass
+
+    def _finish(self) -> None:
+        pass
+
+    def _deliver(self, result) -> None:
+        now = time.monotonic()
+        metrics = self.backend.metrics
+        if not self._got_result and self._first_audio is not None:
+            self._got_result = True
+            metrics.first_result_ms.append((now - self._first_audio) * 1000)
+        if getattr(result, 'is_final', True):
+            metrics.record(finals=1)
+            self._final_mark = self.audio_seconds
+            if self._finalize_at is not None:
+                metrics.finalize_ms.append((now - self._finalize_at) * 1000)
+                self._finalize_at = None
+            self.on_final(result)
+        else:
+            metrics.record(interims=1)
+            if self.on_interim is not None:
+                self.on_interim(result)
+
+    def _error(self, error) -> None:
+        self.backend.metrics.record(errors=1)
+        logger.error(f"[{self.backend.name}] ASR error: {error}")
+        if self.on_error is not None:
+            self.on_error(error)
+
+
+class AsrBackend:
+    provider = ""
+
+    def __init__(self, options_factory: Callable[[], AsrOptions], name: str = "asr"):
+        self.options_factory = options_factory
+        self.name = name
+        self.metrics = AsrMetrics()
+
+    def prewarm(self) -> None:
+        """Get ready for the next session in the background (connect, load a model)"""
+
+    def open_session(self, on_final: ResultCallback, on_interim: Optional[ResultCallback] = None,
+                     on_error: Optional[Callable[[Any], None]] = None) -> AsrSession:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class DeepgramAsrSession(AsrSession):
+    def __init__(self, backend: "DeepgramBackend", *args, **kwargs):
+        from deepgram import LiveTranscriptionEvents
+        super().__init__(backend, *args, **kwargs)
+
+        def on_transcript(client, result=None, **kwargs):
+            self._deliver(result)
+
+        def on_error(client, error=None, **kwargs):
+            self._error(error)
+
+        self._session = backend.manager.acquire({
+            LiveTranscriptionEvents.Transcript: on_transcript,
+            LiveTranscriptionEvents.Error: on_error,
+        })
+
+    def _send(self, data: bytes) -> None:
+        self._session.send(data)
+
+    def keep_alive(self) -> None:
+        self._session.keep_alive()
+
+    def session_time(self, seconds: Optional[float]) -> Optional[float]:
+        # The warm socket may have carried earlier sessions' audio
+        if seconds is None:
+            return None
+        return seconds - self._session.socket_start / self._bytes_per_second
+
+    def _finalize(self) -> None:
+        self._session.finalize()
+
+    def _finish(self) -> None:
+        self._session.finish()
+
+
+class DeepgramBackend(AsrBackend):
+    provider = "deepgram"
+
+    def __init__(self, options_factory: Callable[[], AsrOptions], name: str = "deepgram",
+                 url: Optional[str] = None, api_key: Optional[str] = None):
+        super().__init__(options_factory, name)
+        # The warm, reusable socket from deepgram_connection
+        self.manager = DeepgramConnectionManager(self.live_options, url=url, api_key=api_key, name=name)
+
+    def live_options(self) -> "LiveOptions":
+        from deepgram import LiveOptions
+        # Audio is downmixed to mono at the configured rate before streaming
+        options = self.options_factory()
+        return LiveOptions(
+            model=options.model,
+            encoding="linear16",
+            channels=1,
+            sample_rate=options.sample_rate,
+            language=options.language,
+            punctuate=options.punctuate,
+            diarize=options.diarize,
+            interim_results=options.interim_results,
+        )
+
+    def prewarm(self) -> None:
+        self.manager.prewarm()
+
+    def open_session(self, on_final, on_interim=None, on_error=None) -> AsrSession:
+        return DeepgramAsrSession(self, on_final, on_interim, on_error)
+
+    def close(self) -> None:
+        self.manager.close()
+
+
+def current_provider() -> str:
+    provider = (config.settings.transcription_provider or DEFAULT_PROVIDER).lower()
+    if provider not in PROVIDERS:
+        logger.warning(f"Unknown transcription provider {provider!r}, using {DEFAULT_PROVIDER}")
+        return DEFAULT_PROVIDER
+    return provider
+
+
+def create_backend(options_factory: Callable[[], AsrOptions], name: str = "asr",
+                   provider: Optional[str] = None) -> AsrBackend:
+    """The backend named by `provider`, or by the transcription_provider setting"""
+    provider = provider or current_provider()
+    if provider == "replay":
+        from src.spritely.core.asr_local import ReplayBackend
+        return ReplayBackend(options_factory, name)
+    if provider == "whisper":
+        from src.spritely.core.asr_local import WhisperBackend
+        return WhisperBackend(options_factory, name)
+    return DeepgramBackend(options_factory, name)
+
+
+def ensure_backend(backend: AsrBackend, options_factory: Callable[[], AsrOptions], name: str) -> AsrBackend:
+    """Swap backend for a new one if the transcription_provider setting has changed"""
+    provider = current_provider()
+    if backend.provider == provider:
+        return backend
+    logger.info(f"[{name}] switching ASR backend {backend.provider} -> {provider}")
+    backend.close()
+    return create_backend(options_factory, name, provider)
@@ -0,0 +1,252 @@
+"""
+Offline ASR backends.
+
+ReplayBackend plays back a recorded transcript (a meeting export or
+transcript log) as audio is streamed to it: once a session has received
+as much audio as the next recorded utterance lasted, that utterance is
+delivered as a final result, and finalize() flushes whatever is in
+progress. It needs no network or model, so the whole pipeline can be run,
+benchmarked and load-tested offline.
+
+WhisperBackend runs a local CPU model (faster-whisper, if installed) on
+each utterance when the VAD signals the end of speech.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from src.spritely.core.asr import AsrBackend, AsrResult, AsrSession, AsrWord
+from src.spritely.utils.user_settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Used for replayed utterances with no recorded duration
+DEFAULT_UTTERANCE_SECONDS = 2.0
+# Whisper runs on at most this much buffered speech at a time
+WHISPER_MAX_SECONDS = 30.0
+
+DEFAULT_SCRIPT = [
+    "This is the offline replay transcription backend.",
+    "Set asr_replay_file to replay a recorded meeting instead.",
+]
+
+
+def load_script(source: Union[str, Path, Iterable, None]) -> List[Dict]:
+    """Utterance records from a JSON export, a JSONL log or a list of strings/records"""
+    if source is None:
+        source = DEFAULT_SCRIPT
+    if isinstance(source, (str, Path)) and Path(source).exists():
+        path = Path(source)
+        with open(path) as f:
+            if ".jsonl" in path.suffixes:
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = json.load(f)
+    else:
+        records = list(source) if not isinstance(source, str) else [source]
+    script = []
+    for record in records:
+        if isinstance(record, str):
+            record = {'transcript': record}
+        if record.get('transcript', '').strip():
+            script.append(record)
+    if not script:
+        raise ValueError("Replay script has no utterances")
+    return script
+
+
+def _replay_words(record: Dict, start: float, duration: float) -> List[AsrWord]:
+    rows = record.get('words')
+    if rows:
+        # Recorded timings, shifted onto this session's timeline
+        origin = rows[0][1] or 0.0
+        return [AsrWord(word=r[0], punctuated_word=r[0], start=start + (r[1] or 0.0) - origin,
+                        end=start + (r[2] or 0.0) - origin, speaker=r[3], confidence=r[4] or 1.0)
+                for r in rows]
+    tokens = record['transcript'].split()
+    step = duration / len(tokens)
+    return [AsrWord(word=t, punctuated_word=t, start=start + i * step, end=start + (i + 1) * step,
+                    speaker=record.get('speaker'))
+            for i, t in enumerate(tokens)]
+
+
+class ReplaySession(AsrSession):
+    def __init__(self, backend: "ReplayBackend", *args, **kwargs):
+        super().__init__(backend, *args, **kwargs)
+        self._script = backend.script_iterator()
+        self._current = next(self._script)
+        self._emitted_until = 0.0
+        self._interim_sent = False
+        self._request_id = str(uuid.uuid4())
+        self._closed = False
+        # One worker per session keeps results in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"asr-{backend.name}")
+
+    def _duration(self, record: Dict) -> float:
+        return record.get('duration') or self.backend.utterance_seconds
+
+    def _send(self, data: bytes) -> None:
+        elapsed = self.audio_seconds - self._emitted_until
+        duration = self._duration(self._current)
+        if elapsed >= duration:
+            self._emit(self._emitted_until + duration)
+        elif self.options.interim_results and not self._interim_sent and elapsed >= duration / 2:
+            self._interim_sent = True
+            self._schedule(self._result(self._current, self._emitted_until, elapsed, is_final=False))
+
+    def _finalize(self) -> None:
+        if self.audio_seconds > self._emitted_until:
+            self._emit(self.audio_seconds)
+
+    def _emit(self, end: float) -> None:
+        self._schedule(self._result(self._current, self._emitted_until, end - self._emitted_until))
+        self._emitted_until = end
+        self._interim_sent = False
+        self._current = next(self._script)
+
+    def _result(self, record: Dict, start: float, duration: float, is_final: bool = True) -> AsrResult:
+        words = _replay_words(record, start, self._duration(record))
+        if not is_final:
+            words = words[:max(1, len(words) // 2)]
+        transcript = record['transcript'] if is_final else " ".join(w.word for w in words)
+        return AsrResult.from_text(transcript, start, duration, words, record.get('confidence') or 1.0,
+                                   is_final=is_final, request_id=self._request_id)
+
+    def _schedule(self, result: AsrResult) -> None:
+        def deliver():
+            if self.backend.latency:
+                time.sleep(self.backend.latency)
+            try:
+                self._deliver(result)
+            except Exception as e:
+                logger.error(f"[{self.backend.name}] result handler failed: {e}", exc_info=True)
+
+        if not self._closed:
+            self._executor.submit(deliver)
+
+    def _finish(self) -> None:
+        # Like Deepgram, closing flushes the utterance in progress; queued results are still delivered
+        self._finalize()
+        self._closed = True
+        self._executor.shutdown(wait=False)
+
+
+class ReplayBackend(AsrBackend):
+    provider = "replay"
+
+    def __init__(self, options_factory, name: str = "replay", source=None,
+                 utterance_seconds: float = DEFAULT_UTTERANCE_SECONDS, latency: float = 0.0):
+        super().__init__(options_factory, name)
+        self.source = source if source is not None else settings.get('asr_replay_file')
+        self.utterance_seconds = utterance_seconds
+        self.latency = latency
+        self._script: Optional[List[Dict]] = None
+
+    @property
+    def script(self) -> List[Dict]:
+        if self._script is None:
+            self._script = load_script(self.source)
+        return self._script
+
+    def script_iterator(self):
+        return itertools.cycle(self.script)
+
+    def prewarm(self) -> None:
+        # Parse the script now rather than on the first session
+        self.script
+
+    def open_session(self, on_final, on_interim=None, on_error=None) -> AsrSession:
+        return ReplaySession(self, on_final, on_interim, on_error)
+
+
+class WhisperSession(AsrSession):
+    def __init__(self, backend: "WhisperBackend", *args, **kwargs):
+        super().__init__(backend, *args, **kwargs)
+        self._buffer: List[bytes] = []
+        self._buffered_seconds = 0.0
+        self._offset = 0.0
+
+    def _send(self, data: bytes) -> None:
+        self._buffer.append(data)
+        self._buffered_seconds += len(data) / self._bytes_per_second
+        if self._buffered_seconds >= WHISPER_MAX_SECONDS:
+            self._flush()
+
+    def _finalize(self) -> None:
+        self._flush()
+
+    def _finish(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        audio, self._buffer = b"".join(self._buffer), []
+        start, duration = self._offset, self._buffered_seconds
+        self._offset += duration
+        self._buffered_seconds = 0.0
+        self.backend.executor.submit(self._transcribe, audio, start, duration)
+
+    def _transcribe(self, audio: bytes, start: float, duration: float) -> None:
+        try:
+            samples = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+            segments, _ = self.backend.model.transcribe(
+                samples, language=(self.options.language or "en").split("-")[0],
+                word_timestamps=True, vad_filter=False)
+            words = [AsrWord(word=w.word.strip(), punctuated_word=w.word.strip(), start=start + w.start,
+                             end=start + w.end, confidence=w.probability)
+                     for segment in segments for w in (segment.words or [])]
+            transcript = " ".join(w.word for w in words)
+            if transcript:
+                confidence = float(np.mean([w.confidence for w in words]))
+                self._deliver(AsrResult.from_text(transcript, start, duration, words, confidence))
+        except Exception as e:
+            self._error(e)
+
+
+class WhisperBackend(AsrBackend):
+    provider = "whisper"
+
+    def __init__(self, options_factory, name: str = "whisper", model_size: Optional[str] = None):
+        super().__init__(options_factory, name)
+        self.model_size = model_size or settings.get('local_asr_model', 'base.en')
+        self._model = None
+        self._lock = threading.Lock()
+        # One utterance at a time: the model already uses every core
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"asr-{name}")
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise ImportError("faster-whisper is not installed: pip install faster-whisper")
+                started = time.monotonic()
+                self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+                logger.info(f"[{self.name}] loaded {self.model_size} in {time.monotonic() - started:.1f}s")
+            return self._model
+
+    def prewarm(self) -> None:
+        def run():
+            try:
+                self.model
+            except Exception as e:
+                logger.error(f"[{self.name}] could not load local model: {e}")
+        threading.Thread(target=run, daemon=True).start()
+
+    def open_session(self, on_final, on_interim=None, on_error=None) -> AsrSession:
+        return WhisperSession(self, on_final, on_interim, on_error)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
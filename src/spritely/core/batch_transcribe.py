@@ -0,0 +1,287 @@
+"""
+Offline re-transcription of recorded meeting audio.
+
+A recording is cut into chunks at silences near `target_seconds` so no
+word is split, the chunks are sent to Deepgram's pre-recorded API by a
+bounded pool of workers, and the results are stitched back together by
+offsetting every timestamp by its chunk's start. The output goes through
+the same speaker-turn export as live meetings.
+
+Deepgram numbers speakers per request, so speaker labels are only
+consistent within a chunk; longer chunks trade parallelism for more
+consistent labels.
+
+    python -m src.spritely.core.batch_transcribe meetings/audio/transcription_20250101_100000.flac
+    python -m src.spritely.core.batch_transcribe recording.wav --workers 8 --url http://127.0.0.1:8765
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from src.spritely.core.meeting_store import MeetingStore, meeting_id_for
+from src.spritely.core.speaker_turns import turn_records
+from src.spritely.core.word_table import WordTable
+from src.spritely.utils.audio_recorder import repair_wav
+
+logger = logging.getLogger(__name__)
+
+DEEPGRAM_URL = "https://api.deepgram.com"
+SAMPLE_RATE = 16000
+TARGET_SECONDS = 300.0
+MAX_SECONDS = 360.0
+MIN_SECONDS = 30.0
+WORKERS = 4
+MAX_RETRIES = 3
+HTTP_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+FRAME_MS = 30
+OUTPUT_DIR = "meetings/json/batch"
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: float  # seconds from the start of the recording
+    samples: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+
+def read_audio(path, rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono int16 samples at `rate`; non-WAV files (or other rates) are decoded with ffmpeg"""
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        # A recording the app didn't close still has its first chunk's length in the header
+        repair_wav(path)
+        with wave.open(str(path), "rb") as wav:
+            if wav.getframerate() == rate and wav.getsampwidth() == 2:
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+                channels = wav.getnchannels()
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+                return samples
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError(f"ffmpeg is needed to decode {path.name}")
+    result = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", str(path),
+         "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+        capture_output=True, check=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def split_at_silence(samples: np.ndarray, rate: int = SAMPLE_RATE, target_seconds: float = TARGET_SECONDS,
+                     max_seconds: float = MAX_SECONDS, min_seconds: float = MIN_SECONDS) -> List[Tuple[int, int]]:
+    """(start, end) sample ranges, each cut at the quietest point near target_seconds.
+
+    The cut for each chunk is the lowest-energy frame between min_seconds
+    and max_seconds into it, preferring frames closer to target_seconds
+    among equally quiet ones.
+    """
+    frame = rate * FRAME_MS // 1000
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return [(0, len(samples))] if len(samples) else []
+    frames = samples[:n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    energy = np.sqrt((frames ** 2).mean(axis=1))
+    # Quantise energy so "quiet enough" frames tie and distance to the target decides
+    floor = np.percentile(energy, 10) + 1.0
+    level = np.floor(np.log2(energy / floor + 1.0))
+
+    to_frames = 1000 / FRAME_MS
+    cuts, start = [], 0
+    while (n_frames - start) / to_frames > max_seconds:
+        lo = start + int(min_seconds * to_frames)
+        hi = start + int(max_seconds * to_frames)
+        target = start + int(target_seconds * to_frames)
+        window = np.arange(lo, hi)
+        start = int(window[np.lexsort((np.abs(window - target), level[lo:hi]))[0]])
+        cuts.append(start * frame + frame // 2)
+    bounds = [0] + cuts + [len(samples)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def make_chunks(samples: np.ndarray, **split_kwargs) -> List[Chunk]:
+    return [Chunk(i, start / SAMPLE_RATE, samples[start:end])
+            for i, (start, end) in enumerate(split_at_silence(samples, **split_kwargs))]
+
+
+def wav_bytes(samples: np.ndarray, rate: int = SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class BatchTranscriber:
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None,
+                 workers: int = WORKERS, model: str = "nova-2", timeout: httpx.Timeout = HTTP_TIMEOUT):
+        self.url = (url or os.getenv("DEEPGRAM_BATCH_URL") or DEEPGRAM_URL).rstrip("/")
+        self.api_key = api_key or os.getenv("DEEPGRAM_API_KEY", "")
+        self.workers = workers
+        self.params = {"model": model, "diarize": "true", "punctuate": "true",
+                       "smart_format": "true", "utterances": "true"}
+        self.timeout = timeout
+        self._http: Optional[httpx.Client] = None
+
+    def transcribe_chunk(self, chunk: Chunk) -> Dict:
+        """Deepgram's response for one chunk, retrying rate limits and server errors"""
+        body = wav_bytes(chunk.samples)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self._http.post(f"{self.url}/v1/listen", params=self.params, content=body,
+                                           headers={"Content-Type": "audio/wav"})
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = str(e) or type(e).__name__
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"Chunk {chunk.index} failed after {attempt + 1} attempts: {error}")
+            delay = 2 ** attempt
+            logger.warning(f"Chunk {chunk.index} failed ({error}), retrying in {delay}s")
+            time.sleep(delay)
+
+    def transcribe(self, samples: np.ndarray, started_at: Optional[datetime] = None,
+                   **split_kwargs) -> List[Dict]:
+        """Transcript log records for the whole recording, in time order"""
+        chunks = make_chunks(samples, **split_kwargs)
+        logger.info(f"🎧 Transcribing {len(samples) / SAMPLE_RATE:.0f}s of audio "
+                    f"in {len(chunks)} chunks with {self.workers} workers")
+        limits = httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        # One pooled client shared by the workers, at most one connection each
+        headers = {"Authorization": f"Token {self.api_key}"} if self.api_key else {}
+        self._http = httpx.Client(timeout=self.timeout, limits=limits, headers=headers)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-asr") as pool:
+                responses = list(pool.map(self.transcribe_chunk, chunks))
+        finally:
+            self._http.close()
+        records = []
+        for chunk, response in zip(chunks, responses):
+            records.extend(stitch(chunk, response, started_at))
+        return records
+
+
+def _word_row(word: Dict, offset: float) -> list:
+    return [
+        word.get("punctuated_word") or word.get("word", ""),
+        round(word.get("start", 0.0) + offset, 3),
+        round(word.get("end", 0.0) + offset, 3),
+        word.get("speaker"),
+        word.get("confidence"),
+    ]
+
+
+def stitch(chunk: Chunk, response: Dict, started_at: Optional[datetime] = None) -> List[Dict]:
+    """One chunk's response as transcript log records on the recording's timeline"""
+    results = response.get("results", {})
+    utterances = results.get("utterances")
+    if utterances is None:
+        # Without utterance segmentation, treat the whole chunk as one
+        alternative = results.get("channels", [{}])[0].get("alternatives", [{}])[0]
+        words = alternative.get("words", [])
+        utterances = [{
+            "transcript": alternative.get("transcript", ""),
+            "confidence": alternative.get("confidence"),
+            "start": words[0]["start"] if words else 0.0,
+            "end": words[-1]["end"] if words else chunk.duration,
+            "words": words,
+        }]
+
+    request_id = response.get("metadata", {}).get("request_id")
+    records = []
+    for utterance in utterances:
+        if not utterance.get("transcript", "").strip():
+            continue
+        start = chunk.start + utterance.get("start", 0.0)
+        words = [_word_row(w, chunk.start) for w in utterance.get("words", [])]
+        records.append({
+            'timestamp': (started_at + timedelta(seconds=start)).isoformat() if started_at else None,
+            'transcript': utterance["transcript"],
+            'confidence': utterance.get("confidence"),
+            'speaker': words[0][3] if words else utterance.get("speaker"),
+            'start_time': round(start, 3),
+            'duration': round(utterance.get("end", 0.0) - utterance.get("start", 0.0), 3),
+            'request_id': request_id,
+            'words': words,
+        })
+    return records
+
+
+def recording_started_at(path) -> Optional[datetime]:
+    """Start time from a transcription_<YYYYmmdd_HHMMSS> file name"""
+    try:
+        return datetime.strptime(meeting_id_for(path), "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+def retranscribe_file(path, output_dir=OUTPUT_DIR, transcriber: Optional[BatchTranscriber] = None,
+                      store: bool = False, **split_kwargs) -> Path:
+    """Re-transcribe a recording and write the export JSON (and word table) for it"""
+    path = Path(path)
+    transcriber = transcriber or BatchTranscriber()
+    records = transcriber.transcribe(read_audio(path), started_at=recording_started_at(path), **split_kwargs)
+    words = WordTable.from_records(records)
+    exported = turn_records(records, words)
+
+    meeting_id = meeting_id_for(path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output = output_dir / f"transcription_{meeting_id}.json"
+    with open(output, "w") as f:
+        json.dump(exported, f, indent=2)
+    if len(words):
+        words.save(output_dir / f"transcription_{meeting_id}")
+
+    if store:
+        with MeetingStore() as meeting_store:
+            meeting_store.add_meeting(meeting_id, exported, source=str(output), replace=True)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-transcribe recorded meeting audio")
+    parser.add_argument("files", nargs="+", help="WAV or FLAC recordings")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="directory for the JSON exports")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="concurrent requests")
+    parser.add_argument("--chunk-seconds", type=float, default=TARGET_SECONDS)
+    parser.add_argument("--model", default="nova-2")
+    parser.add_argument("--url", help="Deepgram API base URL")
+    parser.add_argument("--store", action="store_true", help="replace the meeting in the search store")
+    args = parser.parse_args(argv)
+
+    transcriber = BatchTranscriber(url=args.url, workers=args.workers, model=args.model)
+    split = {"target_seconds": args.chunk_seconds,
+             "max_seconds": args.chunk_seconds * MAX_SECONDS / TARGET_SECONDS,
+             "min_seconds": min(MIN_SECONDS, args.chunk_seconds / 2)}
+    for path in args.files:
+        started = time.perf_counter()
+        output = retranscribe_file(path, args.out, transcriber, store=args.store, **split)
+        print(f"📝 {path} -> {output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
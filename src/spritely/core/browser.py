@@ -1,30 +1,29 @@
-from browser_use import Agent, Browser, BrowserConfig
-from langchain_openai import ChatOpenAI
 import asyncio
 from dotenv import load_dotenv
 import os
 
-load_dotenv()
+from src.spritely.core.browser_pool import get_browser_pool
 
-# Configure the browser to connect to your Chrome instance
-browser = Browser(
-    config=BrowserConfig(
-        # Specify the path to your Chrome executable
-        chrome_instance_path='/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',  # macOS path
-        # For Windows, typically: 'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe'
-        # For Linux, typically: '/usr/bin/google-chrome'
-    )
-)
+load_dotenv()
 
 async def execute_browser_task(task: str) -> str:
-    agent = Agent(
-        task=task,
-        llm=ChatOpenAI(model="gpt-4o"),  # Fixed typo in model name
-        browser=browser,
-    )
-    result = await agent.run()
-    await browser.close()
-    return result
+    # browser_use pulls in playwright and langchain; only import it for a browser task
+    from browser_use import Agent
+    from langchain_openai import ChatOpenAI
+
+    # A warm context from the pool: the browser stays open for the next task
+    async with get_browser_pool().context() as context:
+        agent = Agent(
+            task=task,
+            llm=ChatOpenAI(model="gpt-4o"),  # Fixed typo in model name
+            browser=context.browser,
+            browser_context=context,
+        )
+        return await agent.run()
+
+async def prewarm_browser() -> None:
+    """Launch the shared browser ahead of the first browser task"""
+    await get_browser_pool().prewarm()
 
 async def main():
     result = await execute_browser_task(
@@ -35,6 +34,7 @@ async def main():
     )
     print(result)
     input('Press Enter to close the browser...')
+    await get_browser_pool().aclose()
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+A warm, shared browser for browser tasks.
+
+Launching Chrome takes seconds, so the browser stays open between tasks
+and finished tasks hand their context back for the next one. The pool
+caps how many tasks drive pages at once, replaces a context after
+TASKS_PER_CONTEXT tasks (or when a task fails inside it), drops
+everything under memory pressure, and closes the browser once it has
+been idle for IDLE_TIMEOUT:
+
+    async with get_browser_pool().context() as context:
+        agent = Agent(task=task, llm=llm, browser=context.browser, browser_context=context)
+        result = await agent.run()
+
+Playwright objects belong to the event loop that created them, so each
+running loop gets its own pool, like the provider clients.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Callable, List, Optional
+
+if TYPE_CHECKING:
+    from browser_use import Browser
+    from browser_use.browser.context import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+CHROME_PATH = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'  # macOS path
+# For Windows, typically: 'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe'
+# For Linux, typically: '/usr/bin/google-chrome'
+
+# Tasks driving pages at the same time; more wait for a free slot
+MAX_PAGES = 2
+# A context is replaced after this many tasks (cookies, tabs and leaks build up)
+TASKS_PER_CONTEXT = 20
+# Close the browser when no task has used it for this long
+IDLE_TIMEOUT = 300.0
+# Memory pressure: Chrome's processes above this, or the machine above this
+MAX_BROWSER_RSS_MB = 1500
+MAX_SYSTEM_MEMORY_PERCENT = 90.0
+# Walking the process tree is slow, so memory is checked at most this often
+MEMORY_CHECK_INTERVAL = 30.0
+
+
+def default_browser() -> "Browser":
+    from browser_use import Browser, BrowserConfig
+    return Browser(config=BrowserConfig(chrome_instance_path=CHROME_PATH))
+
+
+def memory_pressure(max_rss_mb: float = MAX_BROWSER_RSS_MB,
+                    max_system_percent: float = MAX_SYSTEM_MEMORY_PERCENT) -> Optional[str]:
+    """Why the browser should be recycled, or None (also None without psutil)"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    rss = 0
+    for process in psutil.Process().children(recursive=True):
+        try:
+            if "chrom" in process.name().lower():
+                rss += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    if rss > max_rss_mb * 1024 * 1024:
+        return f"browser using {rss / 1024 / 1024:.0f}MB"
+    percent = psutil.virtual_memory().percent
+    if percent > max_system_percent:
+        return f"system memory at {percent:.0f}%"
+    return None
+
+
+class PooledContext:
+    def __init__(self, browser: "Browser", context: "BrowserContext"):
+        self.browser = browser
+        self.context = context
+        self.tasks = 0
+
+
+class BrowserPool:
+    def __init__(self, browser_factory: Callable[[], "Browser"] = default_browser,
+                 max_pages: int = MAX_PAGES, tasks_per_context: int = TASKS_PER_CONTEXT,
+                 idle_timeout: float = IDLE_TIMEOUT, max_rss_mb: float = MAX_BROWSER_RSS_MB):
+        self.browser_factory = browser_factory
+        self.tasks_per_context = tasks_per_context
+        self.idle_timeout = idle_timeout
+        self.max_rss_mb = max_rss_mb
+
+        self._pages = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._browser: Optional["Browser"] = None
+        self._idle: List[PooledContext] = []
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._memory_checked = 0.0
+        self.launches = 0
+        self.contexts_created = 0
+        self.recycles = 0
+
+    @property
+    def is_warm(self) -> bool:
+        return self._browser is not None
+
+    async def _ensure_browser(self) -> "Browser":
+        """The running browser, launching it if needed; callers hold the lock"""
+        if self._browser is None:
+            started = time.monotonic()
+            browser = self.browser_factory()
+            # browser_use launches Chrome on first use; do it now rather than inside the task
+            await browser.get_playwright_browser()
+            self._browser = browser
+            self.launches += 1
+            logger.info(f"🌐 Browser launched in {(time.monotonic() - started) * 1000:.0f}ms")
+        return self._browser
+
+    async def _new_context(self) -> PooledContext:
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        self.contexts_created += 1
+        return PooledContext(browser, context)
+
+    async def prewarm(self) -> None:
+        """Launch the browser and open a context ahead of the first task"""
+        try:
+            async with self._lock:
+                if not self._idle:
+                    self._idle.append(await self._new_context())
+                self._last_used = time.monotonic()
+                self._schedule_idle_close()
+        except Exception as e:
+            logger.error(f"Browser prewarm failed: {e}")
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator["BrowserContext"]:
+        """A warm browser context for one task, returned to the pool afterwards"""
+        async with self._pages:
+            pooled = await self._checkout()
+            ok = False
+            try:
+                yield pooled.context
+                ok = True
+            finally:
+                await self._checkin(pooled, ok)
+
+    async def _checkout(self) -> PooledContext:
+        async with self._lock:
+            self._cancel_idle_close()
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                logger.info("🌐 No warm browser context, opening one")
+                pooled = await self._new_context()
+            self._in_use += 1
+            return pooled
+
+    async def _checkin(self, pooled: PooledContext, ok: bool) -> None:
+        async with self._lock:
+            self._in_use -= 1
+            self._last_used = time.monotonic()
+            pooled.tasks += 1
+            if not ok or pooled.tasks >= self.tasks_per_context or pooled.browser is not self._browser:
+                # A failed task can leave dialogs, downloads or half-filled forms behind
+                self.recycles += 1
+                await self._close_context(pooled)
+            else:
+                self._idle.append(pooled)
+            if self._in_use == 0:
+                self._schedule_idle_close()
+            check_memory = self._last_used - self._memory_checked >= MEMORY_CHECK_INTERVAL
+            if check_memory:
+                self._memory_checked = self._last_used
+
+        # Checked after the task, so a recycle never delays one, and off the
+        # event loop, which is also streaming LLM tokens and TTS audio
+        reason = await asyncio.to_thread(memory_pressure, self.max_rss_mb) if check_memory else None
+        if reason:
+            async with self._lock:
+                logger.warning(f"♻️ Recycling browser: {reason}")
+                await self._close_idle()
+                if self._in_use == 0:
+                    await self._close_browser()
+
+    def _schedule_idle_close(self) -> None:
+        self._cancel_idle_close()
+        loop = asyncio.get_running_loop()
+        self._idle_handle = loop.call_later(self.idle_timeout, lambda: loop.create_task(self._close_if_idle()))
+
+    def _cancel_idle_close(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    async def _close_if_idle(self) -> None:
+        async with self._lock:
+            self._idle_handle = None
+            if self._in_use or self._browser is None:
+                return
+            if time.monotonic() - self._last_used < self.idle_timeout:
+                self._schedule_idle_close()
+                return
+            logger.info(f"🌐 Browser idle for {self.idle_timeout:.0f}s, closing it")
+            await self._close_idle()
+            await self._close_browser()
+
+    async def _close_context(self, pooled: PooledContext) -> None:
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser context: {e}")
+
+    async def _close_idle(self) -> None:
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._close_context(pooled)
+
+    async def _close_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"Error closing browser: {e}")
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            self._cancel_idle_close()
+            await self._close_idle()
+            await self._close_browser()
+
+
+_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """The browser pool of the running event loop (created on first use)"""
+    loop = asyncio.get_running_loop()
+    pool = _by_loop.get(loop)
+    if pool is None:
+        pool = _by_loop[loop] = BrowserPool()
+    return pool
+
+
+def set_browser_pool(pool: BrowserPool) -> None:
+    """Use a specific pool on the running loop, e.g. with a stand-in browser"""
+    _by_loop[asyncio.get_running_loop()] = pool
@@ -1,6 +1,6 @@
 from pathlib import Path
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
 import logging
 from pydantic import BaseModel, Field
 
@@ -18,6 +18,7 @@ class Config:
         self.settings_file = self.config_dir / "settings.json"
         self.ensure_config_dir()
         self.settings = self.load_settings()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
         
     def ensure_config_dir(self) -> None:
         """Ensure the configuration directory exists."""
@@ -41,13 +42,26 @@ class Config:
         except Exception as e:
             logging.error(f"Error saving settings: {e}")
     
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback receiving the dict of settings that changed."""
+        self._listeners.append(callback)
+
     def update_settings(self, **kwargs) -> None:
         """Update settings with new values."""
+        changed = {}
         for key, value in kwargs.items():
             if hasattr(self.settings, key):
+                if getattr(self.settings, key) != value:
+                    changed[key] = value
                 setattr(self.settings, key, value)
         if self.settings.auto_save:
             self.save_settings()
+        if changed:
+            for callback in self._listeners:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    logging.error(f"Settings listener failed: {e}")
 
     def get_api_keys(self) -> Dict[str, Optional[str]]:
         """Get API keys from environment or config."""
@@ -0,0 +1,288 @@
+"""
+Pre-warmed, reusable Deepgram live connections.
+
+Opening a websocket (DNS + TLS + upgrade) used to happen on every hotkey
+press. A DeepgramConnectionManager opens the socket ahead of time, keeps it
+alive with KeepAlive frames between sessions and hands it to the next
+session. Dropped sockets are reopened transparently, buffering a little
+audio while the new socket comes up.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    # The SDK is imported when the first socket is opened (see utils/lazy.py)
+    from deepgram import DeepgramClient, LiveOptions
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_INTERVAL = 5.0
+# Close a warm socket nobody has used for this long; prewarm() reopens it
+IDLE_TIMEOUT = 600.0
+# How long finals from a finished session keep being routed to its handlers
+RELEASE_GRACE = 1.5
+# Audio held while reconnecting (~2s of 16 kHz chunks)
+RECONNECT_BUFFER_CHUNKS = 96
+
+
+def _events():
+    from deepgram import LiveTranscriptionEvents
+    return (
+        LiveTranscriptionEvents.Open,
+        LiveTranscriptionEvents.Transcript,
+        LiveTranscriptionEvents.UtteranceEnd,
+        LiveTranscriptionEvents.Error,
+        LiveTranscriptionEvents.Close,
+    )
+
+
+class DeepgramSession:
+    """The per-activation view of a managed connection.
+
+    Exposes the subset of the SDK connection the transcribers use, so it can
+    stand in for the object returned by listen.websocket.v("1").
+    """
+
+    def __init__(self, manager: "DeepgramConnectionManager"):
+        self.manager = manager
+        self.finished = False
+        # Where this session's audio starts on the socket's timeline, in bytes.
+        # Deepgram's timestamps run from the socket opening, not the session.
+        self.socket_start = manager._socket_bytes
+
+    def send(self, data: bytes) -> None:
+        self.manager._send(data)
+
+    def keep_alive(self) -> None:
+        self.manager._call("keep_alive")
+
+    def finalize(self) -> None:
+        self.manager._call("finalize")
+
+    def finish(self) -> None:
+        if not self.finished:
+            self.finished = True
+            self.manager.release(self)
+
+
+class DeepgramConnectionManager:
+    def __init__(self, options_factory: Callable[[], "LiveOptions"],
+                 url: Optional[str] = None, api_key: Optional[str] = None,
+                 idle_timeout: float = IDLE_TIMEOUT, name: str = "deepgram"):
+        self.options_factory = options_factory
+        self.url = url
+        self.api_key = api_key
+        self.idle_timeout = idle_timeout
+        self.name = name
+
+        self._lock = threading.RLock()
+        self._connection = None
+        self._options_key: Optional[str] = None
+        self._connected = False
+        self._reconnecting = False
+        self._handlers: Dict[Any, Callable] = {}
+        self._session: Optional[DeepgramSession] = None
+        self._release_timer: Optional[threading.Timer] = None
+        self._pending_audio = deque(maxlen=RECONNECT_BUFFER_CHUNKS)
+        self._socket_bytes = 0
+        self._last_used = time.monotonic()
+        self._stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self.connects = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def _client(self) -> "DeepgramClient":
+        from deepgram import DeepgramClient, DeepgramClientOptions
+        api_key = self.api_key or os.getenv("DEEPGRAM_API_KEY", "")
+        if self.url:
+            return DeepgramClient(api_key, DeepgramClientOptions(url=self.url))
+        return DeepgramClient(api_key)
+
+    def _make_dispatcher(self, event):
+        from deepgram import LiveTranscriptionEvents
+        closing = event in (LiveTranscriptionEvents.Close, LiveTranscriptionEvents.Error)
+
+        def dispatch(client, *args, **kwargs):
+            if closing:
+                if client is self._connection:
+                    self._connected = False
+                    logger.warning(f"[{self.name}] connection dropped ({event})")
+            handler = self._handlers.get(event)
+            if handler is not None:
+                handler(client, *args, **kwargs)
+        return dispatch
+
+    def _open(self) -> None:
+        """Open a fresh socket; callers hold the lock"""
+        self._close_connection()
+        options = self.options_factory()
+        started = time.monotonic()
+        connection = self._client().listen.websocket.v("1")
+        for event in _events():
+            connection.on(event, self._make_dispatcher(event))
+        if connection.start(options) is False:
+            raise ConnectionError("Failed to start Deepgram connection")
+        if self._session is not None:
+            # Reconnected mid-session: the new socket's timeline starts where this one stopped
+            self._session.socket_start -= self._socket_bytes
+        self._socket_bytes = 0
+        self._connection = connection
+        self._options_key = options.to_json()
+        self._connected = True
+        self._last_used = time.monotonic()
+        self.connects += 1
+        logger.info(f"[{self.name}] connection opened in {(time.monotonic() - started) * 1000:.0f}ms")
+        self._ensure_keepalive_thread()
+
+    def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        self._connected = False
+        if connection is not None:
+            try:
+                connection.finish()
+            except Exception as e:
+                logger.debug(f"[{self.name}] error closing connection: {e}")
+
+    def _needs_open(self) -> bool:
+        if not self._connected or self._connection is None:
+            return True
+        return self._options_key != self.options_factory().to_json()
+
+    def prewarm(self) -> None:
+        """Open the socket in the background if it isn't already open"""
+        if not self._needs_open():
+            self._last_used = time.monotonic()
+            return
+
+        def run():
+            try:
+                with self._lock:
+                    if self._needs_open():
+                        self._open()
+                    self._last_used = time.monotonic()
+            except Exception as e:
+                logger.error(f"[{self.name}] prewarm failed: {e}")
+        threading.Thread(target=run, daemon=True).start()
+
+    def acquire(self, handlers: Dict[Any, Callable]) -> DeepgramSession:
+        """Bind handlers to the warm connection (opening one if needed)"""
+        with self._lock:
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+                self._release_timer = None
+            if self._needs_open():
+                logger.info(f"[{self.name}] no warm connection, opening one")
+                self._open()
+            self._handlers = dict(handlers)
+            self._session = DeepgramSession(self)
+            self._last_used = time.monotonic()
+            return self._session
+
+    def release(self, session: DeepgramSession) -> None:
+        """Flush the session's audio and keep the socket warm for the next one"""
+        with self._lock:
+            if session is not self._session:
+                return
+            self._session = None
+            self._last_used = time.monotonic()
+            self._pending_audio.clear()
+            if self._connected:
+                self._call("finalize")
+
+            def detach():
+                with self._lock:
+                    if self._session is None:
+                        self._handlers = {}
+                    self._release_timer = None
+
+            self._release_timer = threading.Timer(RELEASE_GRACE, detach)
+            self._release_timer.daemon = True
+            self._release_timer.start()
+
+    def _call(self, method: str) -> None:
+        connection = self._connection
+        if connection is None or not self._connected:
+            return
+        try:
+            getattr(connection, method)()
+        except Exception as e:
+            logger.warning(f"[{self.name}] {method} failed: {e}")
+
+    def _send(self, data: bytes) -> None:
+        connection = self._connection
+        if connection is not None and self._connected:
+            if self._pending_audio:
+                self._flush_pending(connection)
+            if connection.send(data) is not False:
+                self._socket_bytes += len(data)
+                return
+            self._connected = False
+        self._pending_audio.append(data)
+        self._reconnect_async()
+
+    def _flush_pending(self, connection) -> None:
+        while self._pending_audio:
+            data = self._pending_audio.popleft()
+            connection.send(data)
+            self._socket_bytes += len(data)
+
+    def _reconnect_async(self) -> None:
+        with self._lock:
+            if self._reconnecting:
+                return
+            self._reconnecting = True
+
+        def run():
+            try:
+                with self._lock:
+                    if self._needs_open():
+                        self._open()
+                        logger.info(f"[{self.name}] reconnected")
+            except Exception as e:
+                logger.error(f"[{self.name}] reconnect failed: {e}")
+            finally:
+                self._reconnecting = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def _ensure_keepalive_thread(self) -> None:
+        if self._keepalive_thread is not None and self._keepalive_thread.is_alive():
+            return
+        self._stop.clear()
+        self._keepalive_thread = threading.Thread(target=self._keepalive_loop, daemon=True)
+        self._keepalive_thread.start()
+
+    def _keepalive_loop(self) -> None:
+        while not self._stop.wait(KEEPALIVE_INTERVAL):
+            with self._lock:
+                if self._session is not None:
+                    # Sessions keep the socket alive themselves (audio or VAD KeepAlives)
+                    if not self._connected:
+                        self._reconnect_async()
+                    continue
+                if self._connection is None:
+                    continue
+                if time.monotonic() - self._last_used > self.idle_timeout:
+                    logger.info(f"[{self.name}] closing idle connection")
+                    self._close_connection()
+                    continue
+                if not self._connected:
+                    self._reconnect_async()
+                    continue
+                self._call("keep_alive")
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop.set()
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+            self._session = None
+            self._handlers = {}
+            self._close_connection()
@@ -0,0 +1,175 @@
+"""
+Pre-rendered earcons for the fixed phrases Spritely speaks on every activation.
+
+Phrases like "Spritely here" never change, so instead of a TTS round trip per
+hotkey press they are rendered once per (text, voice, model), stored as raw
+PCM under ~/.spritely/earcons/ and played from memory. The voice is looked
+up on every play, so changing it renders the phrases again in the new voice;
+warm_up() drops the old ones.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.spritely.core.config import config
+from src.spritely.utils.audio_utils import play_pcm, PLAYBACK_RATE
+from src.spritely.utils.user_settings import settings
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE_ID = "OOjDveYEA7KnRY2FRSmX"
+DEFAULT_TTS_MODEL = "eleven_multilingual_v2"
+OUTPUT_FORMAT = f"pcm_{PLAYBACK_RATE}"
+
+# Phrases played on every activation; rendered by warm_up()
+WAKE_PHRASE = "Spritely here"
+THINKING_PHRASE = "thinking..."
+CLIPBOARD_PHRASE = "Added to your clipboard, let me know what's next"
+EARCON_PHRASES = (WAKE_PHRASE, THINKING_PHRASE, CLIPBOARD_PHRASE)
+
+EarconKey = Tuple[str, str, str]
+
+
+def current_voice() -> Tuple[str, str]:
+    """Return the (voice, model) pair from the user's settings"""
+    voice = settings.get('voice_id') or config.settings.voice_id or DEFAULT_VOICE_ID
+    return voice, DEFAULT_TTS_MODEL
+
+
+class EarconCache:
+    def __init__(self, cache_dir: Optional[Path] = None, client=None):
+        self.cache_dir = cache_dir or config.config_dir / "earcons"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.cache_dir / "manifest.json"
+        self._client = client
+        self._memory: Dict[EarconKey, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from elevenlabs.client import ElevenLabs
+            self._client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+        return self._client
+
+    @staticmethod
+    def _filename(key: EarconKey) -> str:
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+        return f"{digest}.pcm"
+
+    def _render(self, key: EarconKey) -> bytes:
+        text, voice, model = key
+        logger.info(f"Rendering earcon '{text}' with voice {voice}")
+        audio = self.client.generate(
+            text=text,
+            voice=voice,
+            model=model,
+            output_format=OUTPUT_FORMAT
+        )
+        return audio if isinstance(audio, bytes) else b"".join(audio)
+
+    def get(self, text: str, voice: Optional[str] = None, model: Optional[str] = None) -> bytes:
+        """Return PCM for a phrase, loading from disk or rendering on a miss"""
+        default_voice, default_model = current_voice()
+        key = (text, voice or default_voice, model or default_model)
+
+        pcm = self._memory.get(key)
+        if pcm is not None:
+            return pcm
+
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                return pcm
+
+            path = self.cache_dir / self._filename(key)
+            if path.exists():
+                pcm = path.read_bytes()
+            else:
+                pcm = self._render(key)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(pcm)
+                os.replace(tmp_path, path)
+                self._update_manifest(key)
+            self._memory[key] = pcm
+            return pcm
+
+    def play(self, text: str) -> None:
+        """Play a cached phrase, falling back to silence if rendering fails"""
+        try:
+            pcm = self.get(text)
+        except Exception as e:
+            logger.error(f"Could not render earcon '{text}': {e}", exc_info=True)
+            return
+        play_pcm(pcm, rate=PLAYBACK_RATE)
+
+    def warm_up(self, phrases: Iterable[str] = EARCON_PHRASES) -> None:
+        """Render (or load) all phrases for the current voice and drop stale ones"""
+        voice, model = current_voice()
+        wanted = set()
+        for text in phrases:
+            wanted.add(self._filename((text, voice, model)))
+            try:
+                self.get(text, voice, model)
+            except Exception as e:
+                logger.error(f"Earcon warm-up failed for '{text}': {e}")
+        self._prune(keep=wanted)
+        logger.info(f"Earcon cache warmed with {len(wanted)} phrases")
+
+    def warm_up_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self) -> None:
+        """Forget every cached phrase, e.g. after the voice settings change"""
+        with self._lock:
+            self._memory.clear()
+            for path in self.cache_dir.glob("*.pcm"):
+                path.unlink(missing_ok=True)
+            self.manifest_file.unlink(missing_ok=True)
+
+    def _read_manifest(self) -> Dict[str, list]:
+        try:
+            return json.loads(self.manifest_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _update_manifest(self, key: EarconKey) -> None:
+        manifest = self._read_manifest()
+        manifest[self._filename(key)] = list(key)
+        self.manifest_file.write_text(json.dumps(manifest, indent=2))
+
+    def _prune(self, keep: set) -> None:
+        """Remove phrases rendered with a voice/model that is no longer selected"""
+        with self._lock:
+            manifest = self._read_manifest()
+            for filename in list(manifest):
+                if filename in keep:
+                    continue
+                (self.cache_dir / filename).unlink(missing_ok=True)
+                self._memory.pop(tuple(manifest.pop(filename)), None)
+            self.manifest_file.write_text(json.dumps(manifest, indent=2))
+
+
+# Shared cache instance
+earcon_cache = EarconCache()
+
+
+def _on_settings_changed(changed: Dict) -> None:
+    if "voice_id" in changed:
+        logger.info("Voice changed, re-rendering earcons")
+        earcon_cache.invalidate()
+        earcon_cache.warm_up_async()
+
+
+config.add_listener(_on_settings_changed)
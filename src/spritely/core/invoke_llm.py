@@ -1,29 +1,27 @@
+import asyncio
 from pydantic import BaseModel
 from dotenv import load_dotenv
-import os
-from elevenlabs import stream as play_audio
-from elevenlabs.client import ElevenLabs
-from anthropic import Anthropic
 import prompts
 import pyperclip
-from typing import Literal, List, Dict
-from groq import Groq
-from datetime import datetime
+import re
+from typing import AsyncIterator, Literal, List, Dict, Optional, Tuple, Union
+import time
 
 from src.spritely.utils.logging import setup_logging
 from src.spritely.core.tools import tools
 from src.spritely.core.browser import execute_browser_task
+from src.spritely.core.earcons import earcon_cache, current_voice, CLIPBOARD_PHRASE
+from src.spritely.core.speech_pipeline import SpeechPipeline, elevenlabs_async_synthesizer
+from src.spritely.core.providers import get_providers, ROUTER_TIMEOUT
+from src.spritely.core.speculative import TokenStream
+from src.spritely.core.memory import ConversationMemory
+from src.spritely.core.prompt_cache import cached_system, prompt_cache_stats, with_cached_prefix
+from src.spritely.core.response_router import response_router, DEFAULT_THRESHOLD
+from src.spritely.utils.user_settings import settings
+from src.spritely.utils.tracing import mark, span
 
 load_dotenv()
 
-eleven_labs_api_key = os.getenv("ELEVENLABS_API_KEY")
-anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-groq_api_key = os.getenv("GROQ_API_KEY")
-
-eleven_labs = ElevenLabs(api_key=eleven_labs_api_key)
-anthropic_client = Anthropic(api_key=anthropic_api_key)
-groq_client = Groq(api_key=groq_api_key)
-
 # Initialize logger
 logger = setup_logging(log_level="DEBUG", use_color=True)
 
@@ -43,39 +41,24 @@ class ResponseType:
 
 ResponseTypeStr = Literal["speak", "clipboard", "store", "field"]
 
-class ConversationMemory:
-    def __init__(self, max_history: int = 10):
-        self.history: List[Dict] = []
-        self.max_history = max_history
-    
-    def add_exchange(self, user_input: str, response: str, response_type: str):
-        """Add a conversation exchange to memory"""
-        exchange = {
-            "timestamp": datetime.now().isoformat(),
-            "user_input": user_input,
-            "response": response,
-            "response_type": response_type
-        }
-        self.history.append(exchange)
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-    
-    def get_context(self) -> str:
-        """Get formatted conversation history for context"""
-        context = []
-        for exchange in self.history:
-            context.append(f"[User]: {exchange['user_input']}")
-            context.append(f"[Assistant ({exchange['response_type']})]: {exchange['response']}")
-        return "\n".join(context)
+# A plain prompt, or content blocks with a cached prefix
+PromptContent = Union[str, List[Dict]]
+
+# How much a remote router answer is trusted (see remote_route)
+REMOTE_TAG_CONFIDENCE = 0.9
+REMOTE_GUESS_CONFIDENCE = 0.5
+# The whole reply the router prompt asks for
+_ROUTE_TAG = re.compile(r"\s*\[(speak|clipboard)\]\s*", re.I)
 
 # Initialize conversation memory
-conversation_memory = ConversationMemory()
+conversation_memory = ConversationMemory(max_tokens=settings.get("memory_max_tokens", 2000))
 
-async def save_to_clipboard(prompt: str) -> str:
+async def save_to_clipboard(prompt: PromptContent, tokens: Optional[AsyncIterator[str]] = None) -> str:
     """Save LLM response to clipboard and play notification.
     
     Args:
         prompt: Input prompt for LLM
+        tokens: An already running generation to use instead of starting one
         
     Returns:
         str: Combined response text
@@ -83,46 +66,53 @@ async def save_to_clipboard(prompt: str) -> str:
     logger.debug("📋 Starting clipboard save operation...")
     
     # Collect full response
-    response_text = "".join([chunk for chunk in llm_clipboard(prompt)])
-    pyperclip.copy(response_text)
+    if tokens is not None:
+        response_text = "".join([chunk async for chunk in tokens])
+    else:
+        response_text = "".join([chunk async for chunk in llm_clipboard(prompt)])
+    await asyncio.to_thread(pyperclip.copy, response_text)
     
     try:
-        # Generate and play audio using ElevenLabs
-        audio_stream = eleven_labs.generate(
-            text="Added to your clipboard, let me know what's next",
-            voice="OOjDveYEA7KnRY2FRSmX",
-            model="eleven_multilingual_v2",
-            stream=True
-        )
-        play_audio(audio_stream)
+        await asyncio.to_thread(earcon_cache.play, CLIPBOARD_PHRASE)
         logger.info("🔊 Played clipboard notification audio")
-        logger.debug("🔊 Generated clipboard notification audio")
     except Exception as e:
         logger.error(f"🔇 Audio notification failed: {e}", exc_info=True)
     
     return response_text
 
-def llm_clipboard(prompt: str):
-    message = anthropic_client.messages.create(
-        model="claude-3-5-sonnet-20241022",
-        max_tokens=1024,
-        temperature=0.4,
-        messages=[{
-            "role": "user",
-            "content": prompt
-        }],
-        stream=True,
-        system=prompts.CLIPBOARD_PROMPT
-    )
-    
-    for chunk in message:
-        if chunk.type == "content_block_delta":
-            logger.debug(f"📝 Received chunk: {chunk.delta.text[:20]}...")
-            yield chunk.delta.text
+# System prompt for each response type that has its own generation
+SYSTEM_PROMPTS: Dict[str, str] = {
+    ResponseType.SPEAK: prompts.SPEAK_PROMPT,
+    ResponseType.CLIPBOARD: prompts.CLIPBOARD_PROMPT,
+}
+# The same prompts as cached system blocks, built once
+CACHED_SYSTEM_PROMPTS: Dict[str, List[Dict]] = {
+    rt: cached_system(text) for rt, text in SYSTEM_PROMPTS.items()
+}
+
+def build_prompt(prompt: str) -> Tuple[str, List[Dict]]:
+    """Wrap the request in the conversation history.
 
+    Returns the prompt as text (for routing) and as content blocks whose
+    history prefix is marked for prompt caching.
+    """
+    history = conversation_memory.context_blocks()
+    prefix = [f"<conversation_history>\n{history[0]}"] + [f"\n{block}" for block in history[1:]] if history else []
+    opening = "" if history else "<conversation_history>\n"
+    suffix = f"""{opening}
+</conversation_history>
 
-def llm_speak(prompt: str):
-    message = anthropic_client.messages.create(
+<current_request>
+{prompt}
+</current_request>
+
+<thinking>Please consider the conversation history above when formulating your response.</thinking>"""
+    return "".join(prefix) + suffix, with_cached_prefix(prefix, [suffix])
+
+async def llm_stream(prompt: PromptContent, response_type: str) -> AsyncIterator[str]:
+    """Stream Claude's response using the system prompt for response_type"""
+    # Closing this generator (e.g. a cancelled speculative stream) closes the HTTP response
+    message = await get_providers().anthropic.messages.create(
         model="claude-3-5-sonnet-20241022",
         max_tokens=1024,
         temperature=0.4,
@@ -131,30 +121,94 @@ def llm_speak(prompt: str):
             "content": prompt
         }],
         stream=True,
-        system=prompts.SPEAK_PROMPT
+        system=CACHED_SYSTEM_PROMPTS[response_type]
     )
-    for chunk in message:
-        if chunk.type == "content_block_delta":
-            logger.debug(f"📝 Received chunk: {chunk.delta.text[:20]}...")
-            yield chunk.delta.text
-
-async def tts_service(prompt: str):
-    audio_stream = eleven_labs.generate(
-        text=llm_speak(prompt),
-        voice="OOjDveYEA7KnRY2FRSmX",
-        model="eleven_multilingual_v2",
-        stream=True
-    )
-    logger.debug("🔊 Generated audio stream, starting playback...")
-    play_audio(audio_stream)
+    mark("llm_stream_open", response_type=response_type)
+    first = True
+    async with message:
+        async for chunk in message:
+            if chunk.type == "message_start":
+                prompt_cache_stats.record(chunk.message.usage, label=response_type)
+            elif chunk.type == "content_block_delta":
+                if first:
+                    mark("llm_first_token", response_type=response_type)
+                    first = False
+                logger.debug(f"📝 Received chunk: {chunk.delta.text[:20]}...")
+                yield chunk.delta.text
+
+
+def llm_clipboard(prompt: PromptContent) -> AsyncIterator[str]:
+    return llm_stream(prompt, ResponseType.CLIPBOARD)
+
+
+def llm_speak(prompt: PromptContent) -> AsyncIterator[str]:
+    return llm_stream(prompt, ResponseType.SPEAK)
+
+async def tts_service(prompt: PromptContent, started: Optional[float] = None,
+                      tokens: Optional[AsyncIterator[str]] = None) -> str:
+    """Speak the LLM response sentence by sentence while it is still generating.
+
+    Returns:
+        str: The full spoken response text
+    """
+    voice, model = current_voice()
+    pipeline = SpeechPipeline(elevenlabs_async_synthesizer(get_providers().elevenlabs, voice, model))
+    logger.debug("🔊 Streaming LLM response through the speech pipeline...")
+    metrics = await pipeline.speak(tokens if tokens is not None else llm_speak(prompt), started=started)
     logger.info("✅ Completed audio playback")
+    return metrics.text
+
+async def get_response_type(prompt: str) -> str:
+    """Determine whether the response should be spoken or copied to clipboard.
+
+    Uses the local classifier and only asks the remote router when unsure.
+    """
+    label, confidence, confident = local_response_type(prompt)
+    if confident:
+        return label
+    return await fallback_response_type(prompt, label, confidence)
+
+def local_response_type(prompt: str) -> Tuple[str, float, bool]:
+    """The local classifier's label and confidence, and whether that is enough to decide"""
+    label, confidence, source = response_router.classify(prompt)
+    threshold = settings.get("response_router_threshold", DEFAULT_THRESHOLD)
+    if confidence >= threshold:
+        logger.info(f"📋 Response type determined locally: {label} ({source}, {confidence:.2f})")
+        mark("route_decision", label=label, source=source, confidence=round(confidence, 3))
+        return label, confidence, True
+    logger.debug(f"🤔 Local router unsure ({label}, {confidence:.2f}), asking remote router...")
+    return label, confidence, False
+
+async def fallback_response_type(prompt: str, label: str, confidence: float) -> str:
+    """Ask the remote router, falling back to the local guess if it fails"""
+    try:
+        with span("remote_router"):
+            response_type, remote_confidence = await remote_route(prompt)
+    except Exception:
+        logger.warning(f"⚠️ Remote router failed, using local guess: {label}")
+        mark("route_decision", label=label, source="fallback", confidence=round(confidence, 3))
+        return label
+    mark("route_decision", label=response_type, source="remote", confidence=remote_confidence)
+    # Only clear answers are learned from; the model file is saved in batches
+    await asyncio.to_thread(response_router.learn, prompt, response_type, remote_confidence)
+    return response_type
+
+async def remote_response_type(prompt: str) -> str:
+    """Ask the Groq-hosted LLM whether the response should be spoken or copied"""
+    response_type, _ = await remote_route(prompt)
+    return response_type
 
-async def get_response_type(prompt: str, client: Anthropic) -> str:
-    """Determine whether the response should be spoken or copied to clipboard"""
+async def remote_route(prompt: str) -> Tuple[str, float]:
+    """The remote router's answer, with how clearly it was given.
+
+    A reply in the requested [speak]/[clipboard] form counts as
+    REMOTE_TAG_CONFIDENCE; anything that has to be guessed from looser
+    wording as REMOTE_GUESS_CONFIDENCE.
+    """
     logger.debug("🎯 Determining response type...")
     try:
 
-        chat_completion = groq_client.chat.completions.create(
+        chat_completion = await asyncio.wait_for(get_providers().groq.chat.completions.create(
             messages=[
                 {
                     "role": "system",
@@ -166,37 +220,38 @@ async def get_response_type(prompt: str, client: Anthropic) -> str:
                 }
             ],
             model="llama3-70b-8192",
-        )
+        ), timeout=ROUTER_TIMEOUT)
 
         response_text = chat_completion.choices[0].message.content
     
         logger.debug(f"🔍 Raw response type text: {response_text}\n")
         
-        # Look for [speak] tag in the response
-        if 'speak' in response_text:
-            return ResponseType.SPEAK
-        elif 'clipboard' in response_text:
-            return ResponseType.CLIPBOARD
+        # Only a reply that is exactly the [speak] or [clipboard] tag is clear enough to learn from
+        tag = _ROUTE_TAG.fullmatch(response_text)
+        if tag:
+            return tag.group(1).lower(), REMOTE_TAG_CONFIDENCE
         
         # Fallback to previous detection method
         is_speak = any(word in response_text for word in ['speak', 'speech', 'voice', 'audio'])
         response_type = ResponseType.SPEAK if is_speak else ResponseType.CLIPBOARD
         
         logger.info(f"📋 Response type determined: {response_type}\n")
-        return response_type
+        return response_type, REMOTE_GUESS_CONFIDENCE
     except Exception as e:
-        logger.error(f"❌ Error in get_response_type: {e}", exc_info=True)
+        logger.error(f"❌ Error in remote_response_type: {e}", exc_info=True)
         raise
 
 async def process_prompt(prompt: str) -> tuple[str, ResponseTypeStr]:
     logger.info(f"🎯 Processing prompt: {prompt[:50]}...")
+    started = time.monotonic()
     
     try:
         # Check for browser-related keywords
         if any(keyword in prompt.lower() for keyword in ['use the browser', 'use the internet']):
             logger.info("🌐 Browser action detected, invoking browser tool...")
             try:
-                result = await execute_browser_task(prompt)
+                with span("browser_task"):
+                    result = await execute_browser_task(prompt)
                 response_text = f"Browser task completed. Result: {result}"
                 response_type = ResponseType.CLIPBOARD
                 conversation_memory.add_exchange(prompt, response_text, response_type)
@@ -205,30 +260,47 @@ async def process_prompt(prompt: str) -> tuple[str, ResponseTypeStr]:
                 logger.error(f"❌ Browser task failed: {e}", exc_info=True)
                 raise
 
-        # Get conversation history context
-        context = conversation_memory.get_context()
-        
-        # Add thinking tags and context to the prompt
-        enhanced_prompt = f"""<conversation_history>
-{context}
-</conversation_history>
+        # Add thinking tags and conversation history to the prompt
+        enhanced_prompt, content = build_prompt(prompt)
 
-<current_request>
-{prompt}
-</current_request>
+        # Most prompts are routed locally in well under a millisecond
+        response_type, confidence, confident = local_response_type(enhanced_prompt)
 
-<thinking>Please consider the conversation history above when formulating your response.</thinking>"""
+        streams: Dict[str, TokenStream] = {}
+        if not confident and settings.get("speculative_routing", True):
+            # The remote router takes a round trip: start every candidate
+            # generation meanwhile and keep the one it picks
+            streams = {
+                rt: TokenStream(lambda rt=rt: llm_stream(content, rt), name=rt)
+                for rt in SYSTEM_PROMPTS
+            }
 
-        response_type = await get_response_type(enhanced_prompt, anthropic_client)
-        logger.info(f"📋 Determined response type: {response_type}")
-        
-        response_text = ""
-        if response_type == ResponseType.SPEAK:
-            await tts_service(enhanced_prompt)
-        elif response_type == ResponseType.CLIPBOARD:
-            response_text = await save_to_clipboard(enhanced_prompt)
-        elif response_type == ResponseType.STORE:
-            pass
+        try:
+            if not confident:
+                response_type = await fallback_response_type(enhanced_prompt, response_type, confidence)
+            logger.info(f"📋 Determined response type: {response_type}")
+
+            for rt, stream in streams.items():
+                if rt != response_type:
+                    stream.cancel()
+            chosen = streams.get(response_type)
+            if chosen is not None:
+                logger.debug(f"⚡ Route resolved after {(time.monotonic() - started) * 1000:.0f}ms, "
+                             f"{chosen.tokens_buffered} tokens already buffered")
+
+            response_text = ""
+            if response_type == ResponseType.SPEAK:
+                with span("speak"):
+                    response_text = await tts_service(content, started=started, tokens=chosen)
+            elif response_type == ResponseType.CLIPBOARD:
+                with span("clipboard"):
+                    response_text = await save_to_clipboard(content, tokens=chosen)
+            elif response_type == ResponseType.STORE:
+                pass
+        finally:
+            # Stop whatever is still generating if routing or output failed
+            for stream in streams.values():
+                stream.cancel()
             
         # Store the exchange in memory
         conversation_memory.add_exchange(prompt, response_text, response_type)
@@ -241,8 +313,6 @@ async def process_prompt(prompt: str) -> tuple[str, ResponseTypeStr]:
 
 # Update the main function to test both LLM and audio streaming
 if __name__ == "__main__":
-    import asyncio
-    
     async def main():
         try:
             logger.info("🚀 Testing LLM response with audio streaming...")
@@ -0,0 +1,108 @@
+"""
+Type dictation as it is recognised, correcting it in place.
+
+With interim results the ASR re-sends the whole provisional text of the
+current segment every few hundred milliseconds, then a final version. A
+LiveTyper keeps track of what it has typed for the segment and turns each
+new version into the smallest edit: backspace over the part that changed
+and type the new suffix. Finals commit the segment (plus a space) and the
+next interim starts a new one.
+
+Edits are worked out on a worker thread and sent through the shared
+text-injection queue. If interims arrive faster than they can be typed,
+only the newest one is applied; finals are never skipped.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from src.spritely.core.text_injection import InjectionQueue, get_injection_queue
+
+logger = logging.getLogger(__name__)
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    for i in range(n):
+        if a[i] != b[i]:
+            return i
+    return n
+
+
+class LiveTyper:
+    def __init__(self, output: Optional[InjectionQueue] = None):
+        self.output = output or get_injection_queue()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._finals = deque()
+        self._interim: Optional[str] = None
+        self._received_at: Optional[float] = None
+        self._shown = ""  # what is on screen for the current segment
+        self._stopped = False
+        self.keystrokes = 0
+        self.latencies_ms = deque(maxlen=200)
+        self._thread = threading.Thread(target=self._run, name="live-typer", daemon=True)
+        self._thread.start()
+
+    def interim(self, text: str) -> None:
+        """Provisional text for the current segment; replaces any earlier interim"""
+        with self._lock:
+            self._interim = text.strip()
+            self._received_at = time.monotonic()
+        self._wake.set()
+
+    def final(self, text: str) -> None:
+        """Settled text for the current segment"""
+        text = text.strip()
+        with self._lock:
+            self._finals.append((text + " " if text else "", time.monotonic()))
+            self._interim = None
+            self._received_at = None
+        self._wake.set()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Type whatever is pending, then stop"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self.output.flush(timeout)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    if self._finals:
+                        target, received = self._finals.popleft()
+                        final = True
+                    elif self._interim is not None:
+                        target, received = self._interim, self._received_at
+                        self._interim, self._received_at = None, None
+                        final = False
+                    else:
+                        break
+                self._apply(target, received)
+                if final:
+                    self._shown = ""
+            if self._stopped:
+                return
+
+    def _apply(self, target: str, received: Optional[float]) -> None:
+        keep = common_prefix_length(self._shown, target)
+        erase = len(self._shown) - keep
+        try:
+            if erase:
+                self.output.backspace(erase)
+            if target[keep:]:
+                self.output.type(target[keep:])
+        except Exception as e:
+            logger.error(f"Live typing failed: {e}")
+            return
+        self.keystrokes += erase + len(target) - keep
+        self._shown = target
+        if received is not None:
+            self.latencies_ms.append((time.monotonic() - received) * 1000)
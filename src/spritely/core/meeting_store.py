@@ -0,0 +1,258 @@
+"""
+SQLite store for meeting transcripts with full-text search.
+
+Every utterance of every meeting goes into one database (WAL mode, so the
+GUI can search while a meeting is being saved), with an FTS5 index over the
+text. Existing meetings/json/transcription_*.json exports can be ingested
+in bulk.
+
+    python -m src.spritely.core.meeting_store ingest meetings/json
+    python -m src.spritely.core.meeting_store search "budget review" --speaker 1
+    python -m src.spritely.core.meeting_store list
+"""
+
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.spritely.core.config import config
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = config.config_dir / "meetings.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id TEXT PRIMARY KEY,
+    started_at TEXT,
+    source TEXT,
+    utterance_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS utterances (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    timestamp TEXT,
+    speaker INTEGER,
+    start_time REAL,
+    duration REAL,
+    confidence REAL,
+    request_id TEXT,
+    text TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS utterances_meeting_seq ON utterances(meeting_id, seq);
+CREATE INDEX IF NOT EXISTS utterances_speaker ON utterances(speaker);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS utterances_fts USING fts5(
+    text, content='utterances', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS utterances_ai AFTER INSERT ON utterances BEGIN
+    INSERT INTO utterances_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS utterances_ad AFTER DELETE ON utterances BEGIN
+    INSERT INTO utterances_fts(utterances_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_SESSION_ID = re.compile(r"transcription_(\d{8}_\d{6})")
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def meeting_id_for(path) -> str:
+    match = _SESSION_ID.search(Path(path).name)
+    return match.group(1) if match else Path(path).stem
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, `word*` is a prefix"""
+    terms = []
+    for term in _TERM.findall(text):
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(terms)
+
+
+class MeetingStore:
+    def __init__(self, path=DB_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: search falls back to LIKE
+            logger.warning(f"FTS5 unavailable, using slower substring search: {e}")
+            self.has_fts = False
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_meeting(self, meeting_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+        return row is not None
+
+    def add_meeting(self, meeting_id: str, records: Iterable[Dict], source: Optional[str] = None,
+                    replace: bool = False) -> int:
+        """Insert one meeting's utterances in a single transaction; returns the count"""
+        rows = [
+            (meeting_id, seq, r.get('timestamp'), r.get('speaker'), r.get('start_time'),
+             r.get('duration'), r.get('confidence'), r.get('request_id'), r['transcript'])
+            for seq, r in enumerate(records)
+            if r.get('transcript', '').strip()
+        ]
+        started_at = rows[0][2] if rows else None
+        with self._lock, self._db:
+            if replace:
+                self._db.execute("DELETE FROM utterances WHERE meeting_id = ?", (meeting_id,))
+                self._db.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+            elif self._db.execute("SELECT 1 FROM meetings WHERE id = ?", (meeting_id,)).fetchone():
+                return 0
+            self._db.execute(
+                "INSERT INTO meetings (id, started_at, source, utterance_count, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (meeting_id, started_at, source, len(rows), time.time())
+            )
+            self._db.executemany(
+                "INSERT INTO utterances (meeting_id, seq, timestamp, speaker, start_time, duration, "
+                "confidence, request_id, text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def ingest_json(self, path, replace: bool = False) -> int:
+        path = Path(path)
+        with open(path) as f:
+            records = json.load(f)
+        return self.add_meeting(meeting_id_for(path), records, source=str(path), replace=replace)
+
+    def ingest_directory(self, directory="meetings/json", replace: bool = False) -> Dict[str, int]:
+        """Ingest every transcription_*.json not already in the store"""
+        counts = {}
+        for path in sorted(Path(directory).glob("transcription_*.json")):
+            if path.suffixes != [".json"]:
+                # Sidecar files such as transcription_<ts>.strings.json
+                continue
+            if not replace and self.has_meeting(meeting_id_for(path)):
+                continue
+            try:
+                counts[meeting_id_for(path)] = self.ingest_json(path, replace=replace)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not ingest {path.name}: {e}")
+        return counts
+
+    def search(self, query: str, speaker: Optional[int] = None, meeting_id: Optional[str] = None,
+               since: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Utterances matching query, best matches first"""
+        filters, params = [], []
+        if speaker is not None:
+            filters.append("u.speaker = ?")
+            params.append(speaker)
+        if meeting_id is not None:
+            filters.append("u.meeting_id = ?")
+            params.append(meeting_id)
+        if since is not None:
+            filters.append("u.timestamp >= ?")
+            params.append(since)
+        where = "".join(f" AND {f}" for f in filters)
+
+        if self.has_fts:
+            match = fts_query(query)
+            if not match:
+                return []
+            sql = (
+                "SELECT u.*, snippet(utterances_fts, 0, '[', ']', '…', 12) AS snippet, "
+                "bm25(utterances_fts) AS rank "
+                "FROM utterances_fts JOIN utterances u ON u.id = utterances_fts.rowid "
+                f"WHERE utterances_fts MATCH ?{where} ORDER BY rank LIMIT ?"
+            )
+            params = [match] + params + [limit]
+        else:
+            sql = (f"SELECT u.*, u.text AS snippet, 0 AS rank FROM utterances u "
+                   f"WHERE u.text LIKE ?{where} ORDER BY u.meeting_id DESC, u.seq LIMIT ?")
+            params = [f"%{query}%"] + params + [limit]
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def meetings(self) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM meetings ORDER BY id DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def utterances(self, meeting_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM utterances WHERE meeting_id = ? ORDER BY seq", (meeting_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and manage stored meeting transcripts")
+    parser.add_argument("--db", default=str(DB_FILE), help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="import transcription_*.json files")
+    ingest.add_argument("directory", nargs="?", default="meetings/json")
+    ingest.add_argument("--replace", action="store_true", help="re-import meetings already stored")
+
+    search = commands.add_parser("search", help="full-text search across meetings")
+    search.add_argument("query")
+    search.add_argument("--speaker", type=int)
+    search.add_argument("--meeting")
+    search.add_argument("--since", help="ISO timestamp lower bound")
+    search.add_argument("--limit", type=int, default=20)
+
+    commands.add_parser("list", help="list stored meetings")
+
+    show = commands.add_parser("show", help="print one meeting")
+    show.add_argument("meeting")
+
+    args = parser.parse_args(argv)
+    with MeetingStore(args.db) as store:
+        if args.command == "ingest":
+            started = time.perf_counter()
+            counts = store.ingest_directory(args.directory, replace=args.replace)
+            print(f"📥 Ingested {len(counts)} meetings, {sum(counts.values())} utterances "
+                  f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        elif args.command == "search":
+            started = time.perf_counter()
+            results = store.search(args.query, speaker=args.speaker, meeting_id=args.meeting,
+                                   since=args.since, limit=args.limit)
+            for r in results:
+                print(f"[{r['meeting_id']} {r['timestamp'] or ''}] Speaker {r['speaker']}: {r['snippet']}")
+            print(f"🔎 {len(results)} results in {(time.perf_counter() - started) * 1000:.1f}ms")
+        elif args.command == "list":
+            for m in store.meetings():
+                print(f"{m['id']}  {m['utterance_count']:>5} utterances  {m['source'] or ''}")
+        elif args.command == "show":
+            for r in store.utterances(args.meeting):
+                print(f"[{r['timestamp']}] Speaker {r['speaker']}: {r['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Incremental meeting summarisation.
+
+While a meeting is recorded, finalised utterances are taken from the
+transcriber's list in windows of roughly `window_chars` characters and
+summarised in the background (map). Every `fan_in` segment summaries are
+merged into one summary a level up (reduce), so by the time the meeting
+ends only the last partial window and a handful of merges remain. The
+work left at stop time grows with log(meeting length), not with its
+length.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from src.spritely.core.ai_summarise import merge_summaries, summarise_segment
+
+logger = logging.getLogger(__name__)
+
+WINDOW_CHARS = 6000
+POLL_INTERVAL = 15.0
+FAN_IN = 4
+
+
+def format_utterance(entry: Dict) -> str:
+    """One transcript line, in the same format as the saved meeting text files"""
+    timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%H:%M:%S')
+    words = entry.get('words')
+    if words and hasattr(words[0], 'speaker'):
+        return f"[{timestamp}] Speaker {words[0].speaker}: {entry['transcript']}"
+    if entry.get('speaker') is not None:
+        return f"[{timestamp}] Speaker {entry['speaker']}: {entry['transcript']}"
+    return f"[{timestamp}] {entry['transcript']}"
+
+
+class MeetingSummariser:
+    def __init__(self, transcriptions: List[Dict], window_chars: int = WINDOW_CHARS,
+                 poll_interval: float = POLL_INTERVAL, fan_in: int = FAN_IN,
+                 summarise: Callable[[str, str], str] = summarise_segment,
+                 merge: Callable[..., str] = merge_summaries, max_workers: int = 3):
+        self.transcriptions = transcriptions
+        self.window_chars = window_chars
+        self.poll_interval = poll_interval
+        self.fan_in = fan_in
+        self.summarise = summarise
+        self.merge = merge
+
+        # levels[0] holds segment summaries, levels[n] merges of fan_in items from n-1.
+        # Each entry is a Future so merges can be scheduled before their inputs finish.
+        self.levels: List[List[Future]] = [[]]
+        self._cursor = 0
+        self._pending_lines: List[str] = []
+        self._pending_chars = 0
+        self._previous: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summariser")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.segments = 0
+
+    def start(self) -> "MeetingSummariser":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._collect()
+            except Exception as e:
+                logger.error(f"Meeting summariser error: {e}", exc_info=True)
+
+    def _collect(self, flush: bool = False) -> None:
+        """Move new utterances into the pending window; submit full windows"""
+        with self._lock:
+            # Appended to by the transcription thread; only read up to a snapshot length
+            end = len(self.transcriptions)
+            for entry in self.transcriptions[self._cursor:end]:
+                if entry['transcript'].strip():
+                    line = format_utterance(entry)
+                    self._pending_lines.append(line)
+                    self._pending_chars += len(line) + 1
+                    if self._pending_chars >= self.window_chars:
+                        self._submit_window()
+            self._cursor = end
+            if flush and self._pending_lines:
+                self._submit_window()
+
+    def _submit_window(self) -> None:
+        text = "\n".join(self._pending_lines)
+        self._pending_lines, self._pending_chars = [], 0
+        previous = self._previous
+        self.segments += 1
+        index = self.segments
+
+        def run() -> str:
+            # The previous segment's summary gives context across the window boundary
+            context = ""
+            if previous is not None:
+                try:
+                    context = previous.result()
+                except Exception:
+                    pass
+            try:
+                summary = self.summarise(text, context)
+                logger.info(f"📝 Summarised meeting segment {index} ({len(text)} chars)")
+                return summary
+            except Exception as e:
+                logger.error(f"Segment {index} summary failed, keeping transcript: {e}")
+                return text
+
+        future = self._executor.submit(run)
+        self._previous = future
+        self._add(0, future)
+
+    def _add(self, level: int, future: Future) -> None:
+        if level == len(self.levels):
+            self.levels.append([])
+        self.levels[level].append(future)
+        if len(self.levels[level]) >= self.fan_in:
+            inputs, self.levels[level] = self.levels[level], []
+            self._add(level + 1, self._executor.submit(self._merge, inputs))
+
+    def _merge(self, inputs: List[Future], final: bool = False, user_notes: Optional[str] = None) -> str:
+        summaries = [f.result() for f in inputs]
+        if len(summaries) == 1 and not final:
+            return summaries[0]
+        try:
+            return self.merge(summaries, user_notes=user_notes, final=final)
+        except Exception as e:
+            logger.error(f"Merging {len(summaries)} summaries failed: {e}")
+            return "\n\n".join(summaries)
+
+    def finish(self, user_notes: Optional[str] = None) -> "Future[str]":
+        """Stop consuming, summarise the remainder and merge everything.
+
+        Returns a Future resolving to the final summary (None if nothing was said).
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._collect(flush=True)
+
+        with self._lock:
+            # Higher levels cover earlier parts of the meeting
+            remaining = [f for level in reversed(self.levels) for f in level]
+            self.levels = [[]]
+
+        result: Future = Future()
+        if not remaining:
+            result.set_result(None)
+            self._executor.shutdown(wait=False)
+            return result
+
+        def reduce() -> None:
+            try:
+                items = remaining
+                # Merge in groups until one final merge covers the whole meeting
+                while len(items) > self.fan_in:
+                    items = [self._executor.submit(self._merge, items[i:i + self.fan_in])
+                             for i in range(0, len(items), self.fan_in)]
+                result.set_result(self._merge(items, final=True, user_notes=user_notes))
+            except Exception as e:
+                result.set_exception(e)
+            finally:
+                self._executor.shutdown(wait=False)
+
+        threading.Thread(target=reduce, daemon=True).start()
+        logger.info(f"📝 Finishing meeting summary from {self.segments} segments")
+        return result
@@ -0,0 +1,155 @@
+"""
+Conversation memory bounded by tokens rather than exchanges.
+
+Exchanges live in a deque with their rendered text and token estimate, so
+adding or evicting one is O(1) and the context is only joined when asked
+for. Evicted exchanges are condensed into a rolling synopsis that is
+itself kept under a small token budget, so prompt size stays flat however
+long the session runs.
+
+Eviction changes the start of the prompt, which throws away the
+provider's cached prefix, so it happens in batches: once over budget,
+exchanges are evicted until evict_fraction of the budget is free, and the
+prefix then stays the same for the next several requests.
+"""
+
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 2000
+DEFAULT_SYNOPSIS_TOKENS = 300
+# Share of the exchange budget freed by each round of eviction
+DEFAULT_EVICT_FRACTION = 0.4
+SYNOPSIS_SNIPPET_CHARS = 120
+
+_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)", re.S)
+_CLIPBOARD_TAG = re.compile(r"<user's_clipboard_content>.*?</user's_clipboard_content>", re.S)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+@dataclass
+class _Entry:
+    exchange: Dict
+    rendered: str
+    tokens: int
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(_CLIPBOARD_TAG.sub("[clipboard]", text).split())
+    match = _SENTENCE.match(text)
+    first = match.group(1) if match else text
+    if len(first) > SYNOPSIS_SNIPPET_CHARS:
+        first = first[:SYNOPSIS_SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+    return first
+
+
+def extractive_summary(exchange: Dict) -> str:
+    """One line per evicted exchange: the first sentence of each side"""
+    return (f"User asked: {_snippet(exchange['user_input'])} "
+            f"Assistant ({exchange['response_type']}): {_snippet(exchange['response'])}")
+
+
+class ConversationMemory:
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 synopsis_tokens: int = DEFAULT_SYNOPSIS_TOKENS,
+                 summarize: Callable[[Dict], str] = extractive_summary,
+                 evict_fraction: float = DEFAULT_EVICT_FRACTION):
+        self.max_tokens = max_tokens
+        self.synopsis_tokens = synopsis_tokens
+        self.summarize = summarize
+        self.evict_fraction = evict_fraction
+        self._entries: Deque[_Entry] = deque()
+        self._tokens = 0
+        self._synopsis: Deque[str] = deque()
+        self._synopsis_token_count = 0
+        self._context: Optional[str] = None
+        self.evicted = 0
+
+    @property
+    def history(self) -> List[Dict]:
+        return [entry.exchange for entry in self._entries]
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens in the rendered context"""
+        return self._tokens + self._synopsis_token_count
+
+    @staticmethod
+    def render_exchange(exchange: Dict) -> str:
+        return (f"[User]: {exchange['user_input']}\n"
+                f"[Assistant ({exchange['response_type']})]: {exchange['response']}")
+
+    def add_exchange(self, user_input: str, response: str, response_type: str):
+        """Add a conversation exchange to memory"""
+        exchange = {
+            "timestamp": datetime.now().isoformat(),
+            "user_input": user_input,
+            "response": response,
+            "response_type": response_type
+        }
+        rendered = self.render_exchange(exchange)
+        entry = _Entry(exchange, rendered, estimate_tokens(rendered))
+        self._entries.append(entry)
+        self._tokens += entry.tokens
+
+        budget = self.max_tokens - self.synopsis_tokens
+        if self._tokens > budget:
+            # Always keep the newest exchange, even if it alone exceeds the budget
+            target = budget * (1 - self.evict_fraction)
+            evicted = 0
+            while len(self._entries) > 1 and self._tokens > target:
+                self._evict()
+                evicted += 1
+            logger.debug(f"🧠 Evicted {evicted} exchanges into synopsis ({len(self._synopsis)} lines)")
+        self._context = None
+
+    def _evict(self) -> None:
+        entry = self._entries.popleft()
+        self._tokens -= entry.tokens
+        self.evicted += 1
+
+        line = self.summarize(entry.exchange)
+        self._synopsis.append(line)
+        self._synopsis_token_count += estimate_tokens(line)
+        while len(self._synopsis) > 1 and self._synopsis_token_count > self.synopsis_tokens:
+            self._synopsis_token_count -= estimate_tokens(self._synopsis.popleft())
+
+    @property
+    def synopsis(self) -> str:
+        return "\n".join(self._synopsis)
+
+    def context_blocks(self) -> List[str]:
+        """The context split at exchange boundaries (newline-joined it equals get_context()).
+
+        Earlier blocks stay identical as exchanges are appended, and only
+        change on a round of eviction, which is what lets them be served
+        from the provider's prompt cache.
+        """
+        blocks = [f"[Earlier in the conversation]:\n{self.synopsis}\n"] if self._synopsis else []
+        return blocks + [entry.rendered for entry in self._entries]
+
+    def get_context(self) -> str:
+        """Get formatted conversation history for context"""
+        if self._context is None:
+            rendered = "\n".join(entry.rendered for entry in self._entries)
+            if self._synopsis:
+                self._context = f"[Earlier in the conversation]:\n{self.synopsis}\n\n{rendered}"
+            else:
+                self._context = rendered
+        return self._context
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._synopsis.clear()
+        self._tokens = self._synopsis_token_count = 0
+        self._context = None
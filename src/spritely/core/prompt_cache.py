@@ -0,0 +1,102 @@
+"""
+Anthropic prompt caching helpers.
+
+Marks the stable prefix of a request (system prompt, older conversation
+history, long transcripts) with cache_control breakpoints so repeat calls
+read it from the provider's prompt cache, and keeps counters of how much
+input was served from the cache.
+
+Anthropic only caches prefixes above a minimum length (1024 tokens for
+Sonnet), so short prompts are sent as usual and simply record a miss.
+"""
+
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EPHEMERAL = {"type": "ephemeral"}
+# Anthropic allows at most four breakpoints per request
+MAX_BREAKPOINTS = 4
+
+
+def cached_text(text: str) -> Dict[str, Any]:
+    """A text content block ending a cacheable prefix"""
+    return {"type": "text", "text": text, "cache_control": EPHEMERAL}
+
+
+def text_block(text: str) -> Dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def cached_system(text: str) -> List[Dict[str, Any]]:
+    """System prompt as a single cached block"""
+    return [cached_text(text)]
+
+
+def with_cached_prefix(prefix: List[str], suffix: List[str]) -> List[Dict[str, Any]]:
+    """Content blocks where everything in prefix is cacheable.
+
+    Each prefix item is its own block and the breakpoint sits on the last
+    one; when the next request appends to the prefix, the provider finds
+    the previous breakpoint at an earlier block boundary and reuses it.
+    """
+    blocks = [text_block(text) for text in prefix if text]
+    if blocks:
+        blocks[-1] = cached_text(blocks[-1]["text"])
+    blocks += [text_block(text) for text in suffix if text]
+    return blocks
+
+
+@dataclass
+class PromptCacheStats:
+    calls: int = 0
+    hits: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    uncached_input_tokens: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls else 0.0
+
+    def record(self, usage: Any, label: str = "llm") -> Optional[Dict[str, int]]:
+        """Count one call's usage (the SDK usage object or a dict)"""
+        if usage is None:
+            return None
+
+        def field(name: str) -> int:
+            value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+            return value or 0
+
+        call = {
+            "cache_read_tokens": field("cache_read_input_tokens"),
+            "cache_write_tokens": field("cache_creation_input_tokens"),
+            "uncached_input_tokens": field("input_tokens"),
+        }
+        with self._lock:
+            self.calls += 1
+            self.hits += call["cache_read_tokens"] > 0
+            self.cache_read_tokens += call["cache_read_tokens"]
+            self.cache_write_tokens += call["cache_write_tokens"]
+            self.uncached_input_tokens += call["uncached_input_tokens"]
+
+        if call["cache_read_tokens"]:
+            logger.info(f"💾 [{label}] prompt cache hit: {call['cache_read_tokens']} input tokens from cache, "
+                        f"{call['uncached_input_tokens']} uncached")
+        else:
+            logger.debug(f"💾 [{label}] prompt cache miss ({call['cache_write_tokens']} tokens written)")
+        return call
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 3)
+        return data
+
+
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,134 @@
+"""
+Async clients for the LLM and TTS providers.
+
+All three SDK clients share one pooled httpx.AsyncClient with explicit
+timeouts, so requests reuse warm TLS connections and a stalled provider
+can never block the event loop the transcript callbacks run on.
+
+httpx connections belong to the event loop that created them, so each
+running loop gets its own set of clients:
+
+    providers = get_providers()
+    stream = await providers.anthropic.messages.create(..., stream=True)
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    # The SDKs are imported when a client is first built (see utils/lazy.py)
+    from anthropic import AsyncAnthropic
+    from elevenlabs.client import AsyncElevenLabs
+    from groq import AsyncGroq
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0)
+# Upper bound for a routing decision before giving up on the remote router
+ROUTER_TIMEOUT = 5.0
+MAX_RETRIES = 2
+
+
+class Providers:
+    def __init__(self, anthropic_base_url: Optional[str] = None,
+                 groq_base_url: Optional[str] = None,
+                 elevenlabs_base_url: Optional[str] = None,
+                 timeout: httpx.Timeout = HTTP_TIMEOUT):
+        self.anthropic_base_url = anthropic_base_url or os.getenv("ANTHROPIC_BASE_URL")
+        self.groq_base_url = groq_base_url or os.getenv("GROQ_BASE_URL")
+        self.elevenlabs_base_url = elevenlabs_base_url or os.getenv("ELEVENLABS_BASE_URL")
+        self.timeout = timeout
+        self._http: Optional[httpx.AsyncClient] = None
+        self._anthropic: Optional["AsyncAnthropic"] = None
+        self._groq: Optional["AsyncGroq"] = None
+        self._elevenlabs: Optional["AsyncElevenLabs"] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=self.timeout, limits=HTTP_LIMITS)
+        return self._http
+
+    @property
+    def anthropic(self) -> "AsyncAnthropic":
+        if self._anthropic is None:
+            from anthropic import AsyncAnthropic
+            kwargs = {"base_url": self.anthropic_base_url} if self.anthropic_base_url else {}
+            self._anthropic = AsyncAnthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                http_client=self.http,
+                timeout=self.timeout,
+                max_retries=MAX_RETRIES,
+                **kwargs
+            )
+        return self._anthropic
+
+    @property
+    def groq(self) -> "AsyncGroq":
+        if self._groq is None:
+            from groq import AsyncGroq
+            kwargs = {"base_url": self.groq_base_url} if self.groq_base_url else {}
+            self._groq = AsyncGroq(
+                api_key=os.getenv("GROQ_API_KEY"),
+                http_client=self.http,
+                timeout=self.timeout,
+                max_retries=MAX_RETRIES,
+                **kwargs
+            )
+        return self._groq
+
+    @property
+    def elevenlabs(self) -> "AsyncElevenLabs":
+        if self._elevenlabs is None:
+            from elevenlabs.client import AsyncElevenLabs
+            kwargs = {"base_url": self.elevenlabs_base_url} if self.elevenlabs_base_url else {}
+            self._elevenlabs = AsyncElevenLabs(
+                api_key=os.getenv("ELEVENLABS_API_KEY"),
+                httpx_client=self.http,
+                timeout=self.timeout.read,
+                **kwargs
+            )
+        return self._elevenlabs
+
+    def warm(self) -> None:
+        """Build the clients now, off the loop: the AsyncClient loads its CA bundle when built"""
+        self.anthropic, self.groq, self.elevenlabs
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+        self._http = None
+        self._anthropic = self._groq = self._elevenlabs = None
+
+
+_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Providers]" = weakref.WeakKeyDictionary()
+
+
+def get_providers() -> Providers:
+    """Clients bound to the running event loop (created on first use)"""
+    loop = asyncio.get_running_loop()
+    providers = _by_loop.get(loop)
+    if providers is None:
+        providers = _by_loop[loop] = Providers()
+        logger.debug("🔌 Created provider clients for event loop")
+    return providers
+
+
+def warm_providers(loop: asyncio.AbstractEventLoop) -> Providers:
+    """Build the clients for loop from another thread, e.g. the warm-up thread"""
+    providers = _by_loop.get(loop)
+    if providers is None:
+        providers = _by_loop.setdefault(loop, Providers())
+    providers.warm()
+    return providers
+
+
+def set_providers(providers: Providers) -> None:
+    """Use specific clients on the running loop, e.g. pointed at fake servers"""
+    _by_loop[asyncio.get_running_loop()] = providers
@@ -0,0 +1,216 @@
+"""
+Local response-type classification.
+
+Deciding between speaking a reply and copying it to the clipboard used to
+take a full Groq round trip for every prompt. The ResponseRouter answers
+locally instead: explicit phrases ("copy", "tell me", ...) are matched by
+rules, everything else goes through a small logistic regression over hashed
+word and character n-grams. Only predictions below the confidence threshold
+are sent to the remote router, whose clear answers are learned from.
+
+The model is trained from the bundled labelled examples on first use and
+persisted under ~/.spritely; what it learns afterwards is saved every
+SAVE_EVERY updates and by flush() at shutdown.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.spritely.core.config import config
+
+logger = logging.getLogger(__name__)
+
+SPEAK = "speak"
+CLIPBOARD = "clipboard"
+
+DATASET_FILE = Path(__file__).resolve().parent.parent / "data" / "response_types.jsonl"
+MODEL_FILE = config.config_dir / "response_router.json"
+MODEL_VERSION = 1
+
+DEFAULT_THRESHOLD = 0.75
+HASH_BITS = 18
+# Remote answers less certain than this are not learned from
+MIN_LEARN_CONFIDENCE = 0.8
+SAVE_EVERY = 20
+
+# Questions about copying ("how do I copy a file in bash") are left to the model
+_NOT_A_QUESTION = r"^(?!(how|what|why|when|where|which|who|does|do|did|is|are|should|can i|could i)\b)"
+
+# (pattern, label, confidence); first match wins
+RULES: List[Tuple[re.Pattern, str, float]] = [
+    (re.compile(_NOT_A_QUESTION + r".*\b(put|add|copy|save|paste)\b.*\b(on|to|in|into|onto) (the |my )?clipboard\b"),
+     CLIPBOARD, 0.99),
+    (re.compile(r"^((please|can you|could you) )?(copy|paste)\b"), CLIPBOARD, 0.95),
+    (re.compile(r"\b(and|then) (copy|paste) (it|that|this|them)\b"), CLIPBOARD, 0.95),
+    (re.compile(r"^(tell|explain to|talk|walk) me\b"), SPEAK, 0.97),
+    (re.compile(r"^(write|draft|compose|generate|create|rewrite|format|convert)\b"), CLIPBOARD, 0.95),
+    (re.compile(r"\b(say|read|sing) (me|it|something|that)\b"), SPEAK, 0.95),
+]
+
+_CURRENT_REQUEST = re.compile(r"<current_request>\s*(.*?)\s*</current_request>", re.S)
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def request_text(prompt: str) -> str:
+    """The user's request, without the conversation history process_prompt wraps it in"""
+    match = _CURRENT_REQUEST.search(prompt)
+    return (match.group(1) if match else prompt).strip().lower()
+
+
+def features(text: str) -> Dict[int, float]:
+    """Hashed word uni/bigrams (plus the leading word) and character trigrams"""
+    words = _TOKEN.findall(text)
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    if words:
+        grams.append(f"first:{words[0]}")
+    padded = f" {' '.join(words)} "
+    grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    mask = (1 << HASH_BITS) - 1
+    counts: Dict[int, float] = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode()) & mask
+        counts[index] = counts.get(index, 0.0) + 1.0
+    # L2 normalise so long prompts don't dominate the update
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {k: v / norm for k, v in counts.items()}
+
+
+class NgramLogisticModel:
+    """Binary logistic regression (P(clipboard)) over sparse hashed features"""
+
+    def __init__(self, weights: Optional[Dict[int, float]] = None, bias: float = 0.0):
+        self.weights: Dict[int, float] = weights or {}
+        self.bias = bias
+
+    def predict_proba(self, x: Dict[int, float]) -> float:
+        z = self.bias + sum(self.weights.get(k, 0.0) * v for k, v in x.items())
+        z = max(-30.0, min(30.0, z))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def update(self, x: Dict[int, float], y: int, lr: float = 0.5, l2: float = 1e-4) -> None:
+        error = self.predict_proba(x) - y
+        for k, v in x.items():
+            w = self.weights.get(k, 0.0)
+            self.weights[k] = w - lr * (error * v + l2 * w)
+        self.bias -= lr * error
+
+    def fit(self, examples: List[Tuple[Dict[int, float], int]], epochs: int = 30) -> None:
+        for epoch in range(epochs):
+            lr = 0.5 / (1 + epoch * 0.1)
+            for x, y in examples:
+                self.update(x, y, lr=lr)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "hash_bits": HASH_BITS,
+            "bias": self.bias,
+            "weights": {str(k): round(v, 6) for k, v in self.weights.items() if abs(v) > 1e-6},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NgramLogisticModel":
+        if data.get("version") != MODEL_VERSION or data.get("hash_bits") != HASH_BITS:
+            raise ValueError("Incompatible response router model")
+        return cls({int(k): v for k, v in data["weights"].items()}, data["bias"])
+
+
+def load_dataset(split: Optional[str] = None, path: Path = DATASET_FILE) -> List[dict]:
+    """Labelled prompts; split is "train", "eval" or None for all"""
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [r for r in rows if split is None or r["split"] == split]
+
+
+class ResponseRouter:
+    def __init__(self, model_file: Path = MODEL_FILE, threshold: float = DEFAULT_THRESHOLD,
+                 training_split: Optional[str] = "train"):
+        self.model_file = model_file
+        self.threshold = threshold
+        self.training_split = training_split
+        self._model: Optional[NgramLogisticModel] = None
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+    @property
+    def model(self) -> NgramLogisticModel:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_or_train()
+        return self._model
+
+    def _load_or_train(self) -> NgramLogisticModel:
+        if self.model_file.exists():
+            try:
+                model = NgramLogisticModel.from_dict(json.loads(self.model_file.read_text()))
+                logger.debug(f"🧭 Loaded response router model ({len(model.weights)} weights)")
+                return model
+            except Exception as e:
+                logger.warning(f"Retraining response router: {e}")
+        model = self.train(load_dataset(self.training_split))
+        self._save(model)
+        return model
+
+    @staticmethod
+    def train(rows: Iterable[dict]) -> NgramLogisticModel:
+        examples = [(features(request_text(r["text"])), int(r["label"] == CLIPBOARD)) for r in rows]
+        model = NgramLogisticModel()
+        model.fit(examples)
+        logger.info(f"🧭 Trained response router on {len(examples)} examples")
+        return model
+
+    def _save(self, model: NgramLogisticModel) -> None:
+        try:
+            self.model_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.model_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(model.to_dict()))
+            tmp.replace(self.model_file)
+        except OSError as e:
+            logger.debug(f"Could not save response router model: {e}")
+
+    def classify(self, prompt: str) -> Tuple[str, float, str]:
+        """Returns (label, confidence, source) where source is "rule" or "model" """
+        text = request_text(prompt)
+        for pattern, label, confidence in RULES:
+            if pattern.search(text):
+                return label, confidence, "rule"
+        p_clipboard = self.model.predict_proba(features(text))
+        if p_clipboard >= 0.5:
+            return CLIPBOARD, p_clipboard, "model"
+        return SPEAK, 1.0 - p_clipboard, "model"
+
+    def is_confident(self, confidence: float) -> bool:
+        return confidence >= self.threshold
+
+    def learn(self, prompt: str, label: str, confidence: float = 1.0) -> bool:
+        """Fold a remote router decision back into the local model; False if it was too unsure"""
+        if label not in (SPEAK, CLIPBOARD) or confidence < MIN_LEARN_CONFIDENCE:
+            return False
+        with self._lock:
+            model = self._model or self._load_or_train()
+            model.update(features(request_text(prompt)), int(label == CLIPBOARD), lr=0.2)
+            self._model = model
+            self._unsaved += 1
+            if self._unsaved >= SAVE_EVERY:
+                self._save(model)
+                self._unsaved = 0
+        return True
+
+    def flush(self) -> None:
+        """Save updates not yet written to disk"""
+        with self._lock:
+            if self._model is not None and self._unsaved:
+                self._save(self._model)
+                self._unsaved = 0
+
+
+response_router = ResponseRouter()
@@ -0,0 +1,162 @@
+"""
+Word-level speaker turns and speaker analytics.
+
+Deepgram results can contain words from several speakers, and one speaker's
+sentence is often split over several results. Working from the columnar
+WordTable instead of whole results, a turn is a run of consecutive words
+by one speaker with no pause longer than `max_gap`. Results are split
+wherever the speaker changes and merged wherever the same speaker carries
+on.
+
+Turn detection and the per-speaker statistics (talk time, overlap, turn
+counts) are NumPy passes over the word columns, so multi-hour meetings
+take milliseconds.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.spritely.core.word_table import NO_SPEAKER, WordTable
+
+logger = logging.getLogger(__name__)
+
+# Pauses longer than this start a new turn even for the same speaker
+MAX_GAP = 2.0
+
+
+@dataclass
+class Turns:
+    speaker: np.ndarray     # int16 speaker per turn
+    start: np.ndarray       # seconds
+    end: np.ndarray
+    first_word: np.ndarray  # index into the (time-ordered) word table
+    last_word: np.ndarray   # exclusive
+    order: np.ndarray       # permutation putting the table's words in time order
+
+    def __len__(self) -> int:
+        return len(self.speaker)
+
+    @property
+    def words(self) -> np.ndarray:
+        return self.last_word - self.first_word
+
+
+def find_turns(table: WordTable, max_gap: float = MAX_GAP) -> Turns:
+    data = table.data
+    # Results arrive in order, but sort anyway in case a late final overlaps
+    order = np.argsort(data['start'], kind='stable')
+    speaker = data['speaker'][order]
+    start = data['start'][order]
+    end = data['end'][order]
+
+    if len(order) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Turns(speaker[:0], start[:0], end[:0], empty, empty, order)
+
+    boundary = np.empty(len(order), dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (speaker[1:] != speaker[:-1]) | (start[1:] - end[:-1] > max_gap)
+    first = np.flatnonzero(boundary)
+    last = np.append(first[1:], len(order))
+    return Turns(
+        speaker=speaker[first],
+        start=start[first],
+        end=np.maximum.reduceat(end, first),
+        first_word=first,
+        last_word=last,
+        order=order,
+    )
+
+
+def speaker_stats(table: WordTable, turns: Optional[Turns] = None) -> Dict[int, Dict[str, float]]:
+    """Per-speaker talk time, overlap with others, turns and words.
+
+    Overlap is computed with a sweep over word start/end events: for each
+    interval between events we know which speakers are talking, and any
+    interval with two or more counts as overlap for each of them.
+    """
+    turns = turns if turns is not None else find_turns(table)
+    data = table.data
+    known = data['speaker'] != NO_SPEAKER
+    speakers = data['speaker'][known].astype(np.int64)
+    start = data['start'][known]
+    end = np.maximum(data['end'][known], start)
+    if len(speakers) == 0:
+        return {}
+
+    n_speakers = int(speakers.max()) + 1
+    talk = np.bincount(speakers, weights=end - start, minlength=n_speakers)
+    word_counts = np.bincount(speakers, minlength=n_speakers)
+    turn_speakers = turns.speaker[turns.speaker != NO_SPEAKER].astype(np.int64)
+    turn_counts = np.bincount(turn_speakers, minlength=n_speakers)
+
+    # Sweep line: +1 at each word start, -1 at each end, per speaker column
+    times = np.concatenate([start, end])
+    deltas = np.concatenate([np.ones_like(speakers), -np.ones_like(speakers)])
+    columns = np.concatenate([speakers, speakers])
+    order = np.lexsort((deltas, times))  # ends before starts at the same instant
+    events = np.zeros((len(times), n_speakers), dtype=np.int32)
+    events[np.arange(len(times)), columns[order]] = deltas[order]
+    active = np.cumsum(events, axis=0)[:-1] > 0
+    lengths = np.diff(times[order])
+    overlapping = active.sum(axis=1) >= 2
+    overlap = (active & overlapping[:, None]).T @ lengths
+
+    return {
+        s: {
+            "talk_time": float(talk[s]),
+            "overlap_time": float(overlap[s]),
+            "turns": int(turn_counts[s]),
+            "words": int(word_counts[s]),
+        }
+        for s in range(n_speakers) if word_counts[s]
+    }
+
+
+def turn_texts(table: WordTable, turns: Turns) -> Iterator[Tuple[int, float, float, str]]:
+    """(speaker, start, end, text) per turn"""
+    strings = np.array(table.strings.strings, dtype=object)
+    words = strings[table.data['word'][turns.order]] if len(turns) else strings[:0]
+    for i in range(len(turns)):
+        text = " ".join(words[turns.first_word[i]:turns.last_word[i]])
+        yield int(turns.speaker[i]), float(turns.start[i]), float(turns.end[i]), text
+
+
+def turn_records(transcriptions: Sequence[Dict], table: Optional[WordTable] = None,
+                 max_gap: float = MAX_GAP) -> List[Dict]:
+    """Speaker turns in the transcription export format.
+
+    Each record is one turn rather than one Deepgram result. Its timestamp
+    and request_id come from the result the turn starts in. Results without
+    word timings are passed through unchanged.
+    """
+    records = list(transcriptions)
+    table = table if table is not None else WordTable.from_records(records)
+    turns = find_turns(table, max_gap)
+
+    output = []
+    if len(turns):
+        data = table.data
+        utterance = data['utterance'][turns.order][turns.first_word]
+        confidence = np.add.reduceat(data['confidence'][turns.order], turns.first_word) / turns.words
+        for i, (speaker, start, end, text) in enumerate(turn_texts(table, turns)):
+            source = records[int(utterance[i])] if int(utterance[i]) < len(records) else {}
+            output.append({
+                'timestamp': source.get('timestamp'),
+                'transcript': text,
+                'confidence': round(float(confidence[i]), 4),
+                'speaker': None if speaker == NO_SPEAKER else speaker,
+                'start_time': round(start, 3),
+                'duration': round(end - start, 3),
+                'request_id': source.get('request_id'),
+            })
+
+    for record in records:
+        if not record.get('words') and record.get('transcript', '').strip():
+            output.append({k: record.get(k) for k in
+                           ('timestamp', 'transcript', 'confidence', 'speaker', 'start_time', 'duration', 'request_id')})
+    output.sort(key=lambda r: (r['start_time'] is None, r['start_time'] or 0.0))
+    return output
@@ -0,0 +1,63 @@
+"""
+Speculative LLM generation.
+
+A TokenStream starts an LLM stream right away as a background task and
+buffers its tokens until someone consumes them, so generation can begin
+before we know what the output will be used for. Streams that turn out not
+to be needed are cancelled, which closes the underlying HTTP response.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class TokenStream:
+    def __init__(self, generator_factory: Callable[[], AsyncIterator[str]], name: str = "llm"):
+        self.name = name
+        self.started = time.monotonic()
+        self.first_token: Optional[float] = None
+        self.tokens_buffered = 0
+        self._factory = generator_factory
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        generator = self._factory()
+        try:
+            async for token in generator:
+                if self.first_token is None:
+                    self.first_token = time.monotonic()
+                self.tokens_buffered += 1
+                self._queue.put_nowait(token)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put_nowait(e)
+        finally:
+            if hasattr(generator, "aclose"):
+                await generator.aclose()
+            self._queue.put_nowait(_DONE)
+
+    def cancel(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+            logger.debug(f"Cancelled speculative stream '{self.name}' after {self.tokens_buffered} tokens")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._task.cancelled()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while True:
+            item = await self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
@@ -0,0 +1,323 @@
+"""
+Sentence-pipelined LLM -> TTS -> speaker streaming.
+
+Instead of handing the whole token stream to a single TTS request, the
+stream is cut at sentence/clause boundaries. Each chunk is synthesised as
+soon as it is complete (several in flight at once) while the LLM keeps
+generating, and the audio is played back in order from a bounded queue.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Union
+
+from src.spritely.core.config import config
+from src.spritely.utils.audio_utils import PCMOutput, PLAYBACK_RATE
+from src.spritely.utils.tracing import mark
+
+logger = logging.getLogger(__name__)
+
+# Target for request start -> first audible sample
+FIRST_AUDIO_SLO_MS = 1500
+METRICS_FILE = config.config_dir / "metrics" / "speech_latency.jsonl"
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s")
+_CLAUSE_END = re.compile(r"[,;:—–]\s")
+_ABBREVIATIONS = ("e.g.", "i.e.", "mr.", "mrs.", "ms.", "dr.", "vs.", "etc.", "st.")
+
+
+class SentenceChunker:
+    """Accumulates streamed tokens and releases speakable chunks.
+
+    Chunks end at sentence punctuation once min_chars is reached, or at a
+    clause boundary once clause_chars is reached. The first chunk uses a
+    lower threshold so audio can start as early as possible.
+    """
+
+    def __init__(self, min_chars: int = 30, clause_chars: int = 90,
+                 max_chars: int = 250, first_min_chars: int = 12):
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self.max_chars = max_chars
+        self.first_min_chars = first_min_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def _boundary(self) -> Optional[int]:
+        minimum = self.first_min_chars if self._emitted == 0 else self.min_chars
+        cut = None
+        for match in _SENTENCE_END.finditer(self._buffer):
+            end = match.end()
+            if end < minimum:
+                continue
+            head = self._buffer[:match.start() + 1].lower()
+            if head.endswith(_ABBREVIATIONS):
+                continue
+            cut = end
+            break
+        if cut is None and len(self._buffer) >= (minimum if self._emitted == 0 else self.clause_chars):
+            clauses = [m.end() for m in _CLAUSE_END.finditer(self._buffer) if m.end() >= minimum]
+            if clauses:
+                cut = clauses[0]
+        if cut is None and len(self._buffer) >= self.max_chars:
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            cut = space + 1 if space > 0 else self.max_chars
+        return cut
+
+    def feed(self, token: str) -> List[str]:
+        self._buffer += token
+        chunks = []
+        while True:
+            cut = self._boundary()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+                self._emitted += 1
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        chunk, self._buffer = self._buffer.strip(), ""
+        if chunk:
+            self._emitted += 1
+            return chunk
+        return None
+
+
+@dataclass
+class SpeechMetrics:
+    started: float
+    first_token: Optional[float] = None
+    first_chunk: Optional[float] = None
+    first_audio: Optional[float] = None
+    completed: Optional[float] = None
+    chunks: int = 0
+    text: str = ""
+    chunk_tts_ms: List[float] = field(default_factory=list)
+
+    def _since_start(self, t: Optional[float]) -> Optional[float]:
+        return None if t is None else round((t - self.started) * 1000, 1)
+
+    @property
+    def time_to_first_audio_ms(self) -> Optional[float]:
+        return self._since_start(self.first_audio)
+
+    def summary(self) -> dict:
+        return {
+            "timestamp": time.time(),
+            "first_token_ms": self._since_start(self.first_token),
+            "first_chunk_ms": self._since_start(self.first_chunk),
+            "first_audio_ms": self.time_to_first_audio_ms,
+            "total_ms": self._since_start(self.completed),
+            "chunks": self.chunks,
+            "chunk_tts_ms": self.chunk_tts_ms,
+            "slo_met": (self.time_to_first_audio_ms is not None
+                        and self.time_to_first_audio_ms <= FIRST_AUDIO_SLO_MS),
+        }
+
+
+# Most recent requests, for inspection from a REPL or the benchmarks
+recent_metrics: deque = deque(maxlen=100)
+
+
+def record_metrics(metrics: SpeechMetrics) -> None:
+    summary = metrics.summary()
+    recent_metrics.append(summary)
+    ttfa = summary["first_audio_ms"]
+    if ttfa is not None and ttfa > FIRST_AUDIO_SLO_MS:
+        logger.warning(f"⏱️ Time to first audio {ttfa:.0f}ms exceeds {FIRST_AUDIO_SLO_MS}ms SLO")
+    else:
+        logger.info(f"⏱️ Time to first audio: {ttfa}ms over {summary['chunks']} chunks")
+    try:
+        METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(METRICS_FILE, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+    except OSError as e:
+        logger.debug(f"Could not write speech metrics: {e}")
+
+
+def elevenlabs_synthesizer(client, voice: str, model: str) -> Callable[[str], bytes]:
+    """TTS function returning raw PCM at PLAYBACK_RATE for one chunk of text"""
+    def synthesize(text: str) -> bytes:
+        audio = client.generate(
+            text=text,
+            voice=voice,
+            model=model,
+            output_format=f"pcm_{PLAYBACK_RATE}"
+        )
+        return audio if isinstance(audio, bytes) else b"".join(audio)
+    return synthesize
+
+
+def elevenlabs_async_synthesizer(client, voice: str, model: str) -> Callable[[str], Awaitable[bytes]]:
+    """Like elevenlabs_synthesizer, for an AsyncElevenLabs client"""
+    async def synthesize(text: str) -> bytes:
+        audio = client.generate(
+            text=text,
+            voice=voice,
+            model=model,
+            output_format=f"pcm_{PLAYBACK_RATE}"
+        )
+        if inspect.isawaitable(audio):
+            audio = await audio
+        if isinstance(audio, bytes):
+            return audio
+        return b"".join([chunk async for chunk in audio])
+    return synthesize
+
+
+_DONE = object()
+
+
+async def _iterate(tokens: Union[AsyncIterator[str], Iterator[str]]) -> AsyncIterator[str]:
+    """Iterate sync generators on a worker thread so the event loop stays free"""
+    if hasattr(tokens, "__aiter__"):
+        async for token in tokens:
+            yield token
+        return
+    iterator = iter(tokens)
+    while True:
+        token = await asyncio.to_thread(next, iterator, _DONE)
+        if token is _DONE:
+            return
+        yield token
+
+
+async def _close_output(output: PCMOutput, busy: Optional[asyncio.Future]) -> None:
+    """Close output once its in-flight open()/write() has returned"""
+    if busy is not None:
+        await asyncio.wait([busy])
+    await asyncio.to_thread(output.close)
+
+
+class NullOutput:
+    """Discards audio; counts what would have been played (benchmarks, headless runs)"""
+
+    def __init__(self):
+        self.bytes_written = 0
+
+    def open(self) -> "NullOutput":
+        return self
+
+    def write(self, data: bytes) -> None:
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        pass
+
+
+_output_factory: Callable[[], PCMOutput] = PCMOutput
+
+
+def set_output_factory(factory: Optional[Callable[[], PCMOutput]]) -> None:
+    """Where pipelines created without an explicit output_factory play audio (None: the speakers)"""
+    global _output_factory
+    _output_factory = factory or PCMOutput
+
+
+class SpeechPipeline:
+    def __init__(self, synthesize: Callable[[str], Union[bytes, Awaitable[bytes]]],
+                 output_factory: Optional[Callable[[], PCMOutput]] = None,
+                 max_concurrent_tts: int = 3, max_queued_chunks: int = 4,
+                 chunker_factory: Callable[[], SentenceChunker] = SentenceChunker):
+        self.synthesize = synthesize
+        self.output_factory = output_factory or _output_factory
+        self.max_concurrent_tts = max_concurrent_tts
+        self.max_queued_chunks = max_queued_chunks
+        self.chunker_factory = chunker_factory
+
+    async def speak(self, tokens: Union[AsyncIterator[str], Iterator[str]],
+                    started: Optional[float] = None) -> SpeechMetrics:
+        """Speak a token stream; returns latency metrics and the full text"""
+        metrics = SpeechMetrics(started=started or time.monotonic())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued_chunks)
+        tts_slots = asyncio.Semaphore(self.max_concurrent_tts)
+        chunker = self.chunker_factory()
+        parts = []
+
+        async def synthesize(text: str) -> bytes:
+            async with tts_slots:
+                t0 = time.monotonic()
+                if inspect.iscoroutinefunction(self.synthesize):
+                    audio = await self.synthesize(text)
+                else:
+                    audio = await asyncio.to_thread(self.synthesize, text)
+                metrics.chunk_tts_ms.append(round((time.monotonic() - t0) * 1000, 1))
+                return audio
+
+        async def dispatch(chunk: str) -> None:
+            if metrics.first_chunk is None:
+                metrics.first_chunk = time.monotonic()
+                mark("first_tts_request")
+            metrics.chunks += 1
+            # Blocks when too many chunks are waiting to be played (back-pressure)
+            await queue.put(asyncio.create_task(synthesize(chunk)))
+
+        async def produce() -> None:
+            try:
+                async for token in _iterate(tokens):
+                    if metrics.first_token is None:
+                        metrics.first_token = time.monotonic()
+                        mark("first_token")
+                    parts.append(token)
+                    for chunk in chunker.feed(token):
+                        await dispatch(chunk)
+                tail = chunker.flush()
+                if tail:
+                    await dispatch(tail)
+            finally:
+                await queue.put(None)
+
+        async def play() -> None:
+            output = None
+            # The open() or write() running on a worker thread. Cancelling play()
+            # doesn't stop it, so the output is only closed once it has returned:
+            # otherwise a stream (and the playback lock) opened after the
+            # cancellation would never be released.
+            busy = None
+            try:
+                while True:
+                    task = await queue.get()
+                    if task is None:
+                        return
+                    audio = await task
+                    if not audio:
+                        continue
+                    if output is None:
+                        output = self.output_factory()
+                        busy = asyncio.ensure_future(asyncio.to_thread(output.open))
+                        await asyncio.shield(busy)
+                    if metrics.first_audio is None:
+                        metrics.first_audio = time.monotonic()
+                        mark("first_audio")
+                    busy = asyncio.ensure_future(asyncio.to_thread(output.write, audio))
+                    await asyncio.shield(busy)
+            finally:
+                if output is not None:
+                    # Shielded so a second cancellation can't skip the close either
+                    await asyncio.shield(asyncio.ensure_future(_close_output(output, busy)))
+
+        producer = asyncio.create_task(produce())
+        player = asyncio.create_task(play())
+        try:
+            await asyncio.gather(producer, player)
+        except BaseException:
+            producer.cancel()
+            player.cancel()
+            while not queue.empty():
+                task = queue.get_nowait()
+                if task is not None:
+                    task.cancel()
+            raise
+        finally:
+            metrics.completed = time.monotonic()
+            metrics.text = "".join(parts)
+            record_metrics(metrics)
+        return metrics
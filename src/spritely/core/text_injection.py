@@ -0,0 +1,355 @@
+"""
+Send dictated text to the focused application.
+
+Injectors are long-lived: the Quartz and pynput backends post key events
+from this process, so nothing is spawned per utterance. Command-line tools
+(xdotool on X11, ydotool via uinput on Wayland) are run once per batch,
+without a shell.
+
+Everything goes through an InjectionQueue, which collects fragments
+arriving within `window` seconds and sends them as one batch (a backspace
+right after typed text cancels out before anything is sent). Long batches
+are pasted rather than typed, and the user's clipboard is put back
+afterwards.
+
+    queue = get_injection_queue()
+    queue.type("hello ")
+    queue.backspace(1)
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from src.spritely.utils.user_settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Fragments arriving this close together are sent as one batch
+COALESCE_WINDOW = 0.03
+# Longer batches are pasted through the clipboard instead of typed
+PASTE_THRESHOLD = 200
+# How long the target app gets to read the clipboard before it is restored
+CLIPBOARD_SETTLE = 0.15
+# Quartz takes at most this many UTF-16 units per key event
+QUARTZ_CHUNK = 20
+
+_TYPE, _BACKSPACE = "type", "backspace"
+
+
+class TextInjector:
+    name = ""
+
+    def type(self, text: str) -> None:
+        raise NotImplementedError
+
+    def backspace(self, count: int) -> None:
+        raise NotImplementedError
+
+    def paste_shortcut(self) -> None:
+        raise NotImplementedError
+
+    def paste(self, text: str) -> None:
+        """Paste text, leaving the clipboard as it was"""
+        import pyperclip
+        try:
+            saved = pyperclip.paste()
+        except Exception:
+            saved = None
+        pyperclip.copy(text)
+        try:
+            self.paste_shortcut()
+            time.sleep(CLIPBOARD_SETTLE)
+        finally:
+            if saved is not None:
+                pyperclip.copy(saved)
+
+    def close(self) -> None:
+        pass
+
+
+class QuartzInjector(TextInjector):
+    """macOS: posts unicode key events directly with CoreGraphics"""
+    name = "quartz"
+    BACKSPACE_KEY = 51
+    V_KEY = 9
+
+    def __init__(self):
+        try:
+            import Quartz
+        except ImportError:
+            raise ImportError("pyobjc Quartz is not installed: pip install pyobjc-framework-Quartz")
+        self._quartz = Quartz
+        self._source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+
+    def _post(self, keycode: int, text: Optional[str] = None, flags: int = 0) -> None:
+        q = self._quartz
+        for down in (True, False):
+            event = q.CGEventCreateKeyboardEvent(self._source, keycode, down)
+            if text is not None:
+                q.CGEventKeyboardSetUnicodeString(event, len(text.encode("utf-16-le")) // 2, text)
+            if flags:
+                q.CGEventSetFlags(event, flags)
+            q.CGEventPost(q.kCGHIDEventTap, event)
+
+    def type(self, text: str) -> None:
+        for i in range(0, len(text), QUARTZ_CHUNK):
+            self._post(0, text[i:i + QUARTZ_CHUNK])
+
+    def backspace(self, count: int) -> None:
+        for _ in range(count):
+            self._post(self.BACKSPACE_KEY)
+
+    def paste_shortcut(self) -> None:
+        self._post(self.V_KEY, flags=self._quartz.kCGEventFlagMaskCommand)
+
+
+class PynputInjector(TextInjector):
+    """Any desktop pynput supports (Quartz, Xlib, win32), from this process"""
+    name = "pynput"
+
+    def __init__(self):
+        from pynput.keyboard import Controller, Key
+        self._keyboard = Controller()
+        self._key = Key
+
+    def type(self, text: str) -> None:
+        self._keyboard.type(text)
+
+    def backspace(self, count: int) -> None:
+        for _ in range(count):
+            self._keyboard.tap(self._key.backspace)
+
+    def paste_shortcut(self) -> None:
+        modifier = self._key.cmd if sys.platform == "darwin" else self._key.ctrl
+        with self._keyboard.pressed(modifier):
+            self._keyboard.tap("v")
+
+
+class CommandInjector(TextInjector):
+    """xdotool (X11) or ydotool (uinput, works on Wayland); one process per batch"""
+
+    COMMANDS = {
+        "xdotool": {"type": ["type", "--delay", "0", "--"], "key": ["key", "--delay", "0"],
+                    "backspace": "BackSpace", "paste": "ctrl+v"},
+        "ydotool": {"type": ["type", "--key-delay", "0", "--"], "key": ["key"],
+                    # Linux input event codes: 14 = backspace, 29 = left ctrl, 47 = v
+                    "backspace": "14:1 14:0", "paste": "29:1 47:1 47:0 29:0"},
+    }
+
+    def __init__(self, tool: str = "xdotool"):
+        path = shutil.which(tool)
+        if path is None:
+            raise FileNotFoundError(f"{tool} is not installed")
+        self.name = tool
+        self._path = path
+        self._spec = self.COMMANDS[tool]
+
+    def _run(self, args: List[str]) -> None:
+        subprocess.run([self._path, *args], check=True, capture_output=True)
+
+    def type(self, text: str) -> None:
+        self._run(self._spec["type"] + [text])
+
+    def backspace(self, count: int) -> None:
+        self._run(self._spec["key"] + " ".join([self._spec["backspace"]] * count).split())
+
+    def paste_shortcut(self) -> None:
+        self._run(self._spec["key"] + self._spec["paste"].split())
+
+
+class FakeInjector(TextInjector):
+    """Applies keystrokes to an in-memory buffer, with configurable per-call and per-key cost"""
+    name = "fake"
+
+    def __init__(self, call_latency: float = 0.0, key_latency: float = 0.0):
+        self.call_latency = call_latency
+        self.key_latency = key_latency
+        self.buffer = ""
+        self.calls = 0
+        self.keys = 0
+        self.pastes = 0
+
+    def _cost(self, keys: int) -> None:
+        self.calls += 1
+        self.keys += keys
+        delay = self.call_latency + keys * self.key_latency
+        if delay:
+            time.sleep(delay)
+
+    def type(self, text: str) -> None:
+        self._cost(len(text))
+        self.buffer += text
+
+    def backspace(self, count: int) -> None:
+        self._cost(count)
+        self.buffer = self.buffer[:len(self.buffer) - count] if count else self.buffer
+
+    def paste_shortcut(self) -> None:
+        raise NotImplementedError
+
+    def paste(self, text: str) -> None:
+        self._cost(1)
+        self.pastes += 1
+        self.buffer += text
+
+
+def create_injector(name: Optional[str] = None) -> TextInjector:
+    """The injector named in settings, or the best one available on this system"""
+    name = (name or settings.get('text_injector') or "auto").lower()
+    if name == "fake":
+        return FakeInjector()
+    if name == "quartz":
+        return QuartzInjector()
+    if name == "pynput":
+        return PynputInjector()
+    if name in CommandInjector.COMMANDS:
+        return CommandInjector(name)
+
+    candidates = []
+    if sys.platform == "darwin":
+        candidates = [QuartzInjector, PynputInjector]
+    elif sys.platform.startswith("linux") and os.environ.get("WAYLAND_DISPLAY") and not os.environ.get("DISPLAY"):
+        candidates = [lambda: CommandInjector("ydotool")]
+    elif sys.platform.startswith("linux"):
+        candidates = [PynputInjector, lambda: CommandInjector("xdotool"), lambda: CommandInjector("ydotool")]
+    else:
+        candidates = [PynputInjector]
+    errors = []
+    for candidate in candidates:
+        try:
+            return candidate()
+        except Exception as e:
+            errors.append(str(e))
+    raise RuntimeError(f"No text injector available: {'; '.join(errors)}")
+
+
+def coalesce(ops: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+    """Merge adjacent typing and backspaces; backspaces eat text not yet sent"""
+    merged: List[list] = []
+    for kind, value in ops:
+        if kind == _BACKSPACE:
+            count = value
+            while count and merged and merged[-1][0] == _TYPE:
+                text = merged[-1][1]
+                eaten = min(count, len(text))
+                merged[-1][1] = text[:len(text) - eaten]
+                count -= eaten
+                if not merged[-1][1]:
+                    merged.pop()
+            if count:
+                if merged and merged[-1][0] == _BACKSPACE:
+                    merged[-1][1] += count
+                else:
+                    merged.append([_BACKSPACE, count])
+        elif value:
+            if merged and merged[-1][0] == _TYPE:
+                merged[-1][1] += value
+            else:
+                merged.append([_TYPE, value])
+    return [tuple(op) for op in merged]
+
+
+class InjectionQueue:
+    def __init__(self, injector: Optional[TextInjector] = None, window: float = COALESCE_WINDOW,
+                 paste_threshold: int = PASTE_THRESHOLD):
+        self._injector = injector
+        self.window = window
+        self.paste_threshold = paste_threshold
+        self._ops = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stopped = False
+        self.batches = 0
+        self.fragments = 0
+        self._thread = threading.Thread(target=self._run, name="text-injection", daemon=True)
+        self._thread.start()
+
+    @property
+    def injector(self) -> TextInjector:
+        # Created on the worker thread's first batch, not at import
+        if self._injector is None:
+            self._injector = create_injector()
+            logger.info(f"⌨️ Text injection via {self._injector.name}")
+        return self._injector
+
+    def _put(self, op: Tuple[str, object]) -> None:
+        with self._lock:
+            self._ops.append(op)
+            self._idle.clear()
+        self._wake.set()
+
+    def type(self, text: str) -> None:
+        if text:
+            self._put((_TYPE, text))
+
+    def backspace(self, count: int) -> None:
+        if count > 0:
+            self._put((_BACKSPACE, count))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued has been sent"""
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 2.0) -> None:
+        self.flush(timeout)
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._injector is not None:
+            self._injector.close()
+
+    def _take(self) -> List[Tuple[str, object]]:
+        with self._lock:
+            ops = list(self._ops)
+            self._ops.clear()
+        return ops
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            if self.window:
+                # Let the rest of the burst arrive
+                time.sleep(self.window)
+            ops = self._take()
+            if ops:
+                self.fragments += len(ops)
+                self._send(coalesce(ops))
+            with self._lock:
+                if not self._ops:
+                    self._idle.set()
+
+    def _send(self, ops: List[Tuple[str, object]]) -> None:
+        self.batches += 1
+        for kind, value in ops:
+            try:
+                if kind == _BACKSPACE:
+                    self.injector.backspace(value)
+                elif len(value) >= self.paste_threshold:
+                    self.injector.paste(value)
+                else:
+                    self.injector.type(value)
+            except Exception as e:
+                logger.error(f"Text injection failed: {e}")
+
+
+_queue: Optional[InjectionQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_injection_queue() -> InjectionQueue:
+    """The app-wide queue, so all dictation reaches the focused app in order"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = InjectionQueue()
+        return _queue
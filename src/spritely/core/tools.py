@@ -4,9 +4,12 @@ tools for spritely ai
 see claude-engineer for inspiration
 """
 
-from anthropic.types import ToolParam
+from typing import TYPE_CHECKING
 
-tools: list[ToolParam] = [
+if TYPE_CHECKING:
+    from anthropic.types import ToolParam
+
+tools: "list[ToolParam]" = [
     {
         "name": "create_folders",
         "description": "Create new folders at the specified paths, including nested directories. This tool should be used when you need to create one or more directories (including nested ones) in the project structure. It will create all necessary parent directories if they don't exist.",
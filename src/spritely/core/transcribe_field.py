@@ -1,9 +1,7 @@
 import pyaudio
-from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
 import threading
 from datetime import datetime
 from dotenv import load_dotenv
-import pyperclip
 from pynput import keyboard
 import os
 import subprocess
@@ -12,6 +10,13 @@ import sys
 
 from src.spritely.utils.logging import setup_logging
 from src.spritely.utils.user_settings import settings, save_settings
+from src.spritely.utils.audio_engine import capture_engine
+from src.spritely.utils.vad import VADGate, get_detector
+from src.spritely.core.asr import AsrOptions, create_backend, ensure_backend
+from src.spritely.core.deepgram_connection import RELEASE_GRACE
+from src.spritely.core.live_typing import LiveTyper
+from src.spritely.core.text_injection import get_injection_queue
+from src.spritely.utils.tracing import Trace, bind, mark, span, use_trace
 
 load_dotenv()
 
@@ -31,20 +36,52 @@ class SpeechTranscriber:
         logger.info("Initializing SpeechTranscriber")
         self.current_transcription = ""
         self.is_recording = False
-        self.audio = None
         self.stream = None
-        self.dg_connection = None
+        self.asr_session = None
+        self.vad = None
         self.audio_thread = None
         self.should_stop = None
         self.loop = asyncio.new_event_loop()
         self.loop_thread = None
+        self.typer = None
+        self.trace = None
+        # Batched, in-process keystrokes into the focused app
+        self.injector = get_injection_queue()
+        # Warm, reusable ASR connection so activations skip the handshake
+        self.asr = create_backend(self.asr_options, name="field")
+
+    def asr_options(self) -> AsrOptions:
+        # Audio is downmixed to mono at the configured rate before streaming
+        return AsrOptions(
+            model="nova-2",
+            sample_rate=settings['transcription_sample_rate'],
+            language="en-GB",
+            punctuate=True,  # Enable punctuation
+            # Interims are typed as they arrive and corrected in place
+            interim_results=settings['field_live_typing']
+        )
+
+    def live_handlers(self, typer: LiveTyper):
+        """Result handlers that type straight into the focused field"""
+        def on_final(result):
+            transcript = result.channel.alternatives[0].transcript
+            typer.final(transcript)
+            if transcript.strip():
+                mark("first_final", once=True)
+                self.current_transcription = transcript.strip() + " "
+                logger.info(f"⌨️ Typed: {transcript.strip()}")
 
-    def message_handler(self, event, result):
+        def on_interim(result):
+            mark("first_interim", once=True)
+            typer.interim(result.channel.alternatives[0].transcript)
+
+        return on_final, on_interim
+
+    def message_handler(self, result):
         """Synchronous wrapper for the async message handler"""
-        asyncio.run_coroutine_threadsafe(self.on_message(event, result), self.loop)
+        asyncio.run_coroutine_threadsafe(self.on_message(result), self.loop)
 
-    async def on_message(self, event, result):
-        logger.debug(f"Received message - Event type: {event}")
+    async def on_message(self, result):
         print(f"Result type: {type(result)}")
         try:
             timestamp = datetime.now().isoformat()
@@ -64,43 +101,48 @@ class SpeechTranscriber:
                     print(f"✨ Confidence: {confidence:.2f}")
 
                     if transcript.strip():
+                        mark("first_final", once=True)
                         self.current_transcription = transcript
-                        print(f"\n📋 Actions:")
-                        print(f"1. Copying to clipboard: {transcript}")
-                        
-                        # Try AppleScript paste instead of direct keyboard simulation
-                        if not self.paste_text_applescript(transcript):
-                            print("⚠️ Paste failed. Text is in clipboard.")
+                        print(f"\n⌨️ Typing: {transcript}")
+                        self.injector.type(transcript)
         except Exception as e:
             logger.error(f"Error in transcription: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
 
-    def start_recording(self):
+    def start_recording(self, pressed_at=None):
         if self.is_recording:
             logger.info("Recording already in progress")
             return
 
+        self.trace = Trace("dictation", started=pressed_at, hotkey="cmd+alt+l")
+        with use_trace(self.trace):
+            mark("hotkey", at=pressed_at)
+            self._start_recording()
+
+    def _start_recording(self):
         logger.info("Starting recording...")
         self.is_recording = True
         self.current_transcription = ""
         
-        # Initialize audio and print device info
-        self.audio = pyaudio.PyAudio()
-        
-        # Use saved microphone preference
-        mic_index = settings['microphone_index']
-        if mic_index is not None:
-            input_device = self.audio.get_device_info_by_index(mic_index)
-        else:
-            input_device = self.audio.get_default_input_device_info()
+        # Attach to the shared capture engine (opens the mic only on first use)
+        try:
+            with span("mic_open"):
+                self.stream = capture_engine.subscribe(
+                    target_rate=settings['transcription_sample_rate'], mono=True)
+            logger.info("Audio stream attached successfully")
+        except Exception as e:
+            logger.error(f"Failed to open audio stream: {e}")
+            self.is_recording = False
+            self.trace.finish()
+            self.trace = None
+            return
+        input_device = capture_engine.input_device
             
         print(f"\n🎤 Recording using: {input_device['name']}")
         print(f"    Sample Rate: {input_device['defaultSampleRate']}Hz")
         print(f"    Max Input Channels: {input_device['maxInputChannels']}")
         
-        deepgram = DeepgramClient()
-
         # Modify the event loop handling
         def run_event_loop():
             asyncio.set_event_loop(self.loop)
@@ -114,79 +156,83 @@ class SpeechTranscriber:
         self.loop_thread.start()
         
         try:
-            self.dg_connection = deepgram.listen.websocket.v("1")
             # Use the synchronous wrapper instead of the async method directly
-            self.dg_connection.on(LiveTranscriptionEvents.Transcript, self.message_handler)
-            print("Deepgram connection created")
+            with span("asr_open"):
+                self.asr = ensure_backend(self.asr, self.asr_options, "field")
+                if settings['field_live_typing']:
+                    self.typer = LiveTyper()
+                    on_final, on_interim = self.live_handlers(self.typer)
+                    self.asr_session = self.asr.open_session(on_final=bind(on_final),
+                                                             on_interim=bind(on_interim))
+                else:
+                    self.asr_session = self.asr.open_session(on_final=bind(self.message_handler))
         except Exception as e:
-            print(f"Failed to create Deepgram connection: {e}")
+            print(f"Failed to start {self.asr.provider} transcription: {e}")
+            self.stop_recording()
             return
         
-        print("Deepgram connection created")  # Debug line
-
-        # Set up Deepgram connection
-        options = LiveOptions(
-            model="nova-2",
-            encoding="linear16",
-            channels=CHANNELS,
-            sample_rate=RATE,
-            language="en-GB",
-            punctuate=True,  # Enable punctuation
-            interim_results=False  # Only get final results
+        print(f"{self.asr.provider} transcription started successfully")  # Debug line
+
+        # Only stream speech to the ASR; KeepAlives hold the socket open in silence
+        self.vad = VADGate(
+            get_detector(settings['vad_detector']),
+            rate=self.stream.rate,
+            on_speech_end=self.asr_session.finalize,
+            enabled=settings['vad_enabled']
         )
 
-        if self.dg_connection.start(options) is False:
-            print("Failed to start Deepgram connection")
-            return
-        
-        print("Deepgram connection started successfully")  # Debug line
-
-        # Update stream creation to use selected microphone
-        try:
-            self.stream = self.audio.open(
-                format=FORMAT,
-                channels=CHANNELS,
-                rate=RATE,
-                input=True,
-                input_device_index=settings['microphone_index'],
-                frames_per_buffer=CHUNK
-            )
-            logger.info("Audio stream opened successfully")
-        except Exception as e:
-            logger.error(f"Failed to open audio stream: {e}")
-            self.stop_recording()
-            return
-
         self.should_stop = threading.Event()
+
+        def send(data):
+            mark("first_speech_sent", once=True)
+            self.asr_session.send(data)
         
         # Start audio capture thread
         def capture_audio():
             while not self.should_stop.is_set():
-                data = self.stream.read(CHUNK, exception_on_overflow=False)
-                # print(f"📢 Sending {len(data)} bytes of audio data")
-                self.dg_connection.send(data)
+                data = self.stream.read()
+                if data:
+                    self.vad.feed(data, send, self.asr_session.keep_alive)
 
-        self.audio_thread = threading.Thread(target=capture_audio)
+        self.audio_thread = threading.Thread(target=bind(capture_audio), name="field-capture")
         self.audio_thread.start()
         print("Recording started!")
 
-    def stop_recording(self):
+    def stop_recording(self, pressed_at=None):
         if not self.is_recording:
             return
 
+        trace, self.trace = self.trace, None
+        with use_trace(trace):
+            mark("stop_hotkey", at=pressed_at)
+            self._stop_recording(trace)
+
+    def _stop_recording(self, trace=None):
         print("Stopping recording...")
         try:
             # Gracefully stop components
-            self.should_stop.set()
+            if self.should_stop:
+                self.should_stop.set()
             if self.audio_thread:
                 self.audio_thread.join(timeout=1.0)
             if self.stream:
-                self.stream.stop_stream()
                 self.stream.close()
-            if self.audio:
-                self.audio.terminate()
-            if self.dg_connection:
-                self.dg_connection.finish()
+            if self.asr_session:
+                self.asr_session.finish()
+            if self.typer:
+                typer = self.typer
+
+                def finish_typing():
+                    with span("type_remaining"):
+                        typer.close()
+                    if trace is not None:
+                        trace.finish()
+
+                # The last final can arrive shortly after the session is released
+                threading.Timer(RELEASE_GRACE, bind(finish_typing)).start()
+                self.typer = None
+            elif trace is not None:
+                trace.finish()
             
             # Properly cleanup the event loop
             if self.loop and self.loop.is_running():
@@ -200,17 +246,6 @@ class SpeechTranscriber:
             self.is_recording = False
             print("Recording stopped!")
 
-    def paste_text_applescript(self, text):
-        """Use AppleScript to paste text"""
-        try:
-            pyperclip.copy(text)
-            cmd = '''osascript -e 'tell application "System Events" to keystroke "v" using command down' '''
-            subprocess.run(cmd, shell=True)
-            return True
-        except Exception as e:
-            logger.error(f"AppleScript paste error: {e}")
-            return False
-
 def open_accessibility_settings():
     # Opens directly to Accessibility settings
     subprocess.run(['open', 'x-apple.systempreferences:com.apple.preference.security?Privacy_Accessibility'])
@@ -1,5 +1,4 @@
 import pyaudio
-from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
 import threading
 from datetime import datetime
 from dotenv import load_dotenv
@@ -8,9 +7,19 @@ from typing import Dict
 from colorama import init, Fore, Style
 import numpy as np
 import time
+from pathlib import Path
 
 from src.spritely.utils.logging import setup_logging
 from src.spritely.utils.user_settings import settings
+from src.spritely.utils.audio_engine import capture_engine
+from src.spritely.utils.audio_recorder import MEETINGS_AUDIO_DIR, AudioRecorder, repair_wav
+from src.spritely.utils.vad import VADGate, get_detector
+from src.spritely.core.asr import AsrOptions, create_backend, ensure_backend
+from src.spritely.core.meeting_summariser import MeetingSummariser
+from src.spritely.core.meeting_store import MeetingStore
+from src.spritely.core.speaker_turns import speaker_stats, turn_records
+from src.spritely.core.transcript_log import new_session, recover_sessions, utterance_record
+from src.spritely.core.word_table import WordTable
 
 """ this project streams the transcribd audio, with speaker diarization to terminal
 TODO:
@@ -29,16 +38,50 @@ CHANNELS = 2
 RATE = 44100  # Sample rate
 CHUNK = 1024  # Buffer size in frames
 
+MEETINGS_JSON_DIR = "meetings/json"
+
 class TranscriberApp:
     def __init__(self):
         self.is_recording = False
-        self.audio = None
         self.stream = None
-        self.dg_connection = None
+        self.asr_session = None
+        self.vad = None
         self.audio_thread = None
+        self.recorder = None
         self.should_stop = None
         self.transcriptions = []
+        self.words = WordTable()
+        self.summariser = None
+        self.summary_future = None
         self.silence_threshold = 500  # Adjust this value based on your needs
+        self.asr = create_backend(self.asr_options, name="meeting")
+
+        # Save meetings that were still recording when the app last exited
+        for log in recover_sessions(MEETINGS_JSON_DIR):
+            self.save_transcriptions(log)
+            self.recover_audio(log.session_id)
+
+    def recover_audio(self, session_id):
+        """Fix the header of a recording the app didn't get to close"""
+        path = Path(f"{MEETINGS_AUDIO_DIR}/transcription_{session_id}.wav")
+        if not path.exists():
+            return
+        try:
+            repair_wav(path)
+        except OSError as e:
+            logger.error(f"Could not repair {path.name}: {e}")
+
+    def meeting_time(self, seconds):
+        """An ASR timestamp -> seconds since the meeting's capture began"""
+        return self.vad.capture_time(self.asr_session.session_time(seconds))
+
+    def asr_options(self) -> AsrOptions:
+        # Audio is downmixed to mono at the configured rate before streaming
+        return AsrOptions(
+            model="nova-2",
+            sample_rate=settings['transcription_sample_rate'],
+            diarize=True
+        )
 
     def is_mic_active(self, duration=1):
         """Check if the microphone is already in use by another application."""
@@ -82,44 +125,13 @@ class TranscriberApp:
         logger.info("Starting recording...")
         self.is_recording = True
         
-        # Initialize audio and Deepgram
-        self.audio = pyaudio.PyAudio()
-        
-        # Use the same microphone settings as instant_spritely
-        mic_index = settings['microphone_index']
-        if mic_index is not None:
-            input_device = self.audio.get_device_info_by_index(mic_index)
-        else:
-            input_device = self.audio.get_default_input_device_info()
+        # Attach to the shared capture engine (opens the mic only on first use)
+        self.stream = capture_engine.subscribe(
+            target_rate=settings['transcription_sample_rate'], mono=True)
+        input_device = capture_engine.input_device
             
         print(f"\n🎤 Recording using: {input_device['name']}")
         
-        deepgram = DeepgramClient()
-        self.dg_connection = deepgram.listen.websocket.v("1")
-
-        # Set up Deepgram connection with the same audio settings
-        options = LiveOptions(
-            model="nova-2",
-            encoding="linear16",
-            channels=CHANNELS,
-            sample_rate=RATE,
-            diarize=True
-        )
-        
-        if self.dg_connection.start(options) is False:
-            print("Failed to start Deepgram connection")
-            return
-
-        # Update stream creation to use selected microphone
-        self.stream = self.audio.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            input_device_index=settings['microphone_index'],
-            frames_per_buffer=CHUNK
-        )
-
         # Add color mapping for speakers
         speaker_colors: Dict[int, str] = {
             0: Fore.CYAN,
@@ -130,34 +142,32 @@ class TranscriberApp:
             5: Fore.RED,
         }
 
-        # Add a list to store all transcriptions
-        self.transcriptions = []
+        # Utterances are appended to an on-disk log as they are finalised
+        self.transcriptions = new_session(MEETINGS_JSON_DIR)
+        # Word timings are kept in columns rather than as SDK objects
+        self.words = WordTable()
+        self.summary_future = None
 
         # Store instance reference for closure
         app = self
         
         # Update handler definitions to use the stored reference
-        def on_message(connection, result):
+        def on_message(result):
             try:
                 logger.debug("Processing transcription message")
                 if result.is_final:
-                    transcript_data = {
-                        'timestamp': datetime.now().isoformat(),
-                        'transcript': result.channel.alternatives[0].transcript,
-                        'confidence': result.channel.alternatives[0].confidence,
-                        'words': result.channel.alternatives[0].words,
-                        'start_time': result.start,
-                        'duration': result.duration,
-                        'request_id': result.metadata.request_id
-                    }
+                    # Timings relative to this meeting, with the silence the VAD
+                    # didn't stream put back in
+                    transcript_data = utterance_record(result, datetime.now().isoformat(),
+                                                       clock=app.meeting_time)
                     
                     # Use app instead of self
                     app.transcriptions.append(transcript_data)
+                    app.words.append_words(transcript_data['words'], utterance=len(app.transcriptions) - 1)
                     
                     # Get speaker information and color
-                    words = result.channel.alternatives[0].words
-                    if words and hasattr(words[0], 'speaker'):
-                        speaker_num = words[0].speaker
+                    speaker_num = transcript_data['speaker']
+                    if speaker_num is not None:
                         color = speaker_colors.get(speaker_num, Fore.WHITE)
                         speaker = f"Speaker {speaker_num}"
                     else:
@@ -172,31 +182,53 @@ class TranscriberApp:
                 logger.debug(f"Result type: {type(result)}")
                 logger.debug(f"Result content: {result}")
 
-        def on_open(connection):
-            print("Connected to Deepgram!")
-
-        def on_close(connection, message=None):
-            print("Disconnected from Deepgram!")
-
-        def on_error(connection, error):
-            print(f"Error from Deepgram: {error}")
+        def on_error(error):
+            print(f"Error from {self.asr.provider}: {error}")
 
-        # Register all event handlers
-        self.dg_connection.on(LiveTranscriptionEvents.Open, on_open)
-        self.dg_connection.on(LiveTranscriptionEvents.Close, on_close)
-        self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
-        self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
+        # Open a session on the (possibly pre-warmed) ASR backend
+        try:
+            self.asr = ensure_backend(self.asr, self.asr_options, "meeting")
+            self.asr_session = self.asr.open_session(on_final=on_message, on_error=on_error)
+        except Exception as e:
+            print(f"Failed to start {self.asr.provider} transcription: {e}")
+            self.stream.close()
+            self.transcriptions.close()
+            self.transcriptions.path.unlink(missing_ok=True)
+            self.is_recording = False
+            return
+        print(f"Connected to {self.asr.provider}!")
 
         print("\nRecording... Press Enter to stop.\n")
 
         # Create a flag for stopping the recording
         self.should_stop = threading.Event()
 
+        # Only stream speech to the ASR; KeepAlives hold the socket open in silence
+        self.vad = VADGate(
+            get_detector(settings['vad_detector'], energy_threshold=self.silence_threshold),
+            rate=self.stream.rate,
+            on_speech_end=self.asr_session.finalize,
+            enabled=settings['vad_enabled']
+        )
+
+        # Summarise the meeting in the background while it runs
+        if settings['live_meeting_summary']:
+            self.summariser = MeetingSummariser(self.transcriptions).start()
+
+        # Keep the audio so the meeting can be re-transcribed later (batch_transcribe)
+        if settings['record_meeting_audio']:
+            self.recorder = AudioRecorder(
+                f"{MEETINGS_AUDIO_DIR}/transcription_{self.transcriptions.session_id}.wav",
+                rate=self.stream.rate, channels=self.stream.channels)
+
         # Define audio capture thread
         def capture_audio():
             while not self.should_stop.is_set():
-                data = self.stream.read(CHUNK)
-                self.dg_connection.send(data)
+                data = self.stream.read()
+                if data:
+                    if self.recorder is not None:
+                        self.recorder.write(data)
+                    self.vad.feed(data, self.asr_session.send, self.asr_session.keep_alive)
 
         # Start the capture thread
         self.audio_thread = threading.Thread(target=capture_audio)
@@ -209,51 +241,59 @@ class TranscriberApp:
         logger.info("Stopping recording...")
         self.should_stop.set()
         self.audio_thread.join()
-        self.stream.stop_stream()
         self.stream.close()
-        self.audio.terminate()
-        self.dg_connection.finish()
+        self.asr_session.finish()
         self.is_recording = False
+
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+        if self.summariser is not None:
+            self.summary_future = self.summariser.finish()
+            self.summariser = None
         
         # Save transcriptions
         self.save_transcriptions()
         print("Recording stopped!")
 
-    def save_transcriptions(self):
-        if self.transcriptions:
-            # Convert transcriptions to serializable format
-            serializable_transcripts = []
-            for t in self.transcriptions:
-                # Skip empty transcripts
-                if not t['transcript'].strip():
-                    continue
-                    
-                # Extract speaker from words if available
-                speaker = None
-                if t.get('words') and hasattr(t['words'][0], 'speaker'):
-                    speaker = t['words'][0].speaker
-
-                # Create clean transcript object
-                transcript_obj = {
-                    'timestamp': t['timestamp'],
-                    'transcript': t['transcript'],
-                    'confidence': t['confidence'],
-                    'speaker': speaker,
-                    'start_time': t['start_time'],
-                    'duration': t['duration'],
-                    'request_id': t['request_id']
-                }
-                serializable_transcripts.append(transcript_obj)
+    def save_transcriptions(self, transcriptions=None, words=None):
+        if transcriptions is None:
+            transcriptions, words = self.transcriptions, self.words
+        if hasattr(transcriptions, 'finalise'):
+            # Close the session log; it stays on disk next to the JSON export
+            transcriptions.finalise()
+        if transcriptions:
+            # Word-level timings as columns, memory-mappable by WordTable.load
+            if words is None:
+                words = WordTable.from_records(transcriptions)
+
+            # One record per speaker turn rather than per Deepgram result
+            serializable_transcripts = turn_records(transcriptions, words)
+            stats = speaker_stats(words)
+            for speaker, s in stats.items():
+                logger.info(f"🗣️ Speaker {speaker}: {s['talk_time']:.0f}s talking, {s['turns']} turns, "
+                            f"{s['overlap_time']:.0f}s overlapping")
 
             # Save to file only if we have non-empty transcripts
             if serializable_transcripts:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"meetings/json/transcription_{timestamp}.json"
+                timestamp = getattr(transcriptions, 'session_id', None) or datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"{MEETINGS_JSON_DIR}/transcription_{timestamp}.json"
                 with open(filename, 'w') as f:
                     json.dump(serializable_transcripts, f, indent=2)
                     
                 print(f"Transcriptions saved to {filename}")
 
+                if len(words):
+                    words.save(f"{MEETINGS_JSON_DIR}/transcription_{timestamp}")
+
+                # Index the meeting for search across all meetings
+                try:
+                    with MeetingStore() as store:
+                        store.add_meeting(timestamp, serializable_transcripts, source=filename)
+                except Exception as e:
+                    logger.error(f"Could not add meeting to the store: {e}")
+
 # Add main block
 if __name__ == "__main__":
     app = TranscriberApp()
@@ -0,0 +1,190 @@
+"""
+Append-only on-disk log of finalised utterances.
+
+Each utterance is appended as one JSON line as soon as Deepgram finalises
+it, and the file is fsynced at least every `fsync_interval` seconds. Only a
+compact array of line offsets is kept in memory, so a TranscriptLog can
+stand in for the old in-memory list (len, indexing, slicing, iteration)
+while memory stays flat however long the meeting runs.
+
+Logs of meetings in progress carry an `.open` suffix. If the app dies
+mid-meeting, recover_sessions() finds them on the next start, drops any
+torn last line and hands them back to be saved.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FSYNC_INTERVAL = 1.0
+OPEN_SUFFIX = ".open"
+
+
+def _same(seconds):
+    return seconds
+
+
+def _compact_words(words, clock: Callable = _same) -> List[list]:
+    """SDK word objects -> [punctuated_word, start, end, speaker, confidence] rows"""
+    rows = []
+    for w in words or []:
+        rows.append([
+            getattr(w, 'punctuated_word', None) or getattr(w, 'word', ''),
+            clock(getattr(w, 'start', None)),
+            clock(getattr(w, 'end', None)),
+            getattr(w, 'speaker', None),
+            getattr(w, 'confidence', None),
+        ])
+    return rows
+
+
+def utterance_record(result, timestamp: str, clock: Optional[Callable] = None) -> Dict:
+    """Serialisable record for one finalised Deepgram result.
+
+    clock maps the ASR's timestamps onto the capture timeline, e.g.
+    VADGate.capture_time when silence was not streamed.
+    """
+    clock = clock or _same
+    alternative = result.channel.alternatives[0]
+    words = _compact_words(alternative.words, clock)
+    start = clock(result.start)
+    end = clock(result.start + result.duration)
+    return {
+        'timestamp': timestamp,
+        'transcript': alternative.transcript,
+        'confidence': alternative.confidence,
+        'speaker': words[0][3] if words else None,
+        'start_time': start,
+        'duration': end - start,
+        'request_id': result.metadata.request_id,
+        'words': words,
+    }
+
+
+class TranscriptLog(Sequence):
+    def __init__(self, path, fsync_interval: float = FSYNC_INTERVAL):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._offsets = array('Q')
+        self._lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        self._end = self._build_index()
+
+    @property
+    def session_id(self) -> str:
+        """The timestamp part of transcription_<timestamp>.jsonl[.open]"""
+        name = self.path.name.split('.')[0]
+        return name.split('_', 1)[1] if '_' in name else name
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def _build_index(self) -> int:
+        """Index an existing file, truncating a torn or corrupt final line"""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            self._offsets.append(offset)
+            offset += len(line)
+        size = self._file.seek(0, os.SEEK_END)
+        if size != offset:
+            logger.warning(f"Truncating {size - offset} bytes of partial data from {self.path.name}")
+            self._file.truncate(offset)
+        return offset
+
+    def append(self, record: Dict) -> None:
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode()
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Transcript log {self.path.name} is closed")
+            self._file.write(line)
+            self._file.flush()
+            self._offsets.append(self._end)
+            self._end += len(line)
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read_range(self, start: int, stop: int) -> Iterator[Dict]:
+        if start >= stop:
+            return
+        with self._lock:
+            offset = self._offsets[start]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for _ in range(stop - start):
+                yield json.loads(f.readline())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            items = list(self._read_range(start, stop)) if start < stop else []
+            return items[::step] if step != 1 else items
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript log index out of range")
+        return next(self._read_range(index, index + 1))
+
+    def __iter__(self) -> Iterator[Dict]:
+        # Snapshot the length so concurrent appends don't extend the iteration
+        return self._read_range(0, len(self))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def finalise(self) -> Path:
+        """Close the log and drop the in-progress suffix"""
+        self.close()
+        if self.path.suffix == OPEN_SUFFIX:
+            final = self.path.with_suffix("")
+            self.path.replace(final)
+            self.path = final
+        return self.path
+
+
+def new_session(directory, timestamp: Optional[str] = None) -> TranscriptLog:
+    timestamp = timestamp or time.strftime("%Y%m%d_%H%M%S")
+    return TranscriptLog(Path(directory) / f"transcription_{timestamp}.jsonl{OPEN_SUFFIX}")
+
+
+def recover_sessions(directory) -> List[TranscriptLog]:
+    """Logs of meetings that never stopped cleanly, oldest first"""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    logs = []
+    for path in sorted(directory.glob(f"transcription_*.jsonl{OPEN_SUFFIX}")):
+        try:
+            log = TranscriptLog(path)
+            logger.info(f"♻️ Recovered {len(log)} utterances from interrupted meeting {log.session_id}")
+            logs.append(log)
+        except OSError as e:
+            logger.error(f"Could not recover {path.name}: {e}")
+    return logs
@@ -0,0 +1,143 @@
+"""
+Columnar storage for diarized word timings.
+
+A meeting's words are held in one NumPy structured array (start, end,
+speaker, confidence, word id, utterance index: 30 bytes a word) instead of
+lists of SDK word objects, with word strings interned in a shared table.
+Rows are appended a result at a time into a buffer that grows
+geometrically. Saving writes the array as a .npy file that load() can
+memory-map without copying, next to a JSON file of the strings.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORD_DTYPE = np.dtype([
+    ('start', '<f8'),
+    ('end', '<f8'),
+    ('speaker', '<i2'),
+    ('confidence', '<f4'),
+    ('word', '<u4'),
+    ('utterance', '<i4'),
+], align=False)
+
+NO_SPEAKER = -1
+INITIAL_CAPACITY = 4096
+
+
+class StringTable:
+    """Interns strings to dense integer ids"""
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = list(strings or [])
+        self._ids: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, text: str) -> int:
+        index = self._ids.get(text)
+        if index is None:
+            index = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        return self.strings[index]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class WordTable:
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._data = np.zeros(capacity, dtype=WORD_DTYPE)
+        self._size = 0
+        self.strings = StringTable()
+        self.utterances = 0
+
+    @property
+    def data(self) -> np.ndarray:
+        """View of the filled rows (no copy)"""
+        return self._data[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + sum(len(s) for s in self.strings.strings)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._data):
+            return
+        capacity = max(needed, len(self._data) * 2)
+        grown = np.zeros(capacity, dtype=WORD_DTYPE)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def append_words(self, rows: Sequence[Sequence], utterance: Optional[int] = None) -> None:
+        """Append one result's words as [word, start, end, speaker, confidence] rows"""
+        utterance = self.utterances if utterance is None else utterance
+        self.utterances = max(self.utterances, utterance + 1)
+        if not rows:
+            return
+        self._reserve(len(rows))
+        batch = self._data[self._size:self._size + len(rows)]
+        batch['word'] = [self.strings.intern(r[0] or '') for r in rows]
+        batch['start'] = [r[1] or 0.0 for r in rows]
+        batch['end'] = [r[2] or 0.0 for r in rows]
+        batch['speaker'] = [NO_SPEAKER if r[3] is None else r[3] for r in rows]
+        batch['confidence'] = [r[4] or 0.0 for r in rows]
+        batch['utterance'] = utterance
+        self._size += len(rows)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "WordTable":
+        """Build from utterance records (transcript log entries)"""
+        table = cls()
+        for index, record in enumerate(records):
+            table.append_words(record.get('words') or [], utterance=index)
+        return table
+
+    def words(self, indices=None) -> List[str]:
+        ids = self.data['word'] if indices is None else self.data['word'][indices]
+        return [self.strings[i] for i in ids.tolist()]
+
+    def talk_time_by_speaker(self) -> Dict[int, float]:
+        """Seconds of speech per speaker, summed over word durations"""
+        data = self.data
+        known = data['speaker'] >= 0
+        if not known.any():
+            return {}
+        durations = np.clip(data['end'][known] - data['start'][known], 0.0, None)
+        totals = np.bincount(data['speaker'][known], weights=durations)
+        return {int(s): float(t) for s, t in enumerate(totals) if t > 0}
+
+    def save(self, prefix) -> Path:
+        """Write <prefix>.words.npy (raw column data) and <prefix>.strings.json"""
+        prefix = Path(prefix)
+        array_path = prefix.with_name(prefix.name + ".words.npy")
+        np.save(array_path, self.data, allow_pickle=False)
+        with open(prefix.with_name(prefix.name + ".strings.json"), "w") as f:
+            json.dump({"utterances": self.utterances, "strings": self.strings.strings}, f)
+        return array_path
+
+    @classmethod
+    def load(cls, prefix, mmap: bool = True) -> "WordTable":
+        """Load a saved table; with mmap the columns are read straight from the file"""
+        prefix = Path(prefix)
+        data = np.load(prefix.with_name(prefix.name + ".words.npy"),
+                       mmap_mode="r" if mmap else None, allow_pickle=False)
+        with open(prefix.with_name(prefix.name + ".strings.json")) as f:
+            meta = json.load(f)
+        table = cls(capacity=0)
+        table._data = data
+        table._size = len(data)
+        table.strings = StringTable(meta["strings"])
+        table.utterances = meta["utterances"]
+        return table
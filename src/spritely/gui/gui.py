@@ -6,7 +6,10 @@ from datetime import datetime
 from tkinter import scrolledtext
     
 from src.spritely.utils.audio_utils import select_microphone, check_permissions
-from src.spritely.core.ai_summarise import ai_summary
+from src.spritely.core.ai_summarise import stream_summary
+from src.spritely.core.speaker_turns import turn_records
+from src.spritely.gui.worker import GUIWorker
+from src.spritely.utils.tracing import Trace, mark, use_trace
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
@@ -28,6 +31,9 @@ class SpritelyGUI:
         
         # Make window transparent
         self.root.attributes('-alpha', 0.95)  # 95% opacity
+
+        # Runs LLM calls and other slow work off the Tk thread
+        self.worker = GUIWorker(self.root)
         
         # Style configuration
         style = ttk.Style()
@@ -209,7 +215,7 @@ class SpritelyGUI:
             self.update_status("Ready", False)
             self.convert_json_to_text()
 
-    def show_transcript(self, filename):
+    def show_transcript(self, filename, summary_future=None):
         logger.info(f"Opening transcript window for {filename}")
         """Open a new window to display the transcript"""
         # Create new window
@@ -258,8 +264,10 @@ class SpritelyGUI:
             fg="#2c3e50",
             relief="flat"
         )
+        cancel_btn = ttk.Button(summary_frame, text="Cancel Summary", style="Stop.TButton")
+        cancel_btn.pack(side=tk.BOTTOM, pady=5)
         summary_text.pack(fill=tk.BOTH, expand=True)
-        summary_text.insert(tk.END, "AI Summary coming soon...")
+        summary_text.insert(tk.END, "Generating AI summary...")
         summary_text.configure(state='disabled')
 
         # Read and display the transcript
@@ -269,13 +277,9 @@ class SpritelyGUI:
                 transcript_text.insert(tk.END, content)
                 transcript_text.configure(state='disabled')
                 
-                # Generate and display AI summary
-                logger.debug("Generating AI summary")
-                summary = ai_summary(meeting_transcript=content)
-                summary_text.configure(state='normal')
-                summary_text.delete(1.0, tk.END)
-                summary_text.insert(tk.END, summary)
-                summary_text.configure(state='disabled')
+            # Generate the AI summary in the background, streaming it into the tab
+            logger.debug("Generating AI summary")
+            self.start_summary(content, summary_text, cancel_btn, summary_future)
         except Exception as e:
             logger.error(f"Error displaying transcript: {str(e)}")
             transcript_text.insert(tk.END, f"Error loading transcript: {str(e)}")
@@ -285,6 +289,75 @@ class SpritelyGUI:
             summary_text.insert(tk.END, f"Error generating summary: {str(e)}")
             summary_text.configure(state='disabled')
 
+    def start_summary(self, content, summary_text, cancel_btn, summary_future=None):
+        """Generate a meeting summary on the worker, streaming it into summary_text"""
+        state = {"started": False}
+
+        def generate(job):
+            if summary_future is not None:
+                # Built up while the meeting was recorded; only the last merge is left
+                while not summary_future.done():
+                    if job.wait_cancelled(0.1):
+                        return None
+                try:
+                    summary = summary_future.result()
+                except Exception as e:
+                    logger.error(f"Live summary failed, summarising the transcript instead: {e}")
+                    summary = None
+                if summary:
+                    job.emit(summary)
+                    return summary
+            parts = []
+            tokens = stream_summary(meeting_transcript=content)
+            try:
+                for token in tokens:
+                    if job.cancelled:
+                        break
+                    parts.append(token)
+                    job.emit(token)
+            finally:
+                tokens.close()
+            return "".join(parts)
+
+        def write(text, replace=False):
+            if not summary_text.winfo_exists():
+                return
+            summary_text.configure(state='normal')
+            if replace:
+                summary_text.delete(1.0, tk.END)
+            summary_text.insert(tk.END, text)
+            summary_text.see(tk.END)
+            summary_text.configure(state='disabled')
+
+        def on_token(token):
+            if not state["started"]:
+                mark("first_token_shown")
+            write(token, replace=not state["started"])
+            state["started"] = True
+
+        def on_done(summary, cancelled):
+            trace.finish()
+            if cancelled:
+                write("\n\n[Summary cancelled]", replace=not state["started"])
+            elif not summary:
+                write("No summary generated.", replace=True)
+            if cancel_btn.winfo_exists():
+                cancel_btn.configure(state='disabled')
+
+        def on_error(e):
+            trace.finish()
+            write(f"Error generating summary: {str(e)}", replace=True)
+            if cancel_btn.winfo_exists():
+                cancel_btn.configure(state='disabled')
+
+        trace = Trace("summary", live=summary_future is not None)
+        with use_trace(trace):
+            job = self.worker.submit(generate, on_token=on_token, on_done=on_done, on_error=on_error)
+        cancel_btn.configure(command=job.cancel)
+        # Closing the window stops the summary too
+        summary_text.bind("<Destroy>", lambda event: job.cancel())
+        return job
+
     def convert_json_to_text(self):
         if not self.meeting_transcriber.transcriptions:
             logger.warning("No transcript to save - empty transcription")
@@ -307,13 +380,14 @@ class SpritelyGUI:
                 f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write("-" * 50 + "\n\n")
                 
-                # Write each transcription entry
-                for entry in self.meeting_transcriber.transcriptions:
+                # Write one line per speaker turn
+                transcriber = self.meeting_transcriber
+                for entry in turn_records(transcriber.transcriptions, transcriber.words):
                     timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%H:%M:%S')
                     transcript = entry['transcript']
                     
-                    if entry.get('words') and hasattr(entry['words'][0], 'speaker'):
-                        speaker = f"Speaker {entry['words'][0].speaker}"
+                    if entry.get('speaker') is not None:
+                        speaker = f"Speaker {entry['speaker']}"
                         f.write(f"[{timestamp}] {speaker}: {transcript}\n")
                     else:
                         f.write(f"[{timestamp}] {transcript}\n")
@@ -322,7 +396,7 @@ class SpritelyGUI:
             self.status_label.config(text=f"Meeting saved to {filename}")
             
             # Show the transcript in a new window
-            self.show_transcript(filename)
+            self.show_transcript(filename, self.meeting_transcriber.summary_future)
             
         except Exception as e:
             logger.error(f"Error saving transcript: {str(e)}")
@@ -356,6 +430,10 @@ class SpritelyGUI:
             logger.warning("Missing microphone permissions")
             self.status_label.config(text="Missing permissions. Check console for details.")
     
+    def when_shown(self, callback):
+        """Run callback on the Tk thread once the window has been drawn"""
+        self.root.after_idle(callback)
+
     def run(self):
         logger.info("Starting Spritely GUI")
         self.root.mainloop() 
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Background work for the Tk GUI.
+
+Long operations (LLM calls, file conversions) run on a small thread pool.
+They report back through a queue that the Tk thread drains on a root.after
+timer, so widgets are only ever touched from the Tk thread and the window
+keeps redrawing while the work runs. The timer only runs while jobs are
+outstanding; submit() restarts it.
+
+    job = worker.submit(generate, on_token=append, on_done=finished)
+    ...
+    job.cancel()
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.spritely.utils.tracing import bind
+
+logger = logging.getLogger(__name__)
+
+# ~60 fps
+POLL_MS = 16
+# Time budget per poll for running callbacks, so one tick never stalls a frame
+POLL_BUDGET_S = 0.008
+
+_TOKEN, _DONE, _ERROR = "token", "done", "error"
+
+
+class Job:
+    def __init__(self, worker: "GUIWorker", on_token, on_done, on_error):
+        self._worker = worker
+        self._cancelled = threading.Event()
+        self.on_token = on_token
+        self.on_done = on_done
+        self.on_error = on_error
+        self.finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Ask the job to stop; it should check `cancelled` between steps"""
+        self._cancelled.set()
+
+    def wait_cancelled(self, timeout: float) -> bool:
+        return self._cancelled.wait(timeout)
+
+    def emit(self, value: Any) -> None:
+        """Send a partial result to on_token on the Tk thread"""
+        if not self.cancelled:
+            self._worker._events.put((self, _TOKEN, value))
+
+
+class GUIWorker:
+    def __init__(self, root, max_workers: int = 2, poll_ms: int = POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-worker")
+        self._events: "queue.Queue" = queue.Queue()
+        self._polling = False
+        # Jobs whose done/error event hasn't been dispatched yet (Tk thread only)
+        self._pending = 0
+
+    def submit(self, fn: Callable[..., Any], *args,
+               on_token: Optional[Callable[[Any], None]] = None,
+               on_done: Optional[Callable[[Any, bool], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None, **kwargs) -> Job:
+        """Run fn(job, *args, **kwargs) in the background.
+
+        on_done receives (result, cancelled). All callbacks run on the Tk thread,
+        inside the caller's trace if there is one.
+        """
+        on_token, on_done, on_error = (bind(cb) if cb is not None else None
+                                       for cb in (on_token, on_done, on_error))
+        job = Job(self, on_token, on_done, on_error)
+
+        def run():
+            try:
+                result = fn(job, *args, **kwargs)
+                self._events.put((job, _DONE, result))
+            except Exception as e:
+                logger.error(f"Background task failed: {e}", exc_info=True)
+                self._events.put((job, _ERROR, e))
+
+        self._pending += 1
+        self._executor.submit(bind(run))
+        self._ensure_polling()
+        return job
+
+    def _ensure_polling(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        deadline = time.perf_counter() + POLL_BUDGET_S
+        while time.perf_counter() < deadline:
+            try:
+                job, kind, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind != _TOKEN:
+                self._pending -= 1
+            self._dispatch(job, kind, value)
+        if self._pending or not self._events.empty():
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            # Idle: stop waking the Tk thread until the next submit()
+            self._polling = False
+
+    @staticmethod
+    def _dispatch(job: Job, kind: str, value: Any) -> None:
+        try:
+            if kind == _TOKEN:
+                if job.on_token is not None and not job.cancelled:
+                    job.on_token(value)
+            elif kind == _DONE:
+                job.finished = True
+                if job.on_done is not None:
+                    job.on_done(value, job.cancelled)
+            elif kind == _ERROR:
+                job.finished = True
+                if job.on_error is not None:
+                    job.on_error(value)
+        except Exception as e:
+            # A widget may have been destroyed while the job was running
+            logger.debug(f"GUI callback failed: {e}")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
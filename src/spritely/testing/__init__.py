@@ -0,0 +1,6 @@
+"""
+Local stand-ins for the remote services Spritely talks to.
+
+These let the pipeline be exercised and benchmarked without network access
+or API keys.
+"""
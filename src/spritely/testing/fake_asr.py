@@ -0,0 +1,155 @@
+"""
+A local HTTP server standing in for Deepgram's pre-recorded API.
+
+POST /v1/listen takes a WAV body and returns a Deepgram-shaped response
+with one word every `word_seconds` of non-silent audio, so the timings in
+the response follow the speech in the request. Failing the first few
+requests with 503s exercises the client's retries.
+
+    server = FakeASRServer(latency=0.2, fail_first=1).start()
+    transcriber = BatchTranscriber(url=server.url, workers=4)
+    ...
+    server.max_concurrent  # peak number of requests in flight
+"""
+
+import io
+import json
+import threading
+import time
+import uuid
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import numpy as np
+
+
+class FakeASRServer:
+    def __init__(self, word_seconds: float = 0.4, speakers: int = 2, latency: float = 0.0,
+                 fail_first: int = 0, silence_threshold: float = 200.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.word_seconds = word_seconds
+        self.speakers = speakers
+        self.latency = latency
+        self.fail_first = fail_first
+        self.silence_threshold = silence_threshold
+        self.host = host
+        self.port = port
+
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_concurrent = 0
+        self.seconds_received = 0.0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeASRServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not self.path.startswith("/v1/listen"):
+                    fake._send_json(self, {"error": "not found"}, status=404)
+                    return
+                with fake._lock:
+                    fake.requests += 1
+                    fail = fake.failures < fake.fail_first
+                    if fail:
+                        fake.failures += 1
+                    fake.in_flight += 1
+                    fake.max_concurrent = max(fake.max_concurrent, fake.in_flight)
+                try:
+                    time.sleep(fake.latency)
+                    if fail:
+                        fake._send_json(self, {"error": "overloaded"}, status=503)
+                    else:
+                        fake._send_json(self, fake._listen(body))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(5)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _send_json(handler, payload: dict, status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _listen(self, body: bytes) -> dict:
+        with wave.open(io.BytesIO(body), "rb") as wav:
+            rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        with self._lock:
+            self.seconds_received += len(samples) / rate
+
+        # One word per loud word_seconds window; speaker changes every 5 words
+        step = int(rate * self.word_seconds)
+        words = []
+        for i in range(len(samples) // step):
+            window = samples[i * step:(i + 1) * step].astype(np.float32)
+            if np.sqrt((window ** 2).mean()) < self.silence_threshold:
+                continue
+            start = i * self.word_seconds
+            words.append({
+                "word": f"w{i}", "punctuated_word": f"w{i}",
+                "start": round(start, 3), "end": round(start + self.word_seconds * 0.8, 3),
+                "confidence": 0.9, "speaker": (len(words) // 5) % self.speakers,
+            })
+
+        utterances = []
+        for word in words:
+            if utterances and utterances[-1]["speaker"] == word["speaker"]:
+                utterance = utterances[-1]
+                utterance["words"].append(word)
+                utterance["end"] = word["end"]
+                utterance["transcript"] += " " + word["punctuated_word"]
+            else:
+                utterances.append({"start": word["start"], "end": word["end"], "confidence": 0.9,
+                                   "speaker": word["speaker"], "transcript": word["punctuated_word"],
+                                   "words": [word]})
+
+        transcript = " ".join(w["punctuated_word"] for w in words)
+        return {
+            "metadata": {"request_id": str(uuid.uuid4()), "duration": len(samples) / rate, "channels": 1},
+            "results": {
+                "channels": [{"alternatives": [{"transcript": transcript, "confidence": 0.9, "words": words}]}],
+                "utterances": utterances,
+            },
+        }
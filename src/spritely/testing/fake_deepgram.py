@@ -0,0 +1,181 @@
+"""
+A local websocket server that speaks enough of Deepgram's live protocol for
+the SDK to connect to it.
+
+Audio frames are counted; every `utterance_seconds` of audio (or on a
+Finalize message) the next canned transcript is sent back as a Results
+message. KeepAlive, Finalize and CloseStream control messages are honoured.
+
+    server = FakeDeepgramServer(["hello there", "how are you"]).start()
+    manager = DeepgramConnectionManager(options_factory, url=server.url, api_key="fake")
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+
+class FakeDeepgramServer:
+    def __init__(self, transcripts: Iterable[str] = ("hello from the fake deepgram server",),
+                 utterance_seconds: float = 1.0, latency: float = 0.0,
+                 speakers: int = 1, host: str = "127.0.0.1", port: int = 0):
+        self.transcripts: List[str] = list(transcripts)
+        self.utterance_seconds = utterance_seconds
+        self.latency = latency
+        self.speakers = speakers
+        self.host = host
+        self.port = port
+
+        self.connections = 0
+        self.keepalives = 0
+        self.finalizes = 0
+        self.bytes_received = 0
+        self.results_sent = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._phrases = itertools.cycle(self.transcripts)
+
+    @property
+    def url(self) -> str:
+        """Base URL in the form DeepgramClientOptions(url=...) expects"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeDeepgramServer":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            websockets.serve(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, websocket, path: Optional[str] = None) -> None:
+        request = getattr(websocket, "request", None)
+        path = request.path if request is not None else (path or websocket.path)
+        params = {k: v[0] for k, v in parse_qs(urlparse(path).query).items()}
+        rate = int(params.get("sample_rate", 16000))
+        channels = int(params.get("channels", 1))
+        bytes_per_second = rate * channels * 2
+        interim = params.get("interim_results", "false").lower() == "true"
+
+        self.connections += 1
+        request_id = str(uuid.uuid4())
+        state = {"sent_until": 0.0, "received": 0, "interim_sent": False}
+
+        async def emit(end: float, is_final: bool, from_finalize: bool = False) -> None:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            start = state["sent_until"]
+            text = next(self._phrases) if is_final else "…"
+            await websocket.send(json.dumps(
+                self._results(request_id, text, start, end - start, is_final, from_finalize)
+            ))
+            if is_final:
+                self.results_sent += 1
+                state["sent_until"] = end
+                state["interim_sent"] = False
+
+        async for message in websocket:
+            if isinstance(message, bytes):
+                self.bytes_received += len(message)
+                state["received"] += len(message)
+                audio_end = state["received"] / bytes_per_second
+                elapsed = audio_end - state["sent_until"]
+                if elapsed >= self.utterance_seconds:
+                    await emit(audio_end, is_final=True)
+                elif interim and not state["interim_sent"] and elapsed >= self.utterance_seconds / 2:
+                    state["interim_sent"] = True
+                    await emit(audio_end, is_final=False)
+                continue
+
+            control = json.loads(message).get("type")
+            if control == "KeepAlive":
+                self.keepalives += 1
+            elif control == "Finalize":
+                self.finalizes += 1
+                audio_end = state["received"] / bytes_per_second
+                if audio_end > state["sent_until"]:
+                    await emit(audio_end, is_final=True, from_finalize=True)
+            elif control == "CloseStream":
+                await websocket.send(json.dumps(self._metadata(request_id, state["received"] / bytes_per_second, channels)))
+                await websocket.close()
+                return
+
+    def _results(self, request_id: str, text: str, start: float, duration: float,
+                 is_final: bool, from_finalize: bool) -> dict:
+        tokens = text.split()
+        step = duration / max(len(tokens), 1)
+        speaker = self.results_sent % self.speakers
+        words = [
+            {
+                "word": token.lower().strip(".,?!"),
+                "start": round(start + i * step, 3),
+                "end": round(start + (i + 1) * step, 3),
+                "confidence": 0.99,
+                "speaker": speaker,
+                "speaker_confidence": 0.9,
+                "punctuated_word": token,
+            }
+            for i, token in enumerate(tokens)
+        ]
+        return {
+            "type": "Results",
+            "channel_index": [0, 1],
+            "duration": round(duration, 3),
+            "start": round(start, 3),
+            "is_final": is_final,
+            "speech_final": is_final,
+            "from_finalize": from_finalize,
+            "channel": {"alternatives": [{"transcript": text, "confidence": 0.99, "words": words}]},
+            "metadata": {
+                "request_id": request_id,
+                "model_info": {"name": "fake", "version": "0", "arch": "fake"},
+                "model_uuid": "00000000-0000-0000-0000-000000000000",
+            },
+        }
+
+    @staticmethod
+    def _metadata(request_id: str, duration: float, channels: int) -> dict:
+        return {
+            "type": "Metadata",
+            "transaction_key": "deprecated",
+            "request_id": request_id,
+            "sha256": "",
+            "created": "",
+            "duration": duration,
+            "channels": channels,
+            "models": [],
+            "model_info": {},
+        }
@@ -0,0 +1,179 @@
+"""
+A local HTTP server standing in for the Anthropic, Groq and ElevenLabs APIs.
+
+Every endpoint can be made to stall, which is how we check that a slow
+provider never blocks the event loop:
+
+    server = FakeLLMServer(first_token_delay=2.0).start()
+    providers = Providers(anthropic_base_url=server.url, groq_base_url=server.url,
+                          elevenlabs_base_url=server.url)
+
+Endpoints:
+    POST /v1/messages                       Anthropic messages (SSE when stream=true)
+    POST /openai/v1/chat/completions        Groq chat completions
+    POST /v1/text-to-speech/<voice>[/stream] ElevenLabs TTS, returns silent PCM
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class FakeLLMServer:
+    def __init__(self, response: str = "This is a fake response. It has a few sentences, so it can be chunked.",
+                 route: str = "speak", first_token_delay: float = 0.0, token_delay: float = 0.0,
+                 router_delay: float = 0.0, tts_delay: float = 0.0, tts_sample_rate: int = 22050,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.response = response
+        self.route = route
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.router_delay = router_delay
+        self.tts_delay = tts_delay
+        self.tts_sample_rate = tts_sample_rate
+        self.host = host
+        self.port = port
+
+        self.requests = {"messages": 0, "chat": 0, "tts": 0}
+        self.open_requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeLLMServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.open_requests += 1
+                try:
+                    if self.path.startswith("/v1/messages"):
+                        fake._count("messages")
+                        fake._messages(self, body)
+                    elif self.path.startswith("/openai/v1/chat/completions"):
+                        fake._count("chat")
+                        fake._chat(self)
+                    elif self.path.startswith("/v1/text-to-speech/"):
+                        fake._count("tts")
+                        fake._tts(self, body)
+                    else:
+                        fake._send_json(self, {"error": "not found"}, status=404)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client cancelled the request
+                    pass
+                finally:
+                    with fake._lock:
+                        fake.open_requests -= 1
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(5)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    @staticmethod
+    def _send_json(handler, payload: dict, status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    @staticmethod
+    def _write_chunk(handler, data: bytes) -> None:
+        handler.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        handler.wfile.flush()
+
+    def _messages(self, handler, body: dict) -> None:
+        tokens = [token + " " for token in self.response.split()]
+        usage = {"input_tokens": 10, "output_tokens": len(tokens),
+                 "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        message = {"id": "msg_fake", "type": "message", "role": "assistant",
+                   "model": body.get("model", "fake"), "stop_reason": None,
+                   "stop_sequence": None, "usage": usage}
+
+        time.sleep(self.first_token_delay)
+        if not body.get("stream"):
+            message.update(content=[{"type": "text", "text": "".join(tokens)}], stop_reason="end_turn")
+            self._send_json(handler, message)
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def event(name: str, payload: dict) -> None:
+            self._write_chunk(handler, f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode())
+
+        event("message_start", {"type": "message_start", "message": dict(message, content=[])})
+        event("content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}})
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_delay)
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta", "text": token}})
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta",
+                                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": len(tokens)}})
+        event("message_stop", {"type": "message_stop"})
+        handler.wfile.write(b"0\r\n\r\n")
+        handler.wfile.flush()
+
+    def _chat(self, handler) -> None:
+        time.sleep(self.router_delay)
+        self._send_json(handler, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "llama3-70b-8192",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"[{self.route}]"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+        })
+
+    def _tts(self, handler, body: dict) -> None:
+        time.sleep(self.tts_delay)
+        # 50ms of silence per word, 16-bit mono
+        words = max(1, len(body.get("text", "").split()))
+        audio = b"\x00\x00" * int(self.tts_sample_rate * 0.05 * words)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "audio/pcm")
+        handler.send_header("Content-Length", str(len(audio)))
+        handler.end_headers()
+        handler.wfile.write(audio)
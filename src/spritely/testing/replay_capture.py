@@ -0,0 +1,85 @@
+"""
+A stand-in for the capture engine that plays back recorded audio.
+
+Chunks are pushed to subscribers from a thread at `speed` times real time,
+in the same format the microphone would deliver them, so transcribers read
+through a real AudioSubscription (downmix, resampling and all):
+
+    samples = read_audio("meetings/audio/transcription_x.flac")
+    engine = ReplayCaptureEngine(samples, rate=16000).start()
+    stream = engine.subscribe(target_rate=16000, mono=True)
+    ...
+    engine.done.wait()
+"""
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.spritely.utils.audio_engine import DEFAULT_BUFFER_CHUNKS, AudioSubscription
+
+
+class ReplayCaptureEngine:
+    def __init__(self, samples: np.ndarray, rate: int, channels: int = 1, chunk: int = 1024,
+                 speed: float = 1.0, tail_seconds: float = 0.0):
+        """samples: int16, interleaved if channels > 1; tail_seconds of silence are played after them"""
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.speed = speed
+        self.input_device = {"name": "replay", "defaultSampleRate": rate, "maxInputChannels": channels}
+        tail = np.zeros(int(tail_seconds * rate) * channels, dtype=np.int16)
+        self._data = np.concatenate([np.asarray(samples, dtype=np.int16).ravel(), tail]).tobytes()
+        self._subscribers: Tuple[AudioSubscription, ...] = ()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.done = threading.Event()
+        self.chunks_pushed = 0
+
+    @property
+    def seconds(self) -> float:
+        return len(self._data) / (2 * self.channels * self.rate)
+
+    def start(self) -> "ReplayCaptureEngine":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replay-capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def subscribe(self, target_rate: Optional[int] = None, mono: bool = False,
+                  max_chunks: int = DEFAULT_BUFFER_CHUNKS) -> AudioSubscription:
+        with self._lock:
+            subscription = AudioSubscription(self, max_chunks=max_chunks, target_rate=target_rate, mono=mono)
+            self._subscribers = self._subscribers + (subscription,)
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription: AudioSubscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2)
+
+    def _run(self) -> None:
+        step = self.chunk * self.channels * 2
+        interval = self.chunk / self.rate / self.speed if self.speed else 0.0
+        next_at = time.monotonic()
+        for offset in range(0, len(self._data), step):
+            if self._stop.is_set():
+                break
+            if interval:
+                next_at += interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            data = self._data[offset:offset + step]
+            for subscriber in self._subscribers:
+                subscriber._push(data)
+            self.chunks_pushed += 1
+        self.done.set()
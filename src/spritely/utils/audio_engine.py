@@ -0,0 +1,209 @@
+"""
+Long-lived microphone capture shared by every transcriber.
+
+One PortAudio instance and one callback-mode input stream are opened once and
+kept warm. Transcribers attach an AudioSubscription and read chunks from its
+ring buffer, so starting a session no longer touches PortAudio at all.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+import pyaudio
+
+from src.spritely.utils.audio_utils import FORMAT, CHANNELS, RATE, CHUNK
+from src.spritely.utils.resample import Resampler
+from src.spritely.utils.user_settings import settings
+
+logger = logging.getLogger(__name__)
+
+# ~3 seconds of audio at the default chunk size before old chunks are dropped
+DEFAULT_BUFFER_CHUNKS = 128
+
+
+class AudioSubscription:
+    """Single-consumer ring buffer fed by the capture callback.
+
+    The PortAudio callback only appends to a bounded deque, which is atomic
+    under the GIL, so the audio thread never blocks on a lock held by a slow
+    consumer. When the consumer falls behind the oldest chunks are dropped.
+
+    If target_rate or mono is requested, chunks are downmixed and resampled
+    on the consumer's thread as they are read; channels and rate describe
+    the format read() returns.
+    """
+
+    def __init__(self, engine: "CaptureEngine", max_chunks: int = DEFAULT_BUFFER_CHUNKS,
+                 target_rate: Optional[int] = None, mono: bool = False):
+        self.engine = engine
+        self.channels = engine.channels
+        self.rate = engine.rate
+        self._resampler = None
+        if mono or (target_rate and target_rate != engine.rate):
+            self._resampler = Resampler(engine.rate, target_rate or engine.rate, engine.channels)
+            self.channels = self._resampler.out_channels
+            self.rate = self._resampler.out_rate
+        self.dropped_chunks = 0
+        self._buffer = deque(maxlen=max_chunks)
+        self._ready = threading.Event()
+        self._closed = False
+
+    def _push(self, data: bytes) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped_chunks += 1
+        self._buffer.append(data)
+        self._ready.set()
+
+    def _pop(self, timeout: Optional[float]) -> Optional[bytes]:
+        try:
+            return self._buffer.popleft()
+        except IndexError:
+            pass
+        self._ready.clear()
+        # Re-check after clearing so a chunk pushed in between is not missed
+        if not self._buffer and not self._closed:
+            self._ready.wait(timeout)
+        try:
+            return self._buffer.popleft()
+        except IndexError:
+            return None
+
+    def read(self, timeout: Optional[float] = 0.5) -> Optional[bytes]:
+        """Return the next chunk, or None if nothing arrived within timeout"""
+        data = self._pop(timeout)
+        if data is None or self._resampler is None:
+            return data
+        return self._resampler.process(data)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._ready.set()
+        self.engine.unsubscribe(self)
+        if self.dropped_chunks:
+            logger.warning(f"Audio consumer dropped {self.dropped_chunks} chunks")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureEngine:
+    def __init__(self, channels: int = CHANNELS, rate: int = RATE, chunk: int = CHUNK):
+        self.requested_channels = channels
+        self.channels = channels
+        self.rate = rate
+        self.chunk = chunk
+        self.device_index: Optional[int] = None
+        self.input_device = None
+        self._pa = None
+        self._stream = None
+        self._subscribers: Tuple[AudioSubscription, ...] = ()
+        self._lock = threading.RLock()
+
+    @property
+    def pa(self) -> pyaudio.PyAudio:
+        """The process-wide PortAudio instance, also used for playback"""
+        with self._lock:
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+            return self._pa
+
+    @property
+    def is_running(self) -> bool:
+        return self._stream is not None and self._stream.is_active()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        # Runs on the PortAudio thread: iterate an immutable snapshot, no locks
+        for subscriber in self._subscribers:
+            subscriber._push(in_data)
+        return (None, pyaudio.paContinue)
+
+    def start(self) -> None:
+        """Open the input stream on the configured microphone if not already open"""
+        with self._lock:
+            mic_index = settings['microphone_index']
+            if self._stream is not None and mic_index == self.device_index:
+                return
+            self._close_stream()
+
+            if mic_index is not None:
+                self.input_device = self.pa.get_device_info_by_index(mic_index)
+            else:
+                self.input_device = self.pa.get_default_input_device_info()
+            self.channels = max(1, min(self.requested_channels, int(self.input_device['maxInputChannels'])))
+
+            self._stream = self.pa.open(
+                format=FORMAT,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                input_device_index=mic_index,
+                frames_per_buffer=self.chunk,
+                stream_callback=self._callback
+            )
+            self._stream.start_stream()
+            self.device_index = mic_index
+            logger.info(f"Capture engine started on: {self.input_device['name']} "
+                        f"({self.channels}ch @ {self.rate}Hz)")
+
+    def warm_up_async(self) -> threading.Thread:
+        def run():
+            try:
+                self.start()
+            except Exception as e:
+                logger.error(f"Capture engine warm-up failed: {e}")
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def subscribe(self, target_rate: Optional[int] = None, mono: bool = False,
+                  max_chunks: int = DEFAULT_BUFFER_CHUNKS) -> AudioSubscription:
+        """Attach a new consumer, (re)opening the stream if needed"""
+        with self._lock:
+            # Pick up a microphone change only when nobody is listening
+            if not self._subscribers or self._stream is None:
+                self.start()
+            subscription = AudioSubscription(self, max_chunks=max_chunks,
+                                             target_rate=target_rate, mono=mono)
+            self._subscribers = self._subscribers + (subscription,)
+            return subscription
+
+    def unsubscribe(self, subscription: AudioSubscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def _close_stream(self) -> None:
+        if self._stream is None:
+            return
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        except Exception as e:
+            logger.warning(f"Error closing capture stream: {e}")
+        self._stream = None
+
+    def shutdown(self) -> None:
+        """Close the stream and release PortAudio, e.g. at application exit"""
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber._closed = True
+                subscriber._ready.set()
+            self._subscribers = ()
+            self._close_stream()
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+# Shared engine instance
+capture_engine = CaptureEngine()
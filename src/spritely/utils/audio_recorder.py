@@ -0,0 +1,146 @@
+"""
+Write captured meeting audio to disk.
+
+Chunks are handed to a writer thread through a queue, so the capture loop
+never waits on the disk. Audio is written as 16-bit WAV while recording.
+The header only gets its final length on close, so if the app dies the
+WAV is fixed by repair_wav() (the meeting's recovery and read_audio() do
+this). On close it is compressed to FLAC in the background when ffmpeg is
+available; otherwise the WAV is kept.
+"""
+
+import logging
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import wave
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MEETINGS_AUDIO_DIR = "meetings/audio"
+
+_STOP = object()
+
+
+def compress_to_flac(wav_path, remove_source: bool = True) -> Path:
+    """FLAC copy of a WAV file via ffmpeg; returns the WAV path if that isn't possible"""
+    wav_path = Path(wav_path)
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        logger.info("ffmpeg not found, keeping uncompressed WAV")
+        return wav_path
+    flac_path = wav_path.with_suffix(".flac")
+    result = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", str(wav_path),
+         "-c:a", "flac", "-compression_level", "5", str(flac_path)],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        logger.error(f"FLAC compression failed: {result.stderr.decode(errors='replace').strip()}")
+        flac_path.unlink(missing_ok=True)
+        return wav_path
+    if remove_source:
+        wav_path.unlink(missing_ok=True)
+    return flac_path
+
+
+def repair_wav(path) -> bool:
+    """Set a WAV's RIFF and data sizes from the file's length; True if they were wrong"""
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(0)
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF":
+            return False
+        riff_size = struct.unpack("<I", riff[4:8])[0]
+        block_align = 1
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                block_align = struct.unpack("<12xH", f.read(14))[0] or 1
+                f.seek(chunk_size - 14 + (chunk_size & 1), 1)
+            elif chunk_id == b"data":
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+        data_start = f.tell()
+        end = data_start + chunk_size + (chunk_size & 1)
+        if end + 8 <= size:
+            # Another chunk (e.g. LIST) after the audio: the header is right
+            f.seek(end)
+            if f.read(4).isalnum():
+                return False
+        # Whole frames only: the last write may have been cut short
+        data_size = (size - data_start) // block_align * block_align
+        if data_size == chunk_size and riff_size == data_start + data_size - 8:
+            return False
+        f.seek(4)
+        f.write(struct.pack("<I", data_start + data_size - 8))
+        f.seek(data_start - 4)
+        f.write(struct.pack("<I", data_size))
+    logger.info(f"🩹 Repaired WAV header of {Path(path).name} ({data_size // block_align} frames)")
+    return True
+
+
+class AudioRecorder:
+    def __init__(self, path, rate: int, channels: int = 1, compress: bool = True):
+        self.path = Path(path)
+        self.rate = rate
+        self.channels = channels
+        self.compress = compress
+        self.frames_written = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._wav = wave.open(str(self.path), "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(rate)
+        self._thread = threading.Thread(target=self._run, name="audio-recorder", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+    @property
+    def seconds(self) -> float:
+        return self.frames_written / self.rate
+
+    def write(self, data: bytes) -> None:
+        if not self._closed:
+            self._queue.put(data)
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is _STOP:
+                break
+            try:
+                self._wav.writeframesraw(data)
+                self.frames_written += len(data) // (2 * self.channels)
+            except Exception as e:
+                logger.error(f"Error writing meeting audio: {e}")
+        # Patches the header with the final length
+        self._wav.close()
+
+    def close(self, wait: bool = False) -> Optional[threading.Thread]:
+        """Finish the file. Compression runs on a background thread unless wait is set."""
+        if self._closed:
+            return None
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        logger.info(f"💾 Saved {self.seconds:.0f}s of meeting audio to {self.path}")
+        if not self.compress:
+            return None
+        if wait:
+            self.path = compress_to_flac(self.path)
+            return None
+        thread = threading.Thread(target=compress_to_flac, args=(self.path,), name="audio-compress", daemon=True)
+        thread.start()
+        return thread
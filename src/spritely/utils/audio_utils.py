@@ -1,6 +1,7 @@
 import pyaudio
 from pynput import keyboard
 import subprocess
+import threading
 import os
 
 from src.spritely.utils.user_settings import settings, save_settings
@@ -15,6 +16,60 @@ CHANNELS = 2
 RATE = 44100
 CHUNK = 1024
 
+# Playback format for locally rendered speech (ElevenLabs "pcm_22050")
+PLAYBACK_RATE = 22050
+
+_playback_lock = threading.Lock()
+
+class PCMOutput:
+    """Output stream kept open across several writes, e.g. consecutive TTS chunks"""
+
+    def __init__(self, rate: int = PLAYBACK_RATE, channels: int = 1):
+        self.rate = rate
+        self.channels = channels
+        self.stream = None
+
+    def open(self):
+        # Share the capture engine's PortAudio instance rather than creating another
+        from src.spritely.utils.audio_engine import capture_engine
+
+        _playback_lock.acquire()
+        try:
+            self.stream = capture_engine.pa.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.rate,
+                output=True
+            )
+        except Exception:
+            _playback_lock.release()
+            raise
+        return self
+
+    def write(self, data: bytes):
+        self.stream.write(data)
+
+    def close(self):
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop_stream()
+            self.stream.close()
+        finally:
+            self.stream = None
+            _playback_lock.release()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+def play_pcm(data: bytes, rate: int = PLAYBACK_RATE, channels: int = 1):
+    """Play raw 16-bit PCM from memory on the default output device"""
+    with PCMOutput(rate, channels) as output:
+        output.write(data)
+
 def open_accessibility_settings():
     subprocess.run(['open', 'x-apple.systempreferences:com.apple.preference.security?Privacy_Accessibility'])
     print("Please enable accessibility permissions for your application")
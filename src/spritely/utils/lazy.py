@@ -0,0 +1,89 @@
+"""
+Deferred construction of heavy SDKs and clients.
+
+Provider SDKs (anthropic, groq, elevenlabs, deepgram, browser_use) take
+hundreds of milliseconds to import and some clients do work when built,
+so nothing imports them at module level. Clients are held in a Lazy and
+built on first use; once the window is up, warm_in_background() imports
+and builds them on a daemon thread so the first hotkey press rarely pays
+for it either:
+
+    anthropic_client = Lazy(make_client, "anthropic")
+    anthropic_client.get().messages.create(...)
+
+    warm_in_background(["anthropic", "groq"], [anthropic_client.get, capture_engine.start])
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, Generic, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Imported on first use only; the startup benchmark fails if one is loaded at startup
+DEFERRED_MODULES = ("anthropic", "groq", "elevenlabs", "deepgram", "browser_use", "langchain_openai")
+
+
+class Lazy(Generic[T]):
+    """A value built on first use, once, however many threads ask for it at the same time"""
+
+    def __init__(self, factory: Callable[[], T], name: str = ""):
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "value")
+        self._value: Optional[T] = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._built
+
+    def get(self) -> T:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    started = time.perf_counter()
+                    self._value = self.factory()
+                    self._built = True
+                    logger.debug(f"💤 Built {self.name} in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return self._value
+
+    def set(self, value: T) -> None:
+        """Use value instead of building one (e.g. a client pointed at a test server)"""
+        with self._lock:
+            self._value = value
+            self._built = True
+
+    def reset(self) -> None:
+        """Forget the value; the next get() builds a new one"""
+        with self._lock:
+            self._value = None
+            self._built = False
+
+
+def warm_in_background(modules: Iterable[str] = (), tasks: Iterable[Callable[[], object]] = (),
+                       name: str = "warm-up") -> threading.Thread:
+    """Import modules, then run tasks, on a daemon thread; failures are logged and skipped"""
+    modules, tasks = list(modules), list(tasks)
+
+    def run():
+        started = time.perf_counter()
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                logger.warning(f"Warm-up import of {module} failed: {e}")
+        for task in tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.warning(f"Warm-up of {getattr(task, '__qualname__', task)} failed: {e}")
+        logger.info(f"🔥 Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
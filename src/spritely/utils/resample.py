@@ -0,0 +1,99 @@
+"""
+Streaming downmix and sample-rate conversion for 16-bit PCM.
+
+Speech recognition only needs 16 kHz mono, but the microphone is captured at
+its native 44.1 kHz (often stereo). Converting before streaming cuts upstream
+bandwidth by roughly 5.5x.
+"""
+
+from math import gcd
+
+import numpy as np
+
+# Filter half-length in input samples; 16 gives ~32 taps per output sample
+DEFAULT_HALF_TAPS = 16
+KAISER_BETA = 8.0
+
+
+def _kernel_table(up: int, down: int, half_taps: int) -> np.ndarray:
+    """Windowed-sinc low-pass filter bank with one row per output phase"""
+    # Cutoff just below the lower Nyquist frequency, in cycles per input sample
+    cutoff = 0.5 * min(1.0, up / down) * 0.92
+    phases = np.arange(up, dtype=np.float64)[:, None] / up
+    taps = np.arange(2 * half_taps, dtype=np.float64)[None, :]
+    t = phases + (half_taps - 1) - taps
+
+    window = np.i0(KAISER_BETA * np.sqrt(np.clip(1.0 - (t / half_taps) ** 2, 0.0, None)))
+    window /= np.i0(KAISER_BETA)
+    table = 2 * cutoff * np.sinc(2 * cutoff * t) * window
+    table /= table.sum(axis=1, keepdims=True)
+    return table.astype(np.float32)
+
+
+class Resampler:
+    """Convert interleaved int16 PCM chunks to mono at a target rate.
+
+    Keeps filter history between calls so chunk boundaries are seamless; every
+    chunk is processed with a handful of vectorised NumPy operations.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, in_channels: int = 1,
+                 half_taps: int = DEFAULT_HALF_TAPS):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.in_channels = in_channels
+        self.out_channels = 1
+
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.half_taps = half_taps
+        self.passthrough = self.up == self.down
+
+        if not self.passthrough:
+            self._table = _kernel_table(self.up, self.down, half_taps)
+            self._tap_offsets = np.arange(2 * half_taps, dtype=np.int64)
+            # Zero history so the first outputs have a full filter window
+            self._buffer = np.zeros(half_taps, dtype=np.float32)
+            self._buffer_start = -half_taps
+            self._next_output = 0
+
+    def downmix(self, data: bytes) -> np.ndarray:
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.in_channels == 1:
+            return samples.astype(np.float32)
+        frames = samples[: len(samples) - len(samples) % self.in_channels]
+        return frames.reshape(-1, self.in_channels).mean(axis=1, dtype=np.float32)
+
+    def process(self, data: bytes) -> bytes:
+        """Convert one chunk; output length varies slightly between calls"""
+        mono = self.downmix(data)
+        if self.passthrough:
+            return _to_int16(mono)
+
+        self._buffer = np.concatenate((self._buffer, mono))
+        last_index = self._buffer_start + len(self._buffer) - 1
+
+        # Largest k whose filter window ends inside the buffered input
+        last_output = ((last_index - self.half_taps) * self.up) // self.down
+        if last_output < self._next_output:
+            return b""
+
+        k = np.arange(self._next_output, last_output + 1, dtype=np.int64)
+        base = (k * self.down) // self.up
+        phase = (k * self.down) % self.up
+
+        index = (base - self.half_taps + 1 - self._buffer_start)[:, None] + self._tap_offsets
+        out = np.einsum("ij,ij->i", self._buffer[index], self._table[phase])
+
+        self._next_output = last_output + 1
+        keep_from = (self._next_output * self.down) // self.up - self.half_taps + 1
+        drop = keep_from - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start = keep_from
+        return _to_int16(out)
+
+
+def _to_int16(samples: np.ndarray) -> bytes:
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
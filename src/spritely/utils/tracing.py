@@ -0,0 +1,282 @@
+"""
+Lightweight latency tracing for one activation of the voice pipeline.
+
+A trace covers one activation, from the hotkey press to the end of the
+response. Stages inside it are timed with spans and single moments with
+marks, all on the monotonic clock:
+
+    trace = Trace("voice", started=pressed_at)
+    with use_trace(trace):
+        with span("mic_open"):
+            ...
+        mark("first_final")
+    trace.finish()          # appended to ~/.spritely/metrics/traces.jsonl
+
+The current span lives in a contextvar, so it follows asyncio tasks and
+run_coroutine_threadsafe() automatically. Work handed to another thread
+keeps the trace if it is wrapped with bind() (capture threads, ASR
+callbacks, Tk callbacks). With no active trace, span() and mark() do
+nothing.
+
+Print a waterfall of recent traces:
+
+    python -m src.spritely.utils.tracing            # last trace
+    python -m src.spritely.utils.tracing --last 5
+    python -m src.spritely.utils.tracing --summary  # p50/p95 per stage
+"""
+
+import argparse
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.spritely.core.config import config
+from src.spritely.utils.user_settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = config.config_dir / "metrics" / "traces.jsonl"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("spritely_span", default=None)
+
+
+class Trace:
+    def __init__(self, name: str, started: Optional[float] = None, **attrs):
+        """started: monotonic time the activation began (defaults to now)"""
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.start = started if started is not None else time.monotonic()
+        self.wall_start = time.time() - (time.monotonic() - self.start)
+        self.end: Optional[float] = None
+        self.spans: List["Span"] = []
+        self._lock = threading.Lock()
+        self.root = Span(self, name, None, at=self.start)
+
+    def _add(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self, path: Optional[Path] = None) -> None:
+        if self.end is not None:
+            return
+        self.root.finish()
+        self.end = self.root.end
+        if settings.get('tracing', True):
+            write_trace(self, path or TRACE_FILE)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "wall_start": self.wall_start,
+            "duration_ms": _ms(self.start, self.end),
+            "attrs": self.attrs,
+            "spans": [s.to_dict() for s in spans],
+        }
+
+
+class Span:
+    def __init__(self, trace: Trace, name: str, parent: Optional["Span"], instant: bool = False,
+                 at: Optional[float] = None, **attrs):
+        self.trace = trace
+        self.name = name
+        self.id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.id if parent is not None else None
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+        self.start = at if at is not None else time.monotonic()
+        self.end: Optional[float] = self.start if instant else None
+        trace._add(self)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.id,
+            "parent_id": self.parent_id,
+            "thread": self.thread,
+            "start_ms": _ms(self.trace.start, self.start),
+            "duration_ms": _ms(self.start, self.end),
+            "attrs": self.attrs,
+        }
+
+
+def _ms(start: float, end: Optional[float]) -> Optional[float]:
+    return None if end is None else round((end - start) * 1000, 2)
+
+
+@contextmanager
+def use_trace(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make trace current for the block (None leaves tracing off)"""
+    if trace is None:
+        yield None
+        return
+    token = _current.set(trace.root)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    current = _current.get()
+    return current.trace if current is not None else None
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent, **attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        _current.reset(token)
+
+
+def mark(name: str, once: bool = False, at: Optional[float] = None, **attrs) -> None:
+    """Record a moment in the current trace; with once, only the first occurrence"""
+    parent = _current.get()
+    if parent is None:
+        return
+    if once and any(s.name == name for s in parent.trace.spans):
+        return
+    Span(parent.trace, name, parent, instant=True, at=at, **attrs)
+
+
+def bind(fn: Callable) -> Callable:
+    """fn, run in the current trace context whichever thread calls it"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # A fresh copy per call: the same callback may run on several threads at once
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+_write_lock = threading.Lock()
+
+
+def write_trace(trace: Trace, path: Path = TRACE_FILE) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(trace.to_dict()) + "\n"
+        with _write_lock, open(path, "a") as f:
+            f.write(line)
+    except OSError as e:
+        logger.debug(f"Could not write trace: {e}")
+
+
+def read_traces(path: Path = TRACE_FILE) -> List[Dict]:
+    if not path.exists():
+        return []
+    traces = []
+    with open(path) as f:
+        for line in f:
+            try:
+                traces.append(json.loads(line))
+            except ValueError:
+                continue
+    return traces
+
+
+def waterfall(trace: Dict, width: int = 48) -> str:
+    """Text waterfall: one row per span, bars placed on the trace's timeline"""
+    spans = sorted(trace["spans"], key=lambda s: s["start_ms"])
+    total = trace["duration_ms"] or max((s["start_ms"] + (s["duration_ms"] or 0) for s in spans), default=0)
+    scale = width / total if total else 0
+    depth = {trace["spans"][0]["span_id"]: 0} if trace["spans"] else {}
+    for s in spans:
+        depth[s["span_id"]] = depth.get(s["parent_id"], -1) + 1
+
+    lines = [f"🧭 {trace['name']} {trace['trace_id']}  "
+             f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trace['wall_start']))}  {total:.0f}ms"]
+    for s in spans:
+        if s["parent_id"] is None:
+            continue
+        start, duration = s["start_ms"], s["duration_ms"]
+        offset = int(start * scale)
+        if duration is None:
+            bar, label = "…", f"{start:8.1f}ms  (unfinished)"
+        elif duration == 0:
+            bar, label = "◆", f"{start:8.1f}ms"
+        else:
+            bar, label = "█" * max(1, int(duration * scale)), f"{start:8.1f}ms {duration:8.1f}ms"
+        name = "  " * (depth[s["span_id"]] - 1) + s["name"]
+        lines.append(f"  {name:<24.24} {label:<22} {' ' * offset}{bar}")
+    return "\n".join(lines)
+
+
+def stage_summary(traces: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """p50/p95 per stage: start offset for marks, duration for spans"""
+    values = defaultdict(list)
+    kinds = {}
+    for trace in traces:
+        for s in trace["spans"]:
+            if s["parent_id"] is None:
+                continue
+            instant = s["duration_ms"] == 0
+            value = s["start_ms"] if instant else s["duration_ms"]
+            if value is not None:
+                values[s["name"]].append(value)
+                kinds[s["name"]] = "at" if instant else "took"
+    return {
+        name: {"kind": kinds[name], "count": len(v), "p50_ms": round(float(np.percentile(v, 50)), 1),
+               "p95_ms": round(float(np.percentile(v, 95)), 1)}
+        for name, v in values.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show recorded pipeline traces")
+    parser.add_argument("--file", default=str(TRACE_FILE))
+    parser.add_argument("--last", type=int, default=1, help="number of recent traces to show")
+    parser.add_argument("--name", help="only traces with this name (e.g. voice, dictation)")
+    parser.add_argument("--trace", help="show one trace by id")
+    parser.add_argument("--summary", action="store_true", help="per-stage percentiles instead of waterfalls")
+    args = parser.parse_args(argv)
+
+    traces = read_traces(Path(args.file))
+    if args.name:
+        traces = [t for t in traces if t["name"] == args.name]
+    if args.trace:
+        traces = [t for t in traces if t["trace_id"].startswith(args.trace)]
+    if not traces:
+        print("No traces recorded yet")
+        return
+    if args.summary:
+        print(f"{len(traces)} traces")
+        for name, stats in sorted(stage_summary(traces).items(), key=lambda kv: kv[1]["p50_ms"]):
+            print(f"  {name:<24} {stats['kind']:<4} n={stats['count']:<5} p50 {stats['p50_ms']:>9.1f}ms  p95 {stats['p95_ms']:>9.1f}ms")
+        return
+    for trace in traces[-args.last:]:
+        print(waterfall(trace))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,21 @@
 # Default settings
 DEFAULT_SETTINGS = {
-    "microphone_index": None  # None means use system default
+    "microphone_index": None,  # None means use system default
+    "transcription_sample_rate": 16000,  # Audio is downmixed to mono at this rate before ASR
+    "vad_enabled": True,  # Only stream speech to ASR; silence is replaced by KeepAlives
+    "vad_detector": "energy",  # "energy" or "webrtc"
+    "speculative_routing": True,  # Start generating before the response type is known
+    "response_router_threshold": 0.75,  # Below this local confidence, ask the remote router
+    "memory_max_tokens": 2000,  # Conversation history budget, older turns are condensed
+    "live_meeting_summary": True,  # Summarise meetings while they are recorded
+    "record_meeting_audio": False,  # Keep meeting audio (FLAC if ffmpeg is installed) for re-transcription
+    "asr_replay_file": None,  # Transcript the "replay" ASR backend plays back (None: built-in script)
+    "local_asr_model": "base.en",  # faster-whisper model for the "whisper" ASR backend
+    "field_live_typing": True,  # Field dictation types interim results and corrects them as finals arrive
+    "text_injector": "auto",  # "auto", "quartz", "pynput", "xdotool", "ydotool" or "fake"
+    "voice_id": None,  # ElevenLabs voice for replies and earcons (None: the app config's voice)
+    "browser_prewarm": False,  # Launch Chrome at startup (otherwise on the first browser task, then kept warm)
+    "tracing": True  # Write per-activation latency traces to ~/.spritely/metrics/traces.jsonl
 }
 
 # Current settings
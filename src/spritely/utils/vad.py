@@ -0,0 +1,196 @@
+"""
+Voice activity detection for the capture threads.
+
+A VADGate sits between the capture subscription and the ASR connection. It
+forwards speech (plus a little pre-roll and hangover so word edges are kept),
+drops silent frames, and sends KeepAlive messages while the line is quiet so
+the websocket stays open without streaming or billing silence.
+
+Dropping silence cuts it out of the ASR's timeline, so the gate records
+where each cut was made and capture_time() maps ASR timestamps back onto
+the capture timeline.
+"""
+
+import logging
+import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Deepgram closes a socket after ~10s without audio or KeepAlive
+KEEPALIVE_INTERVAL = 5.0
+
+
+class VoiceActivityDetector:
+    """Classifies a single frame of 16-bit mono PCM as speech or not"""
+
+    def is_speech(self, samples: np.ndarray, rate: int) -> bool:
+        raise NotImplementedError
+
+
+class EnergyZCRDetector(VoiceActivityDetector):
+    """RMS energy gate with a zero-crossing check for unvoiced consonants.
+
+    The threshold adapts upwards to a slowly tracked noise floor, so a noisy
+    room doesn't hold the gate open permanently.
+    """
+
+    def __init__(self, energy_threshold: float = 500, noise_ratio: float = 3.0,
+                 fricative_zcr: float = 0.25, noise_decay: float = 0.95):
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.fricative_zcr = fricative_zcr
+        self.noise_decay = noise_decay
+        self.noise_floor = 0.0
+
+    def is_speech(self, samples: np.ndarray, rate: int) -> bool:
+        if len(samples) < 2:
+            return False
+        x = samples.astype(np.float32)
+        rms = float(np.sqrt(np.mean(x * x)))
+        zcr = float(np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1]))) / (len(x) - 1)
+
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        speech = rms >= threshold or (rms >= threshold * 0.5 and zcr >= self.fricative_zcr)
+
+        if not speech:
+            self.noise_floor = self.noise_decay * self.noise_floor + (1 - self.noise_decay) * rms
+        return speech
+
+
+class WebRTCDetector(VoiceActivityDetector):
+    """Wraps the optional webrtcvad model; frames are split into 10 ms slices"""
+
+    def __init__(self, aggressiveness: int = 2):
+        try:
+            import webrtcvad
+        except ImportError:
+            raise ImportError("webrtcvad is not installed: pip install webrtcvad")
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, samples: np.ndarray, rate: int) -> bool:
+        step = rate // 100
+        votes = [
+            self._vad.is_speech(samples[i:i + step].tobytes(), rate)
+            for i in range(0, len(samples) - step + 1, step)
+        ]
+        return bool(votes) and sum(votes) * 2 >= len(votes)
+
+
+def get_detector(name: str = "energy", energy_threshold: float = 500) -> VoiceActivityDetector:
+    """Build the detector named in settings, falling back to the energy gate"""
+    if name == "webrtc":
+        try:
+            return WebRTCDetector()
+        except ImportError as e:
+            logger.warning(f"{e}; using energy VAD")
+    return EnergyZCRDetector(energy_threshold=energy_threshold)
+
+
+class VADGate:
+    def __init__(self, detector: VoiceActivityDetector, rate: int,
+                 preroll_ms: int = 200, hangover_ms: int = 600,
+                 keepalive_interval: float = KEEPALIVE_INTERVAL,
+                 on_speech_start: Optional[Callable[[], None]] = None,
+                 on_speech_end: Optional[Callable[[], None]] = None,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.detector = detector
+        self.rate = rate
+        self.preroll_seconds = preroll_ms / 1000
+        self.hangover_seconds = hangover_ms / 1000
+        self.keepalive_interval = keepalive_interval
+        self.on_speech_start = on_speech_start
+        self.on_speech_end = on_speech_end
+
+        self.in_speech = False
+        self._preroll = deque()
+        self._preroll_samples = 0
+        self._silence_samples = 0
+        self._last_sent = time.monotonic()
+        self.frames_sent = 0
+        self.frames_suppressed = 0
+        # Samples sent / dropped so far, and the dropped total at each resumption
+        self._sent_samples = 0
+        self._dropped_samples = 0
+        self._cut_dropped = array('q', [0])
+        self._cut_at = array('q', [0])
+
+    def feed(self, data: bytes, send: Callable[[bytes], None],
+             keep_alive: Optional[Callable[[], None]] = None) -> None:
+        """Process one chunk, calling send() for speech or keep_alive() when idle"""
+        if not self.enabled:
+            send(data)
+            return
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(samples) == 0:
+            return
+        speech = self.detector.is_speech(samples, self.rate)
+
+        if speech:
+            self._silence_samples = 0
+            if not self.in_speech:
+                self.in_speech = True
+                self._emit(self.on_speech_start)
+                if self._dropped_samples != self._cut_dropped[-1]:
+                    # Totals first: capture_time() may read from another thread
+                    self._cut_dropped.append(self._dropped_samples)
+                    self._cut_at.append(self._sent_samples)
+                # Flush pre-roll so the onset of the first word isn't clipped
+                while self._preroll:
+                    chunk = self._preroll.popleft()
+                    send(chunk)
+                    self.frames_sent += 1
+                    self._sent_samples += len(chunk) // 2
+                self._preroll_samples = 0
+        elif self.in_speech:
+            self._silence_samples += len(samples)
+            if self._silence_samples / self.rate >= self.hangover_seconds:
+                self.in_speech = False
+                self._emit(self.on_speech_end)
+
+        if self.in_speech or speech:
+            send(data)
+            self.frames_sent += 1
+            self._sent_samples += len(samples)
+            self._last_sent = time.monotonic()
+            return
+
+        self._preroll.append(data)
+        self._preroll_samples += len(samples)
+        # Only frames that leave the pre-roll unsent count as suppressed
+        while self._preroll and self._preroll_samples / self.rate > self.preroll_seconds:
+            dropped = len(self._preroll.popleft()) // 2
+            self._preroll_samples -= dropped
+            self._dropped_samples += dropped
+            self.frames_suppressed += 1
+
+        now = time.monotonic()
+        if keep_alive and now - self._last_sent >= self.keepalive_interval:
+            keep_alive()
+            self._last_sent = now
+
+    @property
+    def dropped_seconds(self) -> float:
+        return self._dropped_samples / self.rate
+
+    def capture_time(self, seconds: Optional[float]) -> Optional[float]:
+        """Seconds on the ASR's timeline (silence cut out) -> seconds since capture began"""
+        if seconds is None:
+            return None
+        index = bisect_right(self._cut_at, int(seconds * self.rate)) - 1
+        return seconds + self._cut_dropped[index] / self.rate
+
+    @staticmethod
+    def _emit(callback: Optional[Callable[[], None]]) -> None:
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"VAD event handler failed: {e}")